@@ -0,0 +1,3 @@
+"""
+Benchmarks for the Podigee MCP server, run against a local mock Podigee API.
+"""
@@ -0,0 +1,321 @@
+"""
+Local stand-in for the Podigee API used by the benchmark harness.
+
+Serves synthetic podcasts, episodes and analytics with configurable payload size,
+latency and error rate, so throughput and latency of the MCP tools can be measured
+without touching app.podigee.com.
+"""
+
+import json
+import hashlib
+import time
+import random
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from benchmarks.synthetic import (
+    generate_analytics,
+    generate_episodes,
+    generate_episodes_batch,
+    generate_overview,
+)
+
+API_PREFIX = "/api/v1"
+
+
+@dataclass
+class MockAPIConfig:
+    """
+    Shape and behaviour of the synthetic API.
+
+    Attributes:
+        latency: Base latency added to every response, in seconds
+        jitter: Extra random latency (uniform between 0 and jitter), in seconds
+        error_rate: Fraction of requests answered with HTTP 500
+        podcasts: Number of podcasts in the account
+        episodes: Number of episodes per podcast
+        objects: Number of time-bucket objects in analytics responses
+        granularity: Step between analytics objects ('hour', 'day' or 'week')
+        countries: Number of countries in analytics responses
+        clients: Number of clients in analytics responses
+        seed: Random seed, so runs are reproducible
+        part_failures: Number of uploaded parts answered with HTTP 500 before parts
+                       are accepted, to exercise retries
+        upload_part_size: Part size of multipart uploads; smaller files are uploaded
+                          whole, like the API decides
+    """
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    podcasts: int = 3
+    episodes: int = 50
+    objects: int = 30
+    granularity: str = "day"
+    countries: int = 20
+    clients: int = 20
+    seed: int = 42
+    part_failures: int = 0
+    upload_part_size: int = 5 * 1024 * 1024
+
+
+class MockPodigeeAPI:
+    """
+    Starlette app serving the subset of the Podigee API used by the MCP tools,
+    plus a stand-in for the storage that multipart uploads are sent to.
+
+    Payloads come from benchmarks.synthetic and are serialized once and then reused, so
+    the stand-in itself doesn't become the bottleneck of a benchmark.
+    """
+
+    def __init__(self, config: Optional[MockAPIConfig] = None):
+        self.config = config or MockAPIConfig()
+        self.random = random.Random(self.config.seed)
+        self.request_count = 0
+        self._bodies: Dict[Any, bytes] = {}
+        # upload key -> {"filename", "multipart_upload_id", "part_size", "parts": {part number: bytes},
+        # "file": assembled bytes}
+        self.uploads: Dict[str, Dict[str, Any]] = {}
+        self.part_failures = self.config.part_failures
+        self.part_url_requests = 0
+        # episode ID -> episode changed with PUT /episodes/{id}, and the Idempotency-Key headers seen
+        self.edited_episodes: Dict[int, Dict[str, Any]] = {}
+        self.idempotency_keys: List[str] = []
+        self.app = Starlette(routes=[
+            Route(f"{API_PREFIX}/podcasts", self.podcasts),
+            Route(f"{API_PREFIX}/podcasts/{{podcast_id:int}}", self.podcast),
+            Route(f"{API_PREFIX}/podcasts/{{podcast_id:int}}/analytics", self.analytics),
+            Route(f"{API_PREFIX}/podcasts/{{podcast_id:int}}/overview", self.overview),
+            Route(f"{API_PREFIX}/podcasts/{{podcast_id:int}}/analytics/episodes", self.episodes_analytics),
+            Route(f"{API_PREFIX}/episodes", self.episodes),
+            Route(f"{API_PREFIX}/episodes/{{episode_id:int}}", self.episode, methods=["GET", "PUT"]),
+            Route(f"{API_PREFIX}/episodes/{{episode_id:int}}/analytics", self.analytics),
+            Route(f"{API_PREFIX}/uploads", self.create_upload, methods=["POST"]),
+            Route(f"{API_PREFIX}/uploads/part_url", self.part_url, methods=["POST"]),
+            Route(f"{API_PREFIX}/uploads/complete_multipart_url", self.complete_url, methods=["POST"]),
+            # Stand-in for the storage behind the presigned URLs
+            Route("/storage/{upload_key}/{part_number:int}", self.store_part, methods=["PUT"]),
+            Route("/storage/{upload_key}/file", self.store_file, methods=["PUT"]),
+            Route("/storage/{upload_key}/complete", self.complete_upload, methods=["POST"]),
+        ])
+
+    def _body(self, key: Any, build) -> bytes:
+        body = self._bodies.get(key)
+        if body is None:
+            body = self._bodies[key] = json.dumps(build()).encode()
+        return body
+
+    async def _respond(self, body: bytes) -> Response:
+        self.request_count += 1
+        delay = self.config.latency + self.random.uniform(0, self.config.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.random.random() < self.config.error_rate:
+            return Response(json.dumps({"code": 500, "message": "synthetic error"}), 500, media_type="application/json")
+        return Response(body, media_type="application/json")
+
+    async def podcasts(self, request: Request) -> Response:
+        return await self._respond(self._body(
+            "podcasts", lambda: [self._podcast(i + 1) for i in range(self.config.podcasts)]
+        ))
+
+    async def podcast(self, request: Request) -> Response:
+        podcast_id = request.path_params["podcast_id"]
+        return await self._respond(self._body(("podcast", podcast_id), lambda: self._podcast(podcast_id)))
+
+    async def analytics(self, request: Request) -> Response:
+        config = self.config
+        return await self._respond(self._body("analytics", lambda: generate_analytics(
+            objects=config.objects,
+            granularity=config.granularity,
+            countries=config.countries,
+            clients=config.clients,
+            seed=config.seed,
+        )))
+
+    async def overview(self, request: Request) -> Response:
+        return await self._respond(self._body(
+            "overview", lambda: generate_overview(self.config.episodes, seed=self.config.seed)
+        ))
+
+    async def episodes_analytics(self, request: Request) -> Response:
+        podcast_id = request.path_params["podcast_id"]
+        limit = int(request.query_params.get("limit", 50))
+        offset = int(request.query_params.get("offset", 0))
+        return await self._respond(self._body(("episodes_analytics", podcast_id, limit, offset), lambda: {
+            "objects": generate_episodes_batch(
+                podcast_id, self.config.episodes, seed=self.config.seed
+            )["objects"][offset:offset + limit]
+        }))
+
+    async def episodes(self, request: Request) -> Response:
+        limit = int(request.query_params.get("limit", 50))
+        offset = int(request.query_params.get("offset", 0))
+        podcast_ids = tuple(int(podcast_id) for podcast_id in request.query_params.getlist("podcast_ids[]"))
+        if podcast_ids:
+            # Like the API, limit_per_podcast is capped at 10
+            per_podcast = min(int(request.query_params.get("limit_per_podcast", limit)), 10)
+            return await self._respond(self._body(("episodes", podcast_ids, per_podcast, limit), lambda: [
+                episode
+                for podcast_id in podcast_ids
+                for episode in generate_episodes(podcast_id, self.config.episodes, seed=self.config.seed)[:per_podcast]
+            ][:limit]))
+        podcast_id = int(request.query_params.get("podcast_id", 1))
+        return await self._respond(self._body(("episodes", podcast_id, limit, offset), lambda: generate_episodes(
+            podcast_id, self.config.episodes, seed=self.config.seed
+        )[offset:offset + limit]))
+
+    async def episode(self, request: Request) -> Response:
+        episode_id = request.path_params["episode_id"]
+        episode = self.edited_episodes.get(episode_id)
+        if episode is None:
+            episodes = generate_episodes(episode_id // 100000, self.config.episodes, seed=self.config.seed)
+            episode = next((episode for episode in episodes if episode["id"] == episode_id), None)
+            if episode is None:
+                return Response(json.dumps({"code": 404, "message": "not found"}), 404, media_type="application/json")
+        if request.method == "PUT":
+            if "idempotency-key" in request.headers:
+                self.idempotency_keys.append(request.headers["idempotency-key"])
+            episode = self.edited_episodes[episode_id] = dict(episode, **(await request.json()))
+        return await self._respond(json.dumps(episode).encode())
+
+    def _storage_url(self, request: Request, upload_key: str, suffix: Any) -> str:
+        return f"{str(request.base_url).rstrip('/')}/storage/{upload_key}/{suffix}"
+
+    def _multipart_upload(self, request: Request) -> Optional[Dict[str, Any]]:
+        # Like the API, the upload is identified by its key and multipart upload ID in the query
+        upload = self.uploads.get(request.query_params.get("upload_key", ""))
+        if upload is None or upload["multipart_upload_id"] != request.query_params.get("multipart_upload_id"):
+            return None
+        return upload
+
+    @staticmethod
+    def _unprocessable(message: str) -> Response:
+        return Response(json.dumps({"code": 422, "message": message}), 422, media_type="application/json")
+
+    async def create_upload(self, request: Request) -> Response:
+        filename = request.query_params.get("filename")
+        filesize = request.query_params.get("filesize")
+        if not filename or not filesize or not filesize.isdigit():
+            return self._unprocessable("filename and filesize are required")
+        number = len(self.uploads) + 1
+        upload_key = f"upload-{number}"
+        part_size = self.config.upload_part_size
+        multipart = int(filesize) > part_size
+        parts = -(-int(filesize) // part_size)
+        self.uploads[upload_key] = {
+            "filename": filename,
+            "multipart_upload_id": f"multipart-{number}" if multipart else None,
+            "part_size": part_size,
+            "parts": {},
+            "file": None,
+        }
+        return await self._respond(json.dumps({
+            "upload_url": None if multipart else self._storage_url(request, upload_key, "file"),
+            "content_type": "audio/mpeg",
+            "file_url": f"https://cdn.example.com/{filename}",
+            "multipart_upload": multipart,
+            "upload_part_urls": [self._storage_url(request, upload_key, n) for n in range(1, parts + 1)] if multipart else [],
+            "upload_key": upload_key,
+            "part_size": part_size,
+            "multipart_upload_id": self.uploads[upload_key]["multipart_upload_id"],
+        }).encode())
+
+    async def part_url(self, request: Request) -> Response:
+        upload = self._multipart_upload(request)
+        part_number = request.query_params.get("part_number", "")
+        if upload is None or not part_number.isdigit():
+            return self._unprocessable("unknown multipart upload or part number")
+        self.part_url_requests += 1
+        url = self._storage_url(request, request.query_params["upload_key"], int(part_number))
+        return await self._respond(json.dumps({"upload_part_url": url}).encode())
+
+    async def complete_url(self, request: Request) -> Response:
+        if self._multipart_upload(request) is None:
+            return self._unprocessable("unknown multipart upload")
+        url = self._storage_url(request, request.query_params["upload_key"], "complete")
+        return await self._respond(json.dumps({"complete_multipart_upload_url": url}).encode())
+
+    async def store_part(self, request: Request) -> Response:
+        self.request_count += 1
+        if self.part_failures > 0:
+            self.part_failures -= 1
+            return Response("synthetic storage error", 500)
+        upload = self.uploads[request.path_params["upload_key"]]
+        data = await request.body()
+        upload["parts"][request.path_params["part_number"]] = data
+        return Response(b"", headers={"ETag": f'"{hashlib.md5(data).hexdigest()}"'})
+
+    async def store_file(self, request: Request) -> Response:
+        self.request_count += 1
+        self.uploads[request.path_params["upload_key"]]["file"] = await request.body()
+        return Response(b"")
+
+    async def complete_upload(self, request: Request) -> Response:
+        self.request_count += 1
+        upload = self.uploads[request.path_params["upload_key"]]
+        parts = [data for _, data in sorted(upload["parts"].items())]
+        # Like S3, every part but the last must have the upload's part size
+        if any(len(data) != upload["part_size"] for data in parts[:-1]):
+            return Response(b"<Error><Code>EntityTooSmall</Code></Error>", 400, media_type="application/xml")
+        upload["file"] = b"".join(parts)
+        return Response(b"<CompleteMultipartUploadResult/>", media_type="application/xml")
+
+    def _podcast(self, podcast_id: int) -> Dict[str, Any]:
+        return {
+            "id": podcast_id,
+            "title": f"Benchmark Podcast {podcast_id}",
+            "language": "en",
+            "created_at": "2023-01-01T00:00:00Z",
+            "episodes_count": self.config.episodes,
+        }
+
+
+class MockAPIServer:
+    """
+    Runs a MockPodigeeAPI under uvicorn in a background thread.
+
+    The server gets its own event loop, so its simulated latency does not compete with
+    the event loop of the code being benchmarked.
+    """
+
+    def __init__(self, config: Optional[MockAPIConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.api = MockPodigeeAPI(config)
+        self.server = uvicorn.Server(uvicorn.Config(
+            self.api.app, host=host, port=port, log_level="warning", lifespan="off"
+        ))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.host = host
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to pass to PodigeeAPIClient."""
+        port = self.server.servers[0].sockets[0].getsockname()[1]
+        return f"http://{self.host}:{port}{API_PREFIX}"
+
+    def start(self, timeout: float = 10.0) -> "MockAPIServer":
+        self.thread.start()
+        waited = 0.0
+        while not self.server.started:
+            if waited >= timeout or not self.thread.is_alive():
+                raise RuntimeError("Mock Podigee API server failed to start")
+            time.sleep(0.01)
+            waited += 0.01
+        return self
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+    def __enter__(self) -> "MockAPIServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the Podigee MCP tools.
+
+Starts a local mock Podigee API, points the server's PodigeeAPIClient at it and drives
+every tool in main.py at several concurrency levels, reporting p50/p95/p99 latency and
+throughput. Use it to validate connection handling, caching and fan-out changes before
+deploying them:
+
+    python benchmarks/run_benchmarks.py --concurrency 1,8,32 --requests 200 --latency 0.05
+
+With --cassette the tools are driven by recorded API traffic instead (see
+podigee/cassette.py), replayed with the recorded latencies times --latency-scale:
+
+    python benchmarks/run_benchmarks.py --cassette traffic.jsonl.gz --latency-scale 0.5
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from benchmarks.mock_api import MockAPIConfig, MockAPIServer
+from podigee.api import PodigeeAPIClient
+from podigee.cache import ResponseCache
+from podigee.cassette import ReplayTransport
+from podigee.scheduler import default_scheduler
+
+# Each tool is called with arguments that exist in the mock API
+TOOL_CALLS: Dict[str, Callable[[], Awaitable[str]]] = {
+    "list_podcasts": lambda: main.list_podcasts(),
+    "get_podcast_details": lambda: main.get_podcast_details(podcast_id=1),
+    "get_podcast_analytics_summary": lambda: main.get_podcast_analytics_summary(podcast_id=1),
+    "list_episodes": lambda: main.list_episodes(podcast_id=1),
+    "get_episode_analytics": lambda: main.get_episode_analytics(episode_id=100001),
+    "get_podcast_episodes_batch_analytics": lambda: main.get_podcast_episodes_batch_analytics(podcast_id=1),
+    "compare_podcast_periods": lambda: main.compare_podcast_periods(podcast_id=1),
+}
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Latency and throughput of one tool at one concurrency level.
+    """
+    tool: str
+    concurrency: int
+    requests: int
+    errors: int
+    p50: float
+    p95: float
+    p99: float
+    rps: float
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile of the samples.
+
+    Args:
+        samples: Measured values
+        q: Percentile between 0 and 100
+
+    Returns:
+        The percentile, or 0.0 for an empty sample
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * q // 100))  # ceil without floats
+    return ordered[int(rank) - 1]
+
+
+async def benchmark_tool(
+    name: str,
+    call: Callable[[], Awaitable[str]],
+    concurrency: int,
+    requests: int
+) -> BenchmarkResult:
+    """
+    Call a tool ``requests`` times with ``concurrency`` calls in flight.
+
+    Args:
+        name: Tool name (for the report)
+        call: Zero-argument coroutine factory calling the tool
+        concurrency: Number of concurrent callers
+        requests: Total number of calls
+
+    Returns:
+        Latency percentiles (in seconds) and throughput of the run
+    """
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            result = await call()
+            latencies.append(time.perf_counter() - started)
+            if result.startswith("Error"):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return BenchmarkResult(
+        tool=name,
+        concurrency=concurrency,
+        requests=len(latencies),
+        errors=errors,
+        p50=percentile(latencies, 50),
+        p95=percentile(latencies, 95),
+        p99=percentile(latencies, 99),
+        rps=len(latencies) / elapsed if elapsed else 0.0,
+    )
+
+
+async def run_benchmarks(
+    tools: Sequence[str],
+    concurrencies: Sequence[int],
+    requests: int
+) -> List[BenchmarkResult]:
+    """
+    Run every tool at every concurrency level against the current main.podigee_client.
+    """
+    results = []
+    for name in tools:
+        for concurrency in concurrencies:
+            results.append(await benchmark_tool(name, TOOL_CALLS[name], concurrency, requests))
+    return results
+
+
+def format_results(results: Sequence[BenchmarkResult]) -> str:
+    """
+    Format results as a fixed-width table (latencies in milliseconds).
+    """
+    lines = [f"{'tool':<38} {'conc':>5} {'reqs':>6} {'errs':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}"]
+    for r in results:
+        lines.append(
+            f"{r.tool:<38} {r.concurrency:>5} {r.requests:>6} {r.errors:>5} "
+            f"{r.p50 * 1000:>9.2f} {r.p95 * 1000:>9.2f} {r.p99 * 1000:>9.2f} {r.rps:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tools", default=",".join(TOOL_CALLS), help="Comma-separated tools to benchmark")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=100, help="Tool calls per tool and concurrency level")
+    parser.add_argument("--latency", type=float, default=0.02, help="Mock API base latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="Mock API random extra latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of mock API requests failing with 500")
+    parser.add_argument("--objects", type=int, default=30, help="Time-bucket objects per analytics response")
+    parser.add_argument("--granularity", default="day", help="Step between analytics objects (hour, day, week)")
+    parser.add_argument("--countries", type=int, default=20, help="Countries per analytics object")
+    parser.add_argument("--clients", type=int, default=20, help="Clients per analytics object")
+    parser.add_argument("--cache-ttl", type=float, default=0.0,
+                        help="Response cache TTL in seconds (default 0: measure the uncached request path)")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="Override the scheduler's concurrency cap")
+    parser.add_argument("--cassette", default=None, help="Replay this recorded cassette instead of the mock API")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Factor applied to the cassette's latencies")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON instead of a table")
+    return parser.parse_args(argv)
+
+
+def main_cli(argv: Sequence[str] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    tools = [t for t in args.tools.split(",") if t]
+    unknown = [t for t in tools if t not in TOOL_CALLS]
+    if unknown:
+        print(f"Unknown tools: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    # Per-call INFO logs would dominate the measurement
+    logging.getLogger().setLevel(logging.WARNING)
+    if args.max_concurrency:
+        default_scheduler.max_concurrency = args.max_concurrency
+
+    config = MockAPIConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        objects=args.objects,
+        granularity=args.granularity,
+        countries=args.countries,
+        clients=args.clients,
+    )
+    concurrencies = [int(c) for c in args.concurrency.split(",") if c]
+    if args.cassette:
+        main.podigee_client = PodigeeAPIClient(
+            api_key="benchmark",
+            cache=ResponseCache(ttl=args.cache_ttl),
+            transport=ReplayTransport(args.cassette, args.latency_scale)
+        )
+        results = asyncio.run(run_benchmarks(tools, concurrencies, args.requests))
+    else:
+        with MockAPIServer(config) as server:
+            main.podigee_client = PodigeeAPIClient(
+                api_key="benchmark",
+                base_url=server.base_url,
+                cache=ResponseCache(ttl=args.cache_ttl)
+            )
+            results = asyncio.run(run_benchmarks(tools, concurrencies, args.requests))
+
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print(format_results(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Scale benchmarks for the analytics aggregation and rendering in main.py.
+
+Generates synthetic analytics payloads of increasing size (up to a year of hourly
+objects with 200 countries and 500 clients) and times format_analytics_summary and
+the episode aggregation of get_episode_analytics on them, without any network I/O:
+
+    python benchmarks/scale_benchmarks.py --repeat 5
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+import statistics
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Sequence
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from benchmarks.synthetic import generate_analytics, generate_overview
+
+# name -> generate_analytics() arguments
+SCALES: Dict[str, Dict[str, Any]] = {
+    "month-daily": dict(objects=30, granularity="day", countries=20, clients=20),
+    "year-daily": dict(objects=365, granularity="day", countries=100, clients=200, density=0.5),
+    "month-hourly": dict(objects=720, granularity="hour", countries=200, clients=500, density=0.1),
+    "year-hourly": dict(objects=8760, granularity="hour", countries=200, clients=500, density=0.1),
+}
+
+
+@dataclass
+class ScaleResult:
+    """
+    Timing of one workload on one payload size.
+    """
+    workload: str
+    scale: str
+    objects: int
+    breakdown_entries: int
+    best: float
+    median: float
+
+
+class _StaticClient:
+    """
+    Stands in for PodigeeAPIClient and returns a prepared payload, so only the tool's
+    own aggregation and rendering is measured.
+    """
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+
+    async def get_episode_analytics(self, **kwargs: Any) -> Dict[str, Any]:
+        return self.payload
+
+    def response_source(self, data: Any) -> None:
+        # Not a cached response, so every run aggregates
+        return None
+
+
+def _time(func: Callable[[], Any], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def run_scale_benchmarks(scales: Sequence[str], repeat: int) -> List[ScaleResult]:
+    """
+    Time format_analytics_summary and the episode aggregation for each scale.
+
+    Args:
+        scales: Names from SCALES
+        repeat: Number of timed runs per workload
+
+    Returns:
+        Best and median time per workload and scale, in seconds
+    """
+    results = []
+    overview = generate_overview()
+    original_client = main.podigee_client
+    try:
+        for scale in scales:
+            analytics = generate_analytics(**SCALES[scale])
+            objects = analytics["objects"]
+            entries = sum(
+                len(obj[key]) for obj in objects
+                for key in ("formats", "platforms", "countries", "clients", "clients_on_platforms")
+            )
+
+            main.podigee_client = _StaticClient(analytics)
+            workloads = {
+                "format_analytics_summary": lambda: main.format_analytics_summary(analytics, overview),
+                "episode_aggregation": lambda: asyncio.run(main.get_episode_analytics(episode_id=1)),
+            }
+            for workload, func in workloads.items():
+                timings = _time(func, repeat)
+                results.append(ScaleResult(
+                    workload=workload,
+                    scale=scale,
+                    objects=len(objects),
+                    breakdown_entries=entries,
+                    best=min(timings),
+                    median=statistics.median(timings),
+                ))
+    finally:
+        main.podigee_client = original_client
+    return results
+
+
+def format_results(results: Sequence[ScaleResult]) -> str:
+    """
+    Format results as a fixed-width table (times in milliseconds).
+    """
+    lines = [f"{'workload':<26} {'scale':<14} {'objects':>8} {'entries':>9} {'best ms':>10} {'median ms':>10} {'entries/s':>12}"]
+    for r in results:
+        rate = r.breakdown_entries / r.best if r.best else 0.0
+        lines.append(
+            f"{r.workload:<26} {r.scale:<14} {r.objects:>8} {r.breakdown_entries:>9} "
+            f"{r.best * 1000:>10.2f} {r.median * 1000:>10.2f} {rate:>12.0f}"
+        )
+    return "\n".join(lines)
+
+
+def main_cli(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default=",".join(SCALES), help="Comma-separated scales to run")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per workload and scale")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON instead of a table")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    scales = [s for s in args.scales.split(",") if s]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        print(f"Unknown scales: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results = run_scale_benchmarks(scales, args.repeat)
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print(format_results(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
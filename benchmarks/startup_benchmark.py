@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark for the stdio entry points.
+
+Launches the server as an MCP host would, performs the handshake and one tool call
+against a local mock Podigee API, and reports how long the host waits for the
+initialize response, the tool list and the first tool result:
+
+    python benchmarks/startup_benchmark.py --repeat 5
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Sequence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from benchmarks.mock_api import MockAPIConfig, MockAPIServer
+
+# name -> command line of the entry point
+ENTRY_POINTS: Dict[str, List[str]] = {
+    "main.py": [sys.executable, os.path.join(ROOT, "main.py")],
+    "fast_start.py": [sys.executable, os.path.join(ROOT, "podigee", "fast_start.py")],
+}
+
+
+@dataclass
+class StartupResult:
+    """
+    Median time from process start to each milestone, in seconds.
+    """
+    entry_point: str
+    runs: int
+    initialize: float
+    tools_list: float
+    first_tool_call: float
+
+
+def _request(proc: subprocess.Popen, message: Dict[str, Any]) -> Dict[str, Any]:
+    proc.stdin.write((json.dumps(message) + "\n").encode("utf-8"))
+    proc.stdin.flush()
+    if "id" not in message:
+        return {}
+    while True:
+        response = json.loads(proc.stdout.readline())
+        if response.get("id") == message["id"]:
+            return response
+
+
+def measure_startup(command: Sequence[str], env: Dict[str, str]) -> Dict[str, float]:
+    """
+    Start one server process and time the handshake and a list_podcasts call.
+
+    Args:
+        command: Command line of the entry point
+        env: Environment of the server process
+
+    Returns:
+        Seconds from process start to each milestone
+    """
+    started = time.perf_counter()
+    proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env)
+    timings = {}
+    try:
+        _request(proc, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
+            "protocolVersion": "2025-06-18", "capabilities": {}, "clientInfo": {"name": "startup-benchmark", "version": "1"}
+        }})
+        timings["initialize"] = time.perf_counter() - started
+        _request(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        _request(proc, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        timings["tools_list"] = time.perf_counter() - started
+        response = _request(proc, {"jsonrpc": "2.0", "id": 3, "method": "tools/call",
+                                   "params": {"name": "list_podcasts", "arguments": {}}})
+        timings["first_tool_call"] = time.perf_counter() - started
+        if response.get("result", {}).get("isError"):
+            raise RuntimeError(f"Tool call failed: {response}")
+    finally:
+        proc.stdin.close()
+        proc.wait(timeout=30)
+    return timings
+
+
+def run_startup_benchmark(entry_points: Sequence[str], repeat: int) -> List[StartupResult]:
+    """
+    Measure every entry point ``repeat`` times against a mock Podigee API.
+    """
+    results = []
+    with MockAPIServer(MockAPIConfig(latency=0.0, jitter=0.0)) as server:
+        env = dict(os.environ, PODIGEE_API_BASE_URL=server.base_url, PODIGEE_API_KEY="benchmark")
+        for name in entry_points:
+            runs = [measure_startup(ENTRY_POINTS[name], env) for _ in range(repeat)]
+            results.append(StartupResult(
+                entry_point=name,
+                runs=repeat,
+                initialize=statistics.median(r["initialize"] for r in runs),
+                tools_list=statistics.median(r["tools_list"] for r in runs),
+                first_tool_call=statistics.median(r["first_tool_call"] for r in runs),
+            ))
+    return results
+
+
+def format_results(results: Sequence[StartupResult]) -> str:
+    """
+    Format results as a fixed-width table (median times in milliseconds).
+    """
+    lines = [f"{'entry point':<16} {'runs':>5} {'initialize ms':>14} {'tools/list ms':>14} {'first call ms':>14}"]
+    for r in results:
+        lines.append(
+            f"{r.entry_point:<16} {r.runs:>5} {r.initialize * 1000:>14.1f} "
+            f"{r.tools_list * 1000:>14.1f} {r.first_tool_call * 1000:>14.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main_cli(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entry-points", default=",".join(ENTRY_POINTS), help="Comma-separated entry points to measure")
+    parser.add_argument("--repeat", type=int, default=5, help="Process starts per entry point")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON instead of a table")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    entry_points = [e for e in args.entry_points.split(",") if e]
+    unknown = [e for e in entry_points if e not in ENTRY_POINTS]
+    if unknown:
+        print(f"Unknown entry points: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    results = run_startup_benchmark(entry_points, args.repeat)
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print(format_results(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,224 @@
+"""
+Deterministic generator for synthetic Podigee analytics payloads.
+
+Produces responses shaped like episodes/{id}/analytics, podcasts/{id}/analytics,
+podcasts/{id}/overview and podcasts/{id}/analytics/episodes at arbitrary scale (e.g. a
+year of hourly objects with 200 countries and 500 clients), for fixtures, the mock API
+and scale benchmarks. The same arguments and seed always produce the same payload.
+"""
+
+import random
+import string
+from itertools import islice, product
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+# Constants
+GRANULARITY_STEPS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+PLATFORMS = ("iOS", "Android", "Web", "macOS", "Windows", "Linux", "Smart Speaker", "Car", "Smart TV", "Other")
+FORMATS = ("mp3", "aac", "opus", "ogg", "flac")
+DEFAULT_START = datetime(2023, 1, 1)
+
+
+def dimension_keys(prefix: str, count: int) -> List[str]:
+    """
+    Stable key names for a breakdown dimension.
+
+    Countries get two-letter codes ('AA', 'AB', ...) like the real API, every other
+    dimension gets numbered names ('Client 0001', ...).
+
+    Args:
+        prefix: Dimension name ('countries' or a display prefix such as 'Client')
+        count: Number of keys
+
+    Returns:
+        List of key names
+    """
+    if prefix == "countries":
+        return ["".join(pair) for pair in islice(product(string.ascii_uppercase, repeat=2), count)]
+    return [f"{prefix} {i:04d}" for i in range(1, count + 1)]
+
+
+def _split(rng: random.Random, total: int, keys: Sequence[str], density: float) -> Dict[str, int]:
+    """
+    Distribute a download total across keys with a Zipf-like skew, so top-N lists are
+    dominated by a few keys the way real listening data is.
+    """
+    present = [key for key in keys if rng.random() < density] or list(keys[:1])
+    weights = [rng.random() / (rank + 1) for rank in range(len(present))]
+    scale = total / (sum(weights) or 1)
+    return {key: int(weight * scale) for key, weight in zip(present, weights)}
+
+
+def generate_analytics(
+    objects: int = 30,
+    granularity: str = "day",
+    countries: int = 20,
+    clients: int = 20,
+    platforms: int = 5,
+    formats: int = 2,
+    clients_on_platforms: Optional[int] = None,
+    density: float = 1.0,
+    start: datetime = DEFAULT_START,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Generate an analytics response (podcast or episode) with per-period breakdowns.
+
+    Args:
+        objects: Number of time-bucket objects (e.g. 8760 for a year of hours)
+        granularity: 'hour', 'day' or 'week' - the step between objects
+        countries: Number of distinct countries
+        clients: Number of distinct clients
+        platforms: Number of distinct platforms (max 10)
+        formats: Number of distinct formats (max 5)
+        clients_on_platforms: Number of distinct client/platform pairs (default: clients)
+        density: Fraction of keys present in each object (1.0 = every key in every object)
+        start: Start of the first bucket
+        seed: Random seed
+
+    Returns:
+        Dictionary with 'meta' and 'objects' like the Podigee analytics endpoints
+    """
+    if granularity not in GRANULARITY_STEPS:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+
+    rng = random.Random(seed)
+    step = GRANULARITY_STEPS[granularity]
+    country_keys = dimension_keys("countries", countries)
+    client_keys = dimension_keys("Client", clients)
+    platform_keys = list(PLATFORMS[:platforms])
+    format_keys = list(FORMATS[:formats])
+    pair_keys = [
+        f"{client} / {platform}"
+        for client, platform in islice(product(client_keys, platform_keys), clients_on_platforms or clients)
+    ]
+
+    result_objects = []
+    for i in range(objects):
+        downloads = rng.randint(50, 5000)
+        result_objects.append({
+            "downloaded_on": (start + step * i).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "downloads": {"complete": downloads},
+            "formats": _split(rng, downloads, format_keys, 1.0),
+            "platforms": _split(rng, downloads, platform_keys, density),
+            "countries": _split(rng, downloads, country_keys, density),
+            "clients": _split(rng, downloads, client_keys, density),
+            "clients_on_platforms": _split(rng, downloads, pair_keys, density),
+            "sources": {},
+        })
+
+    return {
+        "meta": {
+            "timerange": {
+                "start_datetime": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "end_datetime": (start + step * objects).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            },
+            "aggregation_granularity": granularity,
+        },
+        "objects": result_objects,
+    }
+
+
+def generate_overview(episodes: int = 50, top_episodes: int = 5, seed: int = 42) -> Dict[str, Any]:
+    """
+    Generate a podcasts/{id}/overview response.
+
+    Args:
+        episodes: Number of published episodes
+        top_episodes: Number of entries in 'top_episodes'
+        seed: Random seed
+
+    Returns:
+        Overview dictionary
+    """
+    rng = random.Random(seed)
+    top = sorted((rng.randint(100, 100000) for _ in range(top_episodes)), reverse=True)
+    return {
+        "published_episodes_count": episodes,
+        "audio_published_minutes": episodes * 45,
+        "unique_listeners_number": rng.randint(1000, 500000),
+        "unique_subscribers_number": rng.randint(100, 100000),
+        "mean_audio_published_minutes": 45,
+        "mean_episode_download": rng.randint(100, 10000),
+        "total_downloads": sum(top),
+        "top_episodes": [
+            {"id": i + 1, "title": f"Episode {i + 1}", "downloads": downloads}
+            for i, downloads in enumerate(top)
+        ],
+    }
+
+
+def generate_episodes(
+    podcast_id: int = 1,
+    episodes: int = 50,
+    start: datetime = DEFAULT_START,
+    seed: int = 42
+) -> List[Dict[str, Any]]:
+    """
+    Generate an episodes list response, newest first like the API's default order.
+
+    Args:
+        podcast_id: Podcast the episodes belong to
+        episodes: Number of episodes
+        start: Publication date of the first episode (one episode per week)
+        seed: Random seed
+
+    Returns:
+        List of episode dictionaries
+    """
+    rng = random.Random(seed + podcast_id)
+    result = []
+    for i in range(episodes):
+        published_at = start + timedelta(weeks=i, hours=rng.randint(0, 23))
+        result.append({
+            "id": podcast_id * 100000 + i + 1,
+            "podcast_id": podcast_id,
+            "title": f"Episode {i + 1}",
+            "subtitle": f"Subtitle of episode {i + 1}",
+            "number": i + 1,
+            "publication_type": "full",
+            "published_at": published_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "updated_at": (published_at + timedelta(days=rng.randint(0, 30))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "slug": f"episode-{i + 1}",
+        })
+    result.reverse()
+    return result
+
+
+def generate_episodes_batch(
+    podcast_id: int = 1,
+    episodes: int = 50,
+    start: datetime = DEFAULT_START,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Generate a podcasts/{id}/analytics/episodes (batch episode analytics) response.
+
+    Args:
+        podcast_id: Podcast the episodes belong to
+        episodes: Number of episodes
+        start: Publication date of the first episode
+        seed: Random seed
+
+    Returns:
+        Dictionary with an 'objects' list of episode download counts
+    """
+    rng = random.Random(seed)
+    return {
+        "objects": [
+            {
+                "id": episode["id"],
+                "title": episode["title"],
+                "downloads": rng.randint(0, 50000),
+                "published_at": episode["published_at"],
+                "slug": episode["slug"],
+                "number": episode["number"],
+            }
+            for episode in generate_episodes(podcast_id, episodes, start, seed)
+        ]
+    }
@@ -8,14 +8,47 @@ applications.
 """
 
 import os
+import sys
+import time
 import logging
-from typing import Dict, Any
+import argparse
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP, Context
-from datetime import datetime, timedelta
-from collections import defaultdict
+from mcp.server.transport_security import TransportSecuritySettings
 
 from podigee.api import PodigeeAPIClient
+from podigee.bulk import BulkUpdater, render_bulk_results
+from podigee.cache import create_cache
+from podigee.catalog import CATALOG_ENABLED, CatalogStore
+from podigee.comparison import compare_aggregates, comparison_window, render_comparison
+from podigee.dates import resolve_window
+from podigee.deadline import DeadlineExceeded, gather_partial, partial_notice
+from podigee.formatting import (
+    aggregate_analytics,
+    get_attribution_footer,
+    render_analytics_summary,
+    render_episode_analytics,
+)
+from podigee.metrics import metrics
+from podigee.offload import run_cpu_bound
+from podigee.resources import (
+    EPISODE_ANALYTICS_URI,
+    PODCAST_URI,
+    PODCASTS_URI,
+    RESOURCE_MIME_TYPE,
+    ResourceSubscriptions,
+    enable_subscriptions,
+    read_episode_analytics,
+    read_podcast,
+    read_podcasts,
+)
+from podigee.rollups import ROLLUPS_ENABLED, RollupStore
+from podigee.scheduler import current_tool
+from podigee.tenants import SINGLE_TENANT, TenantRegistry, api_key_from_request
+from podigee.tooling import managed_tool
+from podigee.uploads import UPLOAD_ROOT, MultipartUploader, resolve_upload_path
 
 # Configure logging
 logging.basicConfig(
@@ -27,12 +60,60 @@ logger = logging.getLogger("podigee-mcp")
 # Load environment variables from .env file
 load_dotenv()
 
+# Subscriptions to the resources below; each session's subscriptions end with it
+resource_subscriptions = ResourceSubscriptions()
+
 # Initialize the MCP server with a name
-mcp = FastMCP("Podigee")
+mcp = FastMCP("Podigee", lifespan=resource_subscriptions.lifespan)
 
 # Initialize the Podigee API client
 podigee_client = PodigeeAPIClient()
 
+# Per-tenant clients for requests carrying their own API key (HTTP mode only)
+tenants = None
+
+# Locally synced episode lists, searched without an API request (PODIGEE_EPISODE_CATALOG=1)
+episode_catalogs = CatalogStore() if CATALOG_ENABLED else None
+
+# Daily prefix sums of podcast analytics, so summaries skip raw objects (PODIGEE_ROLLUPS=1)
+podcast_rollups = RollupStore() if ROLLUPS_ENABLED else None
+
+# Completed batches of update_episodes, by idempotency key
+bulk_updater = BulkUpdater()
+
+def get_client() -> PodigeeAPIClient:
+    """
+    Get the Podigee API client for the current tool call.
+    
+    In HTTP mode a request carries its own Podigee API key and the client of that
+    tenant is used. Requests without a key are rejected, unless the server runs
+    single-tenant (PODIGEE_MCP_SINGLE_TENANT=1), so that no one who can reach the
+    server gets to use the account of its PODIGEE_API_KEY. Over stdio the server's
+    own client configured through PODIGEE_API_KEY is used.
+    
+    Returns:
+        Podigee API client
+        
+    Raises:
+        ValueError: If an HTTP request carries no API key and the server is not single-tenant
+    """
+    if tenants is None:
+        return podigee_client
+    try:
+        request_context = mcp.get_context().request_context
+    except ValueError:
+        # Not called from an MCP request
+        return podigee_client
+    api_key = api_key_from_request(request_context)
+    if api_key:
+        return tenants.client_for(api_key)
+    if not SINGLE_TENANT:
+        raise ValueError(
+            "No Podigee API key in the request. Send it in the X-Podigee-Api-Key header, "
+            "as Authorization: Bearer <key> or in the podigee_api_key field of _meta"
+        )
+    return podigee_client
+
 # Helper function for backward compatibility with tests
 async def podigee_api_request(endpoint: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
     """
@@ -45,23 +126,11 @@ async def podigee_api_request(endpoint: str, params: Dict[str, Any] = None) -> D
     Returns:
         JSON response from the API
     """
-    return await podigee_client.get(endpoint, params)
-
-# Helper function to generate attribution footer
-def get_attribution_footer() -> str:
-    """
-    Generate standardized attribution footer for all analytics reports.
-    Required for all free MCP server users who host with Podigee on Advanced or Business Pro plans.
-    
-    Returns:
-        Formatted attribution footer string
-    """
-    current_date = datetime.now().strftime("%B %d, %Y")
-    
-    return f"\n\n---\n*Data Source: Podigee Analytics API | Generated on {current_date}*"
+    return await get_client().get(endpoint, params)
 
 # Tool implementations
 @mcp.tool()
+@managed_tool
 async def get_podcast_analytics_summary(podcast_id = None, days_offset = 30, from_date = None, to_date = None) -> str:
     """
     Get a summary of podcast analytics for the specified podcast.
@@ -80,176 +149,148 @@ async def get_podcast_analytics_summary(podcast_id = None, days_offset = 30, fro
         All reports generated through this MCP Server include attribution to Podigee Analytics API in the footer.
     """
     try:
-        # Check if explicit date range is provided
-        if from_date and to_date:
-            # Use explicit date range
-            calculated_from_date = from_date
-            calculated_to_date = to_date
-        else:
-            # Calculate default date range based on days_offset
-            calculated_to_date = datetime.now().strftime("%Y-%m-%d")
-            calculated_from_date = (datetime.now() - timedelta(days=days_offset)).strftime("%Y-%m-%d")
+        # An explicit date range overrides days_offset
+        calculated_from_date, calculated_to_date = resolve_window(from_date, to_date, days_offset)
             
-        # Fetch analytics and overview data using the client
-        analytics_data, overview_data = await podigee_client.get_podcast_analytics_summary(
-            podcast_id, calculated_from_date, calculated_to_date
-        )
+        if podcast_rollups is not None:
+            client = get_client()
+            if not podcast_id:
+                podcasts = await client.list_podcasts()
+                if not podcasts:
+                    raise ValueError("No podcasts found associated with this API key")
+                podcast_id = podcasts[0]["id"]
+            aggregated, overview_data = await gather_partial(
+                podcast_analytics_aggregate(client, podcast_id, calculated_from_date, calculated_to_date),
+                client.get_podcast_overview(podcast_id, calculated_from_date, calculated_to_date),
+            )
+            analytics_data, aggregate = aggregated or (None, None)
+        else:
+            # Fetch analytics and overview data using the client; a part that runs out
+            # of the tool's time budget comes back as None
+            client = get_client()
+            analytics_data, overview_data = await client.get_podcast_analytics_summary(
+                podcast_id, calculated_from_date, calculated_to_date, partial=True
+            )
+            aggregate = None
+            if analytics_data is not None:
+                aggregate = await aggregate_analytics_data(analytics_data, source=client.response_source(analytics_data))
         
-        # Format the analytics data into a readable summary
-        return format_analytics_summary(analytics_data, overview_data)
+        if analytics_data is None and overview_data is None:
+            raise DeadlineExceeded("Time budget of the tool call ran out before any data arrived")
+        missing = [name for name, data in (("Downloads and breakdowns", analytics_data), ("Overview", overview_data))
+                   if data is None]
+        if analytics_data is None:
+            # Only the time period is shown, without downloads and breakdowns
+            timerange = {"start_datetime": calculated_from_date, "end_datetime": calculated_to_date}
+            summary = render_analytics_summary({"meta": {"timerange": timerange}}, overview_data, None)
+        else:
+            # Format the analytics data into a readable summary
+            summary = format_analytics_summary(analytics_data, overview_data, aggregate)
+        return summary + partial_notice(missing) if missing else summary
     except ValueError as e:
         return f"Error fetching podcast analytics: {str(e)}"
 
-def format_analytics_summary(analytics_data: Dict[str, Any], overview_data: Dict[str, Any]) -> str:
+def format_analytics_summary(
+    analytics_data: Dict[str, Any],
+    overview_data: Dict[str, Any],
+    aggregate: Dict[str, Any] = None
+) -> str:
     """
     Format analytics data into a readable summary, including detailed breakdowns.
     
     Args:
         analytics_data: Raw analytics data from the Podigee API
         overview_data: Raw overview data from the Podigee API
+        aggregate: Result of aggregate_analytics for the analytics objects, if already
+                   computed (e.g. in the offload process pool)
         
     Returns:
         Formatted analytics summary as string
     """
-    meta = analytics_data.get("meta", {})
-    timerange = meta.get("timerange", {})
-    
-    # Safely extract and format dates
-    start_datetime_raw = timerange.get("start_datetime")
-    end_datetime_raw = timerange.get("end_datetime")
-
-    start_date = "unknown"
-    if isinstance(start_datetime_raw, str):
-        try:
-            start_date = start_datetime_raw.split('T')[0]
-        except IndexError:
-            start_date = start_datetime_raw # Handle cases where 'T' might be missing
-    elif start_datetime_raw is not None:
-        logger.warning(f"Unexpected type for start_datetime: {type(start_datetime_raw)}, value: {start_datetime_raw}")
-        start_date = str(start_datetime_raw) # Fallback to string conversion
-
-    end_date = "unknown"
-    if isinstance(end_datetime_raw, str):
-        try:
-            end_date = end_datetime_raw.split('T')[0]
-        except IndexError:
-            end_date = end_datetime_raw
-    elif end_datetime_raw is not None:
-        logger.warning(f"Unexpected type for end_datetime: {type(end_datetime_raw)}, value: {end_datetime_raw}")
-        end_date = str(end_datetime_raw)
-        
-    # Initialize aggregators
-    total_downloads = 0
-    download_by_day = {}
-    formats_agg = defaultdict(int)
-    platforms_agg = defaultdict(int)
-    countries_agg = defaultdict(int)
-    clients_agg = defaultdict(int)
-    clients_on_platforms_agg = defaultdict(int)
-
-    # Aggregate data from daily objects
-    for obj in analytics_data.get("objects", []):
-        daily_downloads = obj.get("downloads", {}).get("complete", 0)
-        total_downloads += daily_downloads
-        
-        # Safely extract and format date
-        downloaded_on_raw = obj.get("downloaded_on")
-        date = "unknown"
-        if isinstance(downloaded_on_raw, str):
-            try:
-                date = downloaded_on_raw.split('T')[0]
-            except IndexError:
-                date = downloaded_on_raw
-        elif downloaded_on_raw is not None:
-            logger.warning(f"Unexpected type for downloaded_on: {type(downloaded_on_raw)}, value: {downloaded_on_raw}")
-            date = str(downloaded_on_raw)
-            
-        download_by_day[date] = daily_downloads
-        
-        # Aggregate detailed breakdowns - expecting integer counts directly
-        for key, count in obj.get("formats", {}).items():
-            if isinstance(count, int):
-                formats_agg[key] += count
-            else:
-                 logger.warning(f"Unexpected value type for formats key '{key}': {type(count)}, value: {count}")
-                 
-        for key, count in obj.get("platforms", {}).items():
-            if isinstance(count, int):
-                platforms_agg[key] += count
-            else:
-                 logger.warning(f"Unexpected value type for platforms key '{key}': {type(count)}, value: {count}")
-                 
-        for key, count in obj.get("countries", {}).items():
-            if isinstance(count, int):
-                countries_agg[key] += count
-            else:
-                 logger.warning(f"Unexpected value type for countries key '{key}': {type(count)}, value: {count}")
-                 
-        for key, count in obj.get("clients", {}).items():
-            if isinstance(count, int):
-                clients_agg[key] += count
-            else:
-                 logger.warning(f"Unexpected value type for clients key '{key}': {type(count)}, value: {count}")
-                 
-        for key, count in obj.get("clients_on_platforms", {}).items():
-             if isinstance(count, int):
-                clients_on_platforms_agg[key] += count
-             else:
-                 logger.warning(f"Unexpected value type for clients_on_platforms key '{key}': {type(count)}, value: {count}")
-
-    # Get overview stats
-    unique_listeners = overview_data.get("unique_listeners_number", "N/A")
-    unique_subscribers = overview_data.get("unique_subscribers_number", "N/A")
-    episodes_count = overview_data.get("published_episodes_count", "N/A")
-    mean_downloads = overview_data.get("mean_episode_download", "N/A")
-    
-    # Format top episodes
-    top_episodes = ""
-    for idx, episode in enumerate(overview_data.get("top_episodes", [])[:5], 1):
-        title = episode.get("title", "Unknown")
-        downloads = episode.get("downloads", 0)
-        top_episodes += f"{idx}. {title}: {downloads} downloads\n"
-    
-    # Helper function to format top items
-    def format_top_items(agg_dict: Dict[str, int], title: str, top_n: int = 5) -> str:
-        if not agg_dict:
-            return f"## Top {title}\nNo data available.\n\n"
-        
-        sorted_items = sorted(agg_dict.items(), key=lambda item: item[1], reverse=True)
-        formatted_list = f"## Top {title}\n"
-        for i, (item, count) in enumerate(sorted_items[:top_n], 1):
-            formatted_list += f"{i}. {item}: {count} downloads\n"
-        return formatted_list + "\n"
-
-    # Format aggregated data
-    top_formats = format_top_items(formats_agg, "Formats")
-    top_platforms = format_top_items(platforms_agg, "Platforms")
-    top_countries = format_top_items(countries_agg, "Countries")
-    top_clients = format_top_items(clients_agg, "Clients")
-    top_clients_on_platforms = format_top_items(clients_on_platforms_agg, "Clients on Platforms", top_n=10) # Show more for this breakdown
-
-    # Create the formatted summary
-    summary = f"""
-# Podcast Analytics Summary
-**Time Period:** {start_date} to {end_date}
-
-## Overview Stats
-- Total Downloads: {total_downloads}
-- Unique Listeners: {unique_listeners}
-- Unique Subscribers: {unique_subscribers}
-- Published Episodes: {episodes_count}
-- Average Downloads per Episode: {mean_downloads}
-
-## Top Episodes
-{top_episodes}
-{top_formats}{top_platforms}{top_countries}{top_clients}{top_clients_on_platforms}
-"""
-    # Add attribution footer
-    summary += get_attribution_footer()
+    if aggregate is None:
+        aggregation_started = time.perf_counter()
+        aggregate = aggregate_analytics(analytics_data.get("objects", []))
+        metrics.observe("podigee_aggregation_seconds", time.perf_counter() - aggregation_started, tool=current_tool())
     
+    render_started = time.perf_counter()
+    summary = render_analytics_summary(analytics_data, overview_data, aggregate)
+    metrics.observe("podigee_render_seconds", time.perf_counter() - render_started, tool=current_tool())
     return summary
 
+# Aggregates of recently aggregated analytics responses, by the response's cache key and
+# body digest: cache hits and unchanged revalidated responses then skip aggregation, also
+# with the SQLite cache, which decodes a new copy of the response on every hit.
+AGGREGATE_MEMO_SIZE = 32
+_aggregate_memo: "OrderedDict[Tuple[str, str, tuple], Dict[str, Any]]" = OrderedDict()
+
+async def aggregate_analytics_data(
+    analytics_data: Dict[str, Any],
+    value_types=(int,),
+    source: Optional[Tuple[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Aggregate the objects of an analytics response without blocking the event loop.
+    
+    Large responses (e.g. a year of hourly objects) are aggregated in the offload
+    process pool, small ones inline. Responses aggregated before (same cache key and
+    digest) are not aggregated again.
+    
+    Args:
+        analytics_data: Raw analytics data from the Podigee API
+        value_types: Accepted types of counts
+        source: Cache key and digest of the response (from PodigeeAPIClient.response_source),
+                None to aggregate without memoizing
+        
+    Returns:
+        Result of aggregate_analytics
+    """
+    objects = analytics_data.get("objects", [])
+    memo_key = (*source, value_types) if source is not None else None
+    memoized = _aggregate_memo.get(memo_key) if memo_key is not None else None
+    if memoized is not None:
+        _aggregate_memo.move_to_end(memo_key)
+        return memoized
+    
+    aggregation_started = time.perf_counter()
+    aggregate = await run_cpu_bound(aggregate_analytics, objects, value_types, size=len(objects))
+    metrics.observe("podigee_aggregation_seconds", time.perf_counter() - aggregation_started, tool=current_tool())
+    if memo_key is not None and objects:
+        _aggregate_memo[memo_key] = aggregate
+        while len(_aggregate_memo) > AGGREGATE_MEMO_SIZE:
+            _aggregate_memo.popitem(last=False)
+    return aggregate
+
+async def podcast_analytics_aggregate(
+    client: PodigeeAPIClient,
+    podcast_id: int,
+    from_date: str,
+    to_date: str
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Get the analytics data and its aggregate for a podcast and window.
+    
+    With rollups enabled, settled days are answered from the podcast's prefix sums
+    and only days not materialized yet are fetched.
+    
+    Args:
+        client: Podigee API client of the tool call
+        podcast_id: ID of the podcast
+        from_date: Start date in YYYY-MM-DD format
+        to_date: End date in YYYY-MM-DD format
+        
+    Returns:
+        Tuple of (analytics_data, aggregate)
+    """
+    aggregation_started = time.perf_counter()
+    if podcast_rollups is not None:
+        result = await podcast_rollups.aggregate(client, podcast_id, from_date, to_date)
+        metrics.observe("podigee_aggregation_seconds", time.perf_counter() - aggregation_started, tool=current_tool())
+        return result
+    analytics_data = await client.get_podcast_analytics(podcast_id, from_date, to_date)
+    return analytics_data, await aggregate_analytics_data(analytics_data, source=client.response_source(analytics_data))
+
 @mcp.tool()
+@managed_tool
 async def list_podcasts(random_string = "") -> str:
     """
     List all podcasts associated with the Podigee API key.
@@ -258,7 +299,7 @@ async def list_podcasts(random_string = "") -> str:
         A formatted list of podcasts
     """
     try:
-        podcasts = await podigee_client.list_podcasts()
+        podcasts = await get_client().list_podcasts()
         
         if not podcasts or len(podcasts) == 0:
             return "No podcasts found associated with this API key."
@@ -281,6 +322,7 @@ async def list_podcasts(random_string = "") -> str:
         return f"Error fetching podcasts: {str(e)}"
 
 @mcp.tool()
+@managed_tool
 async def list_episodes(
     podcast_id = None,
     limit = 10, # Default limit to avoid overly long responses
@@ -289,7 +331,9 @@ async def list_episodes(
     publication_type = None, # 'full', 'trailer', 'bonus'
     sort_by = None,
     sort_direction = None, # 'asc', 'desc'
-    search = None
+    search = None,
+    podcast_ids = None,
+    limit_per_podcast = None
 ) -> str:
     """
     List episodes, optionally filtering by podcast ID, publication status, 
@@ -303,7 +347,14 @@ async def list_episodes(
         publication_type: Filter by type ('full', 'trailer', 'bonus').
         sort_by: Field to sort by (e.g., 'published_at', 'created_at', 'title').
         sort_direction: Sort order ('asc' for ascending, 'desc' for descending).
-        search: Search term to filter episodes by title.
+        search: Search term to filter episodes by title. With the local episode
+                catalog enabled and a podcast_id given, every word must occur in the
+                title, subtitle or description (word prefixes match).
+        podcast_ids: List several podcasts at once, e.g. [12, 34] or "12,34". The
+                     episodes are grouped by podcast; offset is not supported.
+        limit_per_podcast: Maximum number of episodes per podcast when podcast_ids
+                           is given (default: limit, max 50). Up to 10 per podcast
+                           take the fewest requests.
 
     Returns:
         A formatted string listing the episodes found.
@@ -313,39 +364,192 @@ async def list_episodes(
         if limit is not None and limit > 50:
             limit = 50
             logger.warning("Limit parameter capped at 50.")
+        # The catalog compares it as a bool, the API gets the same value
+        if published is not None:
+            published = parse_flag(published, "published")
+        
+        if podcast_ids:
+            return await list_episodes_of_podcasts(
+                parse_podcast_ids(podcast_ids, podcast_id),
+                limit_per_podcast or limit or 10,
+                offset,
+                published=published,
+                publication_type=publication_type,
+                sort_by=sort_by,
+                sort_direction=sort_direction,
+                search=search
+            )
             
-        episodes = await podigee_client.list_episodes(
-            podcast_id=podcast_id,
-            limit=limit,
-            offset=offset,
-            published=published,
-            publication_type=publication_type,
-            sort_by=sort_by,
-            sort_direction=sort_direction,
-            search=search
-        )
+        if episode_catalogs is not None and podcast_id is not None:
+            catalog = await episode_catalogs.get(get_client(), podcast_id)
+            episodes = catalog.search(
+                search=search,
+                published=published,
+                publication_type=publication_type,
+                sort_by=sort_by,
+                sort_direction=sort_direction,
+                limit=limit,
+                offset=offset
+            )
+        else:
+            episodes = await get_client().list_episodes(
+                podcast_id=podcast_id,
+                limit=limit,
+                offset=offset,
+                published=published,
+                publication_type=publication_type,
+                sort_by=sort_by,
+                sort_direction=sort_direction,
+                search=search
+            )
         
         if not episodes:
             return "No episodes found matching the criteria."
             
         result = f"# Episodes Found (showing up to {limit or 'all'})\n\n"
-        for episode in episodes:
-            ep_id = episode.get("id", "N/A")
-            title = episode.get("title", "Untitled")
-            pub_status = "Published" if episode.get("published_at") else "Unpublished"
-            pub_date = episode.get("published_at", "N/A")
-            if pub_date and 'T' in pub_date:
-                pub_date = pub_date.split('T')[0] # Just show date
-            
-            result += f"## {title} (ID: {ep_id})\n"
-            result += f"- Status: {pub_status}\n"
-            result += f"- Published Date: {pub_date}\n\n"
-            
+        result += format_episode_entries(episodes, "##")
         return result
     except ValueError as e:
         return f"Error listing episodes: {str(e)}"
 
+def parse_flag(value: Any, name: str) -> bool:
+    """
+    Parse a yes/no tool argument.
+    
+    Tool parameters are untyped, so the schema advertises them as strings and clients
+    following it send "true" or "false"; a non-empty string must not count as true.
+    
+    Args:
+        value: A bool, or "true"/"false"/"1"/"0" in any case
+        name: Name of the argument, for the error message
+        
+    Returns:
+        The flag
+        
+    Raises:
+        ValueError: If the value is anything else
+    """
+    if isinstance(value, bool):
+        return value
+    normalized = str(value).strip().lower()
+    if normalized in ("true", "1"):
+        return True
+    if normalized in ("false", "0"):
+        return False
+    raise ValueError(f"{name} must be true or false, got {value!r}")
+
+def parse_podcast_ids(podcast_ids: Any, podcast_id: Any = None) -> List[int]:
+    """
+    Parse the podcast_ids argument of list_episodes.
+    
+    Args:
+        podcast_ids: List of IDs, or a string of IDs separated by commas
+        podcast_id: Single podcast ID given as well, listed first
+        
+    Returns:
+        Podcast IDs without duplicates, in the given order
+        
+    Raises:
+        ValueError: If an ID is not a number
+    """
+    if isinstance(podcast_ids, str):
+        podcast_ids = podcast_ids.strip("[] ").split(",")
+    elif not isinstance(podcast_ids, (list, tuple)):
+        podcast_ids = [podcast_ids]
+    if podcast_id is not None:
+        podcast_ids = [podcast_id, *podcast_ids]
+    try:
+        ids = [int(str(value).strip()) for value in podcast_ids if str(value).strip()]
+    except ValueError:
+        raise ValueError(f"podcast_ids must be a list of podcast IDs, got {podcast_ids}")
+    return list(dict.fromkeys(ids))
+
+async def list_episodes_of_podcasts(
+    podcast_ids: List[int],
+    limit_per_podcast: int,
+    offset: Any = None,
+    **filters: Any
+) -> str:
+    """
+    List the episodes of several podcasts, grouped by podcast.
+    
+    Args:
+        podcast_ids: IDs of the podcasts
+        limit_per_podcast: Maximum number of episodes per podcast (capped at 50)
+        offset: Not supported when listing several podcasts
+        **filters: published, publication_type, sort_by, sort_direction and search
+        
+    Returns:
+        Episodes grouped by podcast, with a note for podcasts that ran out of time
+        
+    Raises:
+        ValueError: If offset is given or an API request fails
+    """
+    if offset:
+        raise ValueError("offset can't be combined with podcast_ids; use limit_per_podcast instead")
+    if limit_per_podcast > 50:
+        limit_per_podcast = 50
+        logger.warning("limit_per_podcast parameter capped at 50.")
+    
+    client = get_client()
+    if episode_catalogs is not None:
+        async def search_catalogs() -> Dict[int, Any]:
+            catalogs = await gather_partial(*(episode_catalogs.get(client, podcast_id) for podcast_id in podcast_ids))
+            return {
+                podcast_id: None if catalog is None else catalog.search(limit=limit_per_podcast, **filters)
+                for podcast_id, catalog in zip(podcast_ids, catalogs)
+            }
+        listing = search_catalogs()
+    else:
+        listing = client.list_episodes_by_podcast(podcast_ids, limit_per_podcast, partial=True, **filters)
+    # Titles for the headings; the podcast list is usually cached already
+    grouped, podcasts = await gather_partial(listing, client.list_podcasts())
+    if grouped is None:
+        raise DeadlineExceeded("Time budget of the tool call ran out before any episodes arrived")
+    titles = {podcast.get("id"): podcast.get("title") for podcast in podcasts or ()}
+    
+    if not any(grouped.values()) and all(episodes is not None for episodes in grouped.values()):
+        return "No episodes found matching the criteria."
+    
+    result = f"# Episodes of {len(podcast_ids)} Podcasts (showing up to {limit_per_podcast} each)\n\n"
+    missing = []
+    for podcast_id, episodes in grouped.items():
+        result += f"## {titles.get(podcast_id) or 'Podcast'} (Podcast ID: {podcast_id})\n\n"
+        if episodes is None:
+            missing.append(f"Podcast {podcast_id}")
+        elif not episodes:
+            result += "No episodes found matching the criteria.\n\n"
+        else:
+            result += format_episode_entries(episodes, "###")
+    return result + partial_notice(missing) if missing else result
+
+def format_episode_entries(episodes: List[Dict[str, Any]], heading: str) -> str:
+    """
+    Format episodes as markdown sections with their publication status and date.
+    
+    Args:
+        episodes: Episode dictionaries from the API
+        heading: Markdown heading of each episode, e.g. '##'
+        
+    Returns:
+        Formatted episodes
+    """
+    result = ""
+    for episode in episodes:
+        ep_id = episode.get("id", "N/A")
+        title = episode.get("title", "Untitled")
+        pub_status = "Published" if episode.get("published_at") else "Unpublished"
+        pub_date = episode.get("published_at", "N/A")
+        if pub_date and 'T' in pub_date:
+            pub_date = pub_date.split('T')[0] # Just show date
+        
+        result += f"{heading} {title} (ID: {ep_id})\n"
+        result += f"- Status: {pub_status}\n"
+        result += f"- Published Date: {pub_date}\n\n"
+    return result
+
 @mcp.tool()
+@managed_tool
 async def get_episode_analytics(
     episode_id,
     from_date = None,
@@ -364,6 +568,8 @@ async def get_episode_analytics(
                             Cannot be used together with 'from_date'/'to_date'.
         granularity: Aggregation granularity ('hour', 'day', 'week', 'month').
                     If not given, will be calculated based on the time interval.
+                    If given, the downloads per period are listed. Day, week and month
+                    views of the same episode are served from one API request.
                     
     Returns:
         A formatted summary of episode analytics
@@ -372,7 +578,8 @@ async def get_episode_analytics(
         All reports generated through this MCP Server include attribution to Podigee Analytics API in the footer.
     """
     try:
-        analytics_data = await podigee_client.get_episode_analytics(
+        client = get_client()
+        analytics_data = await client.get_episode_analytics(
             episode_id=episode_id,
             from_date=from_date,
             to_date=to_date,
@@ -380,102 +587,20 @@ async def get_episode_analytics(
             granularity=granularity
         )
         
-        # Extract metadata
-        meta = analytics_data.get("meta", {})
-        timerange = meta.get("timerange", {})
-        start_date = timerange.get("start_datetime", "N/A")
-        end_date = timerange.get("end_datetime", "N/A")
-        granularity = meta.get("aggregation_granularity", "N/A")
-        
-        # Initialize aggregators for different metrics
-        total_downloads = 0
-        formats_agg = defaultdict(int)
-        platforms_agg = defaultdict(int)
-        countries_agg = defaultdict(int)
-        clients_agg = defaultdict(int)
-        clients_on_platforms_agg = defaultdict(int)
-        
-        # Aggregate data across all time periods
-        for obj in analytics_data.get("objects", []):
-            # Sum up total downloads
-            if "downloads" in obj and "complete" in obj["downloads"]:
-                if isinstance(obj["downloads"]["complete"], (int, float)):
-                    total_downloads += obj["downloads"]["complete"]
-                else:
-                    logger.warning(f"Unexpected type for downloads.complete: {type(obj['downloads']['complete'])}")
-            
-            # Aggregate formats
-            for format_name, count in obj.get("formats", {}).items():
-                if isinstance(count, (int, float)):
-                    formats_agg[format_name] += count
-                else:
-                    logger.warning(f"Unexpected type for formats value: {type(count)}")
-            
-            # Aggregate platforms
-            for platform, count in obj.get("platforms", {}).items():
-                if isinstance(count, (int, float)):
-                    platforms_agg[platform] += count
-                else:
-                    logger.warning(f"Unexpected type for platforms value: {type(count)}")
-            
-            # Aggregate countries
-            for country, count in obj.get("countries", {}).items():
-                if isinstance(count, (int, float)):
-                    countries_agg[country] += count
-                else:
-                    logger.warning(f"Unexpected type for countries value: {type(count)}")
-            
-            # Aggregate clients
-            for client, count in obj.get("clients", {}).items():
-                if isinstance(count, (int, float)):
-                    clients_agg[client] += count
-                else:
-                    logger.warning(f"Unexpected type for clients value: {type(count)}")
-            
-            # Aggregate clients on platforms
-            for key, count in obj.get("clients_on_platforms", {}).items():
-                if isinstance(count, (int, float)):
-                    clients_on_platforms_agg[key] += count
-                else:
-                    logger.warning(f"Unexpected type for clients_on_platforms value: {type(count)}")
-        
-        # Helper function to format top items
-        def format_top_items(agg_dict: Dict[str, int], title: str, top_n: int = 5) -> str:
-            if not agg_dict:
-                return f"## Top {title}\nNo data available.\n\n"
-            
-            sorted_items = sorted(agg_dict.items(), key=lambda item: item[1], reverse=True)
-            formatted_list = f"## Top {title}\n"
-            for i, (item, count) in enumerate(sorted_items[:top_n], 1):
-                formatted_list += f"{i}. {item}: {count} downloads\n"
-            return formatted_list + "\n"
-        
-        # Format aggregated data
-        top_formats = format_top_items(formats_agg, "Formats")
-        top_platforms = format_top_items(platforms_agg, "Platforms")
-        top_countries = format_top_items(countries_agg, "Countries")
-        top_clients = format_top_items(clients_agg, "Clients")
-        top_clients_on_platforms = format_top_items(clients_on_platforms_agg, "Clients on Platforms", top_n=10)
+        aggregate = await aggregate_analytics_data(
+            analytics_data, value_types=(int, float), source=client.response_source(analytics_data)
+        )
         
-        # Create the formatted summary
-        summary = f"""
-# Episode Analytics Summary
-**Time Period:** {start_date} to {end_date}
-**Granularity:** {granularity}
-
-## Overview Stats
-- Total Downloads: {total_downloads}
-
-{top_formats}{top_platforms}{top_countries}{top_clients}{top_clients_on_platforms}
-"""
-        # Add attribution footer
-        summary += get_attribution_footer()
+        render_started = time.perf_counter()
+        summary = render_episode_analytics(analytics_data, aggregate, show_series=bool(granularity))
+        metrics.observe("podigee_render_seconds", time.perf_counter() - render_started, tool=current_tool())
         
         return summary
     except ValueError as e:
         return f"Error fetching episode analytics: {str(e)}"
 
 @mcp.tool()
+@managed_tool
 async def get_podcast_details(
     podcast_id,
     fields_filter = None
@@ -496,13 +621,13 @@ async def get_podcast_details(
     try:
         if not podcast_id:
             # If podcast_id is not provided, attempt to use the first podcast
-            podcasts = await podigee_client.list_podcasts()
+            podcasts = await get_client().list_podcasts()
             if not podcasts or len(podcasts) == 0:
                 return "Error: No podcast ID provided and no podcasts found in your account."
             podcast_id = podcasts[0]["id"]
             logger.info(f"No podcast ID provided, using first podcast: {podcast_id}")
         
-        podcast_data = await podigee_client.get_podcast_details(
+        podcast_data = await get_client().get_podcast_details(
             podcast_id=podcast_id,
             fields_filter=fields_filter
         )
@@ -594,6 +719,7 @@ async def get_podcast_details(
         return f"Error fetching podcast details: {str(e)}"
 
 @mcp.tool()
+@managed_tool
 async def get_podcast_episodes_batch_analytics(
     podcast_id,
     from_date = None,
@@ -622,13 +748,11 @@ async def get_podcast_episodes_batch_analytics(
         All reports generated through this MCP Server include attribution to Podigee Analytics API in the footer.
     """
     try:
-        # Set default date range if not provided
-        if not from_date or not to_date:
-            to_date = datetime.now().strftime("%Y-%m-%d")
-            from_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+        # Default to the last 30 days if no complete range is provided
+        from_date, to_date = resolve_window(from_date, to_date)
         
         # Fetch batch episode analytics
-        batch_analytics = await podigee_client.get_podcast_episodes_analytics(
+        batch_analytics = await get_client().get_podcast_episodes_analytics(
             podcast_id=podcast_id,
             from_date=from_date,
             to_date=to_date,
@@ -643,6 +767,7 @@ async def get_podcast_episodes_batch_analytics(
             return f"No episode analytics data found for podcast ID {podcast_id} in the specified time range."
         
         # Format the analytics data into a readable summary
+        render_started = time.perf_counter()
         summary = f"""
 # Batch Episode Analytics Summary
 **Time Period:** {from_date} to {to_date}
@@ -672,11 +797,330 @@ tool on individual episodes.
 """
         # Add attribution footer
         summary += get_attribution_footer()
+        metrics.observe("podigee_render_seconds", time.perf_counter() - render_started, tool=current_tool())
         
         return summary
     except ValueError as e:
         return f"Error fetching batch episode analytics: {str(e)}"
 
+@mcp.tool()
+@managed_tool
+async def compare_podcast_periods(
+    podcast_id = None,
+    days_offset = 30,
+    from_date = None,
+    to_date = None,
+    compare_to = "previous",
+    top_n = 5
+) -> str:
+    """
+    Compare podcast analytics of a period with the previous period or the same period a year earlier.
+    
+    Use this for questions like "how did this month compare to last month" instead of
+    calling get_podcast_analytics_summary twice. Both periods are fetched concurrently and
+    the result shows the change of the totals and of every breakdown (countries, platforms,
+    clients, formats).
+    
+    Args:
+        podcast_id: The ID of the podcast. If not provided, the first podcast associated
+                    with the API key is used.
+        days_offset: Number of days to look back for the current period (default: 30)
+        from_date: Start date of the current period in YYYY-MM-DD format. If provided with
+                   to_date, overrides days_offset.
+        to_date: End date of the current period in YYYY-MM-DD format.
+        compare_to: 'previous' to compare with the equally long period right before (default),
+                    'year' to compare with the same dates one year earlier.
+        top_n: Number of entries shown per breakdown (default: 5)
+        
+    Returns:
+        A formatted comparison of the two periods
+        
+    Note:
+        All reports generated through this MCP Server include attribution to Podigee Analytics API in the footer.
+    """
+    try:
+        from_date, to_date = resolve_window(from_date, to_date, days_offset)
+        previous_from, previous_to = comparison_window(from_date, to_date, compare_to)
+        
+        client = get_client()
+        if not podcast_id:
+            podcasts = await client.list_podcasts()
+            if not podcasts:
+                return "No podcasts found associated with this API key."
+            podcast_id = podcasts[0]["id"]
+        
+        # All four requests are independent; the scheduler bounds how many run at once.
+        # A part that runs out of the tool's time budget comes back as None.
+        parts = await gather_partial(
+            podcast_analytics_aggregate(client, podcast_id, from_date, to_date),
+            client.get_podcast_overview(podcast_id, from_date, to_date),
+            podcast_analytics_aggregate(client, podcast_id, previous_from, previous_to),
+            client.get_podcast_overview(podcast_id, previous_from, previous_to),
+        )
+        if all(part is None for part in parts):
+            raise DeadlineExceeded("Time budget of the tool call ran out before any data arrived")
+        current_aggregated, current_overview, previous_aggregated, previous_overview = parts
+        current = current_aggregated[1] if current_aggregated is not None else None
+        previous = previous_aggregated[1] if previous_aggregated is not None else None
+        missing = [name for name, part in zip((
+            "Current period downloads and breakdowns",
+            "Current period overview",
+            "Previous period downloads and breakdowns",
+            "Previous period overview",
+        ), parts) if part is None]
+        
+        render_started = time.perf_counter()
+        comparison = compare_aggregates(current, previous, current_overview, previous_overview)
+        result = render_comparison(comparison, (from_date, to_date), (previous_from, previous_to), top_n=int(top_n))
+        metrics.observe("podigee_render_seconds", time.perf_counter() - render_started, tool=current_tool())
+        return result + partial_notice(missing) if missing else result
+    except ValueError as e:
+        return f"Error comparing podcast periods: {str(e)}"
+
+@mcp.tool()
+@managed_tool
+async def upload_episode_audio(file_path, filename = None) -> str:
+    """
+    Upload a local audio file (e.g. an episode master) to Podigee.
+    
+    Large files are uploaded in parts, several at a time. If the upload is interrupted
+    or runs out of time, call the tool again with the same file to continue where
+    it stopped.
+    
+    Args:
+        file_path: Path of the audio file on the machine running this server
+        filename: File name to give the upload (default: the file's name)
+        
+    Returns:
+        The URL of the uploaded file, to be used as the audio of an episode
+    """
+    try:
+        if tenants is not None and UPLOAD_ROOT is None:
+            return "Error uploading audio: Uploads are disabled in HTTP mode unless PODIGEE_UPLOAD_ROOT is set."
+        path = resolve_upload_path(file_path, UPLOAD_ROOT)
+        result = await MultipartUploader(get_client()).upload(path, filename)
+        
+        summary = f"# Upload Complete\n\n- File: {os.path.basename(path)} ({result['size'] / (1024 * 1024):.1f} MB)\n"
+        summary += f"- URL: {result['file_url']}\n- Parts: {result['parts']}"
+        if result["resumed_parts"]:
+            summary += f" ({result['resumed_parts']} uploaded by an earlier attempt)"
+        return summary + "\n"
+    except ValueError as e:
+        return f"Error uploading audio: {str(e)}"
+
+@mcp.tool()
+@managed_tool
+async def update_episodes(updates, dry_run = True, idempotency_key = None) -> str:
+    """
+    Update the metadata (title, subtitle, description, ...) of several episodes at once.
+
+    Only fields that differ from the current values are sent. By default this is a
+    dry run that shows what would change; call it again with dry_run=false to apply.
+
+    Args:
+        updates: List of objects with the episode 'id' and the fields to set,
+                 e.g. [{"id": 123, "title": "New title"}]
+        dry_run: Only show the changes without applying them (default: true)
+        idempotency_key: Optional key for the batch; retrying with the same key
+                         doesn't apply the batch twice
+
+    Returns:
+        Per-episode results: updated, unchanged, failed (with the error) or, in a dry
+        run, the changes that would be made
+    """
+    try:
+        dry_run = parse_flag(dry_run, "dry_run")
+        client = get_client()
+        results = await bulk_updater.run(client, updates, dry_run=dry_run, idempotency_key=idempotency_key)
+        if episode_catalogs is not None:
+            for result in results:
+                if result.get("episode"):
+                    episode_catalogs.apply(client, result["episode"])
+        return render_bulk_results(results, dry_run)
+    except ValueError as e:
+        return f"Error updating episodes: {str(e)}"
+
+@mcp.tool()
+@managed_tool
+async def get_server_diagnostics(output_format = "markdown") -> str:
+    """
+    Get latency and throughput diagnostics of this MCP server.
+    
+    Shows histograms of upstream Podigee API latency, response sizes, JSON decode time,
+    aggregation and render time per tool, plus request and tool call counters.
+    Useful to find out where time goes when the server is slow.
+    
+    Args:
+        output_format: 'markdown' (default) for a readable summary with p50/p95/p99,
+                       'prometheus' or 'openmetrics' for the raw text exposition.
+        
+    Returns:
+        The diagnostics in the requested format
+    """
+    if output_format in ("prometheus", "openmetrics"):
+        return metrics.render(output_format)
+    if output_format != "markdown":
+        return f"Error: Unsupported output format '{output_format}'. Use 'markdown', 'prometheus' or 'openmetrics'."
+    
+    histograms = metrics.histograms()
+    counters = metrics.counters()
+    if not histograms and not counters:
+        return "No diagnostics recorded yet."
+    
+    result = "# Server Diagnostics\n\n## Histograms\n"
+    result += "| Metric | Labels | Count | Mean | p50 | p95 | p99 |\n|---|---|---|---|---|---|---|\n"
+    for name, labels, histogram in histograms:
+        label_text = ", ".join(f"{k}={v}" for k, v in labels.items()) or "-"
+        mean = histogram.sum / histogram.count if histogram.count else 0.0
+        p50, p95, p99 = (histogram.quantile(q) for q in (0.5, 0.95, 0.99))
+        result += (
+            f"| {name} | {label_text} | {histogram.count} | {mean:.4g} "
+            f"| {p50:.4g} | {p95:.4g} | {p99:.4g} |\n"
+        )
+    
+    result += "\n## Counters\n| Metric | Labels | Value |\n|---|---|---|\n"
+    for name, labels, value in counters:
+        label_text = ", ".join(f"{k}={v}" for k, v in labels.items()) or "-"
+        result += f"| {name}_total | {label_text} | {value:g} |\n"
+
+    hedges: Dict[str, Dict[str, float]] = {}
+    for name, labels, value in counters:
+        if name == "podigee_hedged_requests" and labels.get("result") in ("primary", "hedge"):
+            hedges.setdefault(labels.get("endpoint", "-"), {})[labels["result"]] = value
+    if hedges:
+        result += "\n## Hedged Requests\n| Endpoint | Hedged | Hedge Won |\n|---|---|---|\n"
+        for endpoint, wins in sorted(hedges.items()):
+            hedged = wins.get("primary", 0) + wins.get("hedge", 0)
+            result += f"| {endpoint} | {hedged:g} | {wins.get('hedge', 0) / hedged:.0%} |\n"
+
+    # Quantiles are estimated from histogram buckets, so they are approximations
+    result += "\n*Latencies in seconds, sizes in bytes. Percentiles are estimated from histogram buckets.*\n"
+    return result
+
+# Resources: the same data as context an MCP client can read and subscribe to.
+# They are read through the client's response cache like the tools' requests.
+@mcp.resource(PODCASTS_URI, name="podcasts", mime_type=RESOURCE_MIME_TYPE)
+async def podcasts_resource() -> str:
+    """All podcasts associated with the API key."""
+    return await read_podcasts(get_client())
+
+@mcp.resource(PODCAST_URI, name="podcast", mime_type=RESOURCE_MIME_TYPE)
+async def podcast_resource(podcast_id: str) -> str:
+    """Metadata of a podcast."""
+    return await read_podcast(get_client(), podcast_id)
+
+@mcp.resource(EPISODE_ANALYTICS_URI, name="episode_analytics", mime_type=RESOURCE_MIME_TYPE)
+async def episode_analytics_resource(episode_id: str, window: str) -> str:
+    """Analytics of an episode. window: 'last-N-days', 'this-month' or 'YYYY-MM-DD..YYYY-MM-DD' (UTC days)."""
+    return await read_episode_analytics(get_client(), episode_id, window)
+
+enable_subscriptions(mcp._mcp_server, resource_subscriptions, get_client)
+
+# HTTP serving mode. The settings travel through environment variables because with
+# several workers uvicorn imports this module again in every worker process.
+HTTP_TRANSPORTS = ("sse", "streamable-http")
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+HTTP_POOL_SIZE = int(os.getenv("PODIGEE_HTTP_POOL_SIZE", "20"))
+
+def create_http_app():
+    """
+    Build the ASGI app for the SSE or streamable HTTP transport.
+    
+    Used as uvicorn factory, so it runs once per worker process. All MCP sessions
+    served by a worker share one PodigeeAPIClient (and with it the response cache,
+    the scheduler's rate limit and a pool of kept-alive connections to the API).
+    Requests carrying their own Podigee API key are routed to per-tenant clients,
+    other requests are rejected unless PODIGEE_MCP_SINGLE_TENANT=1.
+    
+    Returns:
+        Starlette application
+    """
+    global podigee_client, tenants
+    transport = os.getenv("PODIGEE_MCP_TRANSPORT", "streamable-http")
+    if transport not in HTTP_TRANSPORTS:
+        raise ValueError(f"Unsupported HTTP transport: {transport}")
+    
+    # Sessions live in the memory of one worker, so with several workers every
+    # request has to be self-contained
+    workers = int(os.getenv("PODIGEE_MCP_WORKERS", "1"))
+    if workers > 1:
+        mcp.settings.stateless_http = True
+    # Nor can a subscription outlive the request it was made in
+    resource_subscriptions.enabled = transport == "sse" or not mcp.settings.stateless_http
+    if not resource_subscriptions.enabled:
+        logger.info("Stateless HTTP: resource subscriptions are not offered")
+    
+    # FastMCP only accepts localhost Host headers by default (DNS rebinding protection)
+    allowed_hosts = [h.strip() for h in os.getenv("PODIGEE_MCP_ALLOWED_HOSTS", "").split(",") if h.strip()]
+    if allowed_hosts:
+        mcp.settings.transport_security = TransportSecuritySettings(allowed_hosts=allowed_hosts)
+    elif os.getenv("PODIGEE_MCP_HOST", "127.0.0.1") not in LOOPBACK_HOSTS:
+        logger.warning("PODIGEE_MCP_ALLOWED_HOSTS is not set, Host header validation is disabled")
+        mcp.settings.transport_security = TransportSecuritySettings(enable_dns_rebinding_protection=False)
+    
+    # Workers only see each other's cache hits through a cache outside their own memory
+    cache_backend = os.getenv("PODIGEE_CACHE_BACKEND") or ("sqlite" if workers > 1 else "memory")
+    podigee_client = PodigeeAPIClient(pool_size=HTTP_POOL_SIZE, cache=create_cache(cache_backend))
+    tenants = TenantRegistry(cache=podigee_client.cache)
+    if SINGLE_TENANT:
+        logger.info("Single-tenant mode: requests without an API key use PODIGEE_API_KEY")
+    logger.info(f"Serving MCP over {transport} (pid {os.getpid()})")
+    return mcp.sse_app() if transport == "sse" else mcp.streamable_http_app()
+
+def serve_http(transport: str, host: str, port: int, workers: int = 1) -> None:
+    """
+    Serve the MCP server over HTTP with uvicorn.
+    
+    Args:
+        transport: 'sse' or 'streamable-http'
+        host: Interface to bind to
+        port: Port to bind to
+        workers: Number of worker processes
+        
+    Raises:
+        ValueError: If the transport is unknown or SSE is combined with several workers
+    """
+    import uvicorn
+    
+    if transport not in HTTP_TRANSPORTS:
+        raise ValueError(f"Unsupported HTTP transport: {transport}")
+    if transport == "sse" and workers > 1:
+        # An SSE stream and the POSTs belonging to it must reach the same process
+        raise ValueError("The sse transport only supports a single worker, use streamable-http instead")
+    
+    os.environ["PODIGEE_MCP_TRANSPORT"] = transport
+    os.environ["PODIGEE_MCP_HOST"] = host
+    os.environ["PODIGEE_MCP_WORKERS"] = str(workers)
+    uvicorn.run(
+        "main:create_http_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        app_dir=os.path.dirname(os.path.abspath(__file__))
+    )
+
+def run_server(argv=None) -> int:
+    """
+    Command line entry point: stdio by default, or an HTTP transport.
+    """
+    parser = argparse.ArgumentParser(description="Podigee MCP server")
+    parser.add_argument("--transport", choices=("stdio",) + HTTP_TRANSPORTS,
+                        default=os.getenv("PODIGEE_MCP_TRANSPORT", "stdio"))
+    parser.add_argument("--host", default=os.getenv("PODIGEE_MCP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PODIGEE_MCP_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("PODIGEE_MCP_WORKERS", "1")))
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    
+    if args.transport == "stdio":
+        mcp.run()
+        return 0
+    try:
+        serve_http(args.transport, args.host, args.port, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    return 0
+
 # Run the server if executed directly
 if __name__ == "__main__":
-    mcp.run()
+    sys.exit(run_server())
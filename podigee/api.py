@@ -3,16 +3,59 @@ Podigee API client module for interacting with the Podigee API.
 """
 
 import os
+import time
+import asyncio
 import logging
-from typing import Optional, Dict, Any, Tuple, List
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, Tuple, List, AsyncIterator, Union
+from urllib.parse import urlencode
 
 import httpx
 
+from podigee.breaker import CircuitBreakers, default_breakers, note_stale
+from podigee.cassette import default_transport
+from podigee.cache import (
+    CacheEntry,
+    ResponseCache,
+    SQLiteResponseCache,
+    body_digest,
+    create_cache,
+    key_fingerprint,
+    make_cache_key,
+)
+from podigee.dates import SETTLED_CACHE_TTL, is_settled, last_days
+from podigee.deadline import DeadlineExceeded, gather_partial, within_deadline
+from podigee.hedging import HEDGE_ENABLED, HedgePolicy, default_hedging, run_hedged
+from podigee.metrics import endpoint_family, metrics
+from podigee.resample import SOURCE_GRANULARITY, resample_analytics
+from podigee.scheduler import TaskScheduler, default_scheduler
+from podigee.tracing import SPAN_KIND_CLIENT, traced, tracer
+
 logger = logging.getLogger(__name__)
 
 # Constants
 PODIGEE_API_BASE_URL = "https://app.podigee.com/api/v1"
+# Seconds to wait for each phase of an API request (connect, read, write, pool)
+DEFAULT_HTTP_TIMEOUT = float(os.getenv("PODIGEE_HTTP_TIMEOUT", "10"))
+# The episodes endpoint returns at most 50 episodes per request, across all podcasts,
+# and at most 10 per podcast when listing several with podcast_ids[]
+EPISODES_PAGE_SIZE = 50
+MAX_LIMIT_PER_PODCAST = 10
+# Number of recently returned responses whose cache key and digest are remembered
+RESPONSE_SOURCES_SIZE = 32
+
+
+def _header(response: httpx.Response, name: str) -> Optional[str]:
+    value = response.headers.get(name)
+    return value if isinstance(value, str) and value else None
+
+
+def _is_upstream_failure(error: httpx.HTTPError) -> bool:
+    # Server errors, timeouts and connection problems, not the client's own mistakes (4xx)
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
 
 
 class PodigeeAPIClient:
@@ -20,14 +63,60 @@ class PodigeeAPIClient:
     Client for interacting with the Podigee API.
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        scheduler: Optional[TaskScheduler] = None,
+        base_url: Optional[str] = None,
+        cache: Optional[Union[ResponseCache, SQLiteResponseCache]] = None,
+        pool_size: Optional[int] = None,
+        cache_namespace: Optional[str] = None,
+        breakers: Optional[CircuitBreakers] = None,
+        hedging: Optional[HedgePolicy] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
         """
         Initialize the Podigee API client.
         
         Args:
             api_key: Podigee API key (if not provided, will be read from PODIGEE_API_KEY env var)
+            scheduler: Scheduler all network calls go through (default: the process-wide
+                       scheduler, so every client shares one concurrency cap)
+            base_url: API base URL (if not provided, will be read from PODIGEE_API_BASE_URL env var,
+                      falling back to the public Podigee API). Used to point the client at a local
+                      stand-in for benchmarks.
+            cache: Response cache for GET requests (default: a new cache configured through the
+                   PODIGEE_CACHE_* env vars; a TTL of 0 disables caching)
+            pool_size: If set, keep one pooled HTTP connection pool of this size for the
+                       lifetime of the client instead of opening a connection per request.
+                       Used by the long-running HTTP server; close it with aclose().
+            cache_namespace: Separates this client's cache entries from those of other
+                             clients sharing the cache (default: derived from the API key,
+                             so accounts sharing a cache never see each other's responses)
+            breakers: Circuit breakers of the endpoint families (default: the process-wide
+                      breakers, as upstream health is the same for every account)
+            hedging: Policy for hedging slow requests (default: the process-wide policy
+                     if PODIGEE_HEDGE=1, otherwise requests are not hedged)
+            transport: httpx transport requests are sent through, e.g. a cassette's
+                       RecordingTransport or ReplayTransport (default: the cassette
+                       configured through PODIGEE_CASSETTE, if any, otherwise the network)
         """
         self.api_key = api_key or os.getenv("PODIGEE_API_KEY")
+        self.scheduler = scheduler or default_scheduler
+        self.base_url = (base_url or os.getenv("PODIGEE_API_BASE_URL") or PODIGEE_API_BASE_URL).rstrip("/")
+        self.cache = cache if cache is not None else create_cache()
+        namespace = cache_namespace or key_fingerprint(self.api_key or "")
+        self.cache_namespace = f"{namespace}@{self.base_url}"
+        self.pool_size = pool_size
+        self._pool: Optional[httpx.AsyncClient] = None
+        # Set by aclose, after which no pool is opened again
+        self._closed = False
+        self.breakers = breakers or default_breakers
+        self.hedging = hedging if hedging is not None else (default_hedging if HEDGE_ENABLED else None)
+        self.transport = transport if transport is not None else default_transport()
+        self.timeout = DEFAULT_HTTP_TIMEOUT
+        # id of a returned response -> (response, cache key, body digest)
+        self._sources: "OrderedDict[int, Tuple[Any, str, str]]" = OrderedDict()
         
         if not self.api_key:
             logger.warning("No Podigee API key provided. API calls will fail.")
@@ -51,20 +140,349 @@ class PodigeeAPIClient:
         Raises:
             ValueError: If the API request fails
         """
-        url = f"{PODIGEE_API_BASE_URL}/{endpoint}"
+        url = f"{self.base_url}/{endpoint}"
+        family = endpoint_family(endpoint)
+        cache_key = make_cache_key(self.cache_namespace, endpoint, params)
+        ttl = self._cache_ttl(params)
+        
+        with tracer.span("PodigeeAPIClient.get") as span:
+            if span.is_recording():
+                span.set_attribute("podigee.endpoint", family)
+                span.set_attribute("podigee.params_size", len(urlencode(params or {}, doseq=True)))
+            
+            entry = None
+            if self.cache.enabled:
+                entry = self.cache.lookup(cache_key)
+                result = "hit" if entry is not None and entry.is_fresh() else "miss"
+                metrics.inc("podigee_cache_requests", endpoint=family, result=result)
+                if span.is_recording():
+                    span.set_attribute("podigee.cache", result)
+                if result == "hit":
+                    return self._sourced(entry.data, cache_key, entry.digest)
+            
+            breaker = self.breakers.get(family)
+            if not breaker.allow():
+                # Fail fast instead of adding to the pile of requests waiting on a sick API
+                if entry is not None:
+                    return self._sourced(self._serve_stale(entry, family), cache_key, entry.digest)
+                raise ValueError(
+                    f"Podigee API is currently unavailable ({family} requests are failing), "
+                    f"retrying in {breaker.retry_in():.0f}s"
+                )
+            
+            async with self._http_client() as client:
+                try:
+                    # Go through the scheduler so concurrent tools share one bounded pool of slots.
+                    # Waiting for a slot and the request itself count against the tool's deadline.
+                    response = await within_deadline(
+                        self._request(client, url, family, params, self._conditional_headers(entry)),
+                        what=f"{family} request"
+                    )
+                    if response.status_code == 304 and entry is not None:
+                        # Not modified: the cached copy is current, nothing to download or decode
+                        self.cache.renew(cache_key, ttl)
+                        metrics.inc("podigee_cache_revalidations", endpoint=family, result="not_modified")
+                        return self._sourced(entry.data, cache_key, entry.digest)
+                    response.raise_for_status()
+                    metrics.observe("podigee_upstream_response_bytes", len(response.content), endpoint=family)
+                    return self._decode(response, cache_key, family, entry, ttl)
+                except DeadlineExceeded:
+                    if entry is not None:
+                        return self._sourced(self._serve_stale(entry, family), cache_key, entry.digest)
+                    raise
+                except httpx.HTTPError as e:
+                    logger.error(f"HTTP error occurred: {str(e)}")
+                    if entry is not None and _is_upstream_failure(e):
+                        return self._sourced(self._serve_stale(entry, family), cache_key, entry.digest)
+                    raise ValueError(f"Failed to fetch data from Podigee API: {str(e)}")
+                except Exception as e:
+                    logger.error(f"Error during Podigee API request: {str(e)}")
+                    raise ValueError(f"Error during API request: {str(e)}")
+    
+    async def post(
+        self,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """
+        Make a POST request to the Podigee API.
+        
+        Args:
+            endpoint: API endpoint path (without the base URL)
+            data: JSON body
+            params: Query parameters (e.g. of the /uploads endpoints)
+            
+        Returns:
+            JSON response from the API (an empty dict for an empty body)
+            
+        Raises:
+            ValueError: If the API request fails
+        """
+        return await self._write("POST", endpoint, data, params=params)
+    
+    async def put(
+        self,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Any:
+        """
+        Make a PUT request to the Podigee API.
+        
+        Args:
+            endpoint: API endpoint path (without the base URL)
+            data: JSON body
+            headers: Extra request headers (e.g. Idempotency-Key)
+            
+        Returns:
+            JSON response from the API (an empty dict for an empty body)
+            
+        Raises:
+            ValueError: If the API request fails
+        """
+        return await self._write("PUT", endpoint, data, headers)
+    
+    async def _write(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """
+        Send a request that changes data. Never cached, hedged or answered from stale data.
+        """
+        url = f"{self.base_url}/{endpoint}"
+        family = endpoint_family(endpoint)
+        
+        with tracer.span(f"PodigeeAPIClient.{method.lower()}") as span:
+            if span.is_recording():
+                span.set_attribute("podigee.endpoint", family)
+            
+            breaker = self.breakers.get(family)
+            if not breaker.allow():
+                raise ValueError(
+                    f"Podigee API is currently unavailable ({family} requests are failing), "
+                    f"retrying in {breaker.retry_in():.0f}s"
+                )
+            
+            async with self._http_client() as client:
+                try:
+                    response = await within_deadline(
+                        self.scheduler.run(self._send, client, url, family, params, headers, method, data),
+                        what=f"{family} request"
+                    )
+                    response.raise_for_status()
+                except DeadlineExceeded:
+                    raise
+                except httpx.HTTPError as e:
+                    logger.error(f"HTTP error occurred: {str(e)}")
+                    raise ValueError(f"Failed to send data to Podigee API: {str(e)}")
+                if not response.content:
+                    return {}
+                try:
+                    return response.json()
+                except ValueError as e:
+                    raise ValueError(f"Invalid response from Podigee API: {str(e)}")
+    
+    @staticmethod
+    def _serve_stale(entry: CacheEntry, family: str) -> Any:
+        """
+        Answer with an expired cache entry while the API is failing.
+        
+        The tool call is told through note_stale, so it can mark its result as stale.
+        """
+        logger.warning(f"Serving {family} from cache ({entry.age:.0f}s old), the Podigee API is failing")
+        note_stale(family, entry.age)
+        return entry.data
+    
+    def _cache_ttl(self, params: Optional[Dict[str, Any]]) -> Optional[float]:
+        """
+        Get the cache TTL of a response, None for the cache's default.
+        
+        Analytics of settled days no longer change, so they are kept for longer.
+        """
+        if params and is_settled(params.get("to")):
+            return max(self.cache.ttl, SETTLED_CACHE_TTL)
+        return None
+    
+    @staticmethod
+    def _conditional_headers(entry: Optional[CacheEntry]) -> Optional[Dict[str, str]]:
+        """
+        Get the headers that make a request conditional on the cached entry.
+        """
+        if entry is None:
+            return None
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers or None
+    
+    def _decode(
+        self,
+        response: httpx.Response,
+        cache_key: str,
+        family: str,
+        entry: Optional[CacheEntry],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Decode a response body and cache it with its validators.
+        
+        Without validators from the server, the body's digest tells whether it is the
+        same as the expired entry's; if so the entry's decoded data is reused, which
+        skips decoding and lets callers recognize the data they already aggregated.
+        """
+        etag = _header(response, "etag")
+        last_modified = _header(response, "last-modified")
+        digest = body_digest(response.content) if self.cache.enabled and isinstance(response.content, bytes) else None
+        
+        if entry is not None and digest is not None and digest == entry.digest:
+            if (etag, last_modified) == (entry.etag, entry.last_modified):
+                self.cache.renew(cache_key, ttl)
+            else:
+                self.cache.store(cache_key, entry.data, ttl, etag=etag, last_modified=last_modified, digest=digest)
+            metrics.inc("podigee_cache_revalidations", endpoint=family, result="unchanged")
+            return self._sourced(entry.data, cache_key, digest)
+        if entry is not None:
+            metrics.inc("podigee_cache_revalidations", endpoint=family, result="changed")
+        
+        with metrics.timer("podigee_json_decode_seconds", endpoint=family):
+            data = response.json()
+        self.cache.store(cache_key, data, ttl, etag=etag, last_modified=last_modified, digest=digest)
+        return self._sourced(data, cache_key, digest)
+    
+    def _sourced(self, data: Any, cache_key: str, digest: Optional[str]) -> Any:
+        # Remember which cached response data came from, for response_source
+        if digest is not None:
+            self._sources[id(data)] = (data, cache_key, digest)
+            self._sources.move_to_end(id(data))
+            while len(self._sources) > RESPONSE_SOURCES_SIZE:
+                self._sources.popitem(last=False)
+        return data
+    
+    def response_source(self, data: Any) -> Optional[Tuple[str, str]]:
+        """
+        Identify a response returned by get() by its cache key and body digest.
+        
+        The SQLite cache decodes a new copy of a response on every hit, so identity of
+        the returned data says nothing; the same key and digest mean the same content.
+        
+        Args:
+            data: Data returned by get() (or a method built on it)
+            
+        Returns:
+            Tuple of (cache_key, digest), or None if data is not one of the recently
+            returned responses or was not cached
+        """
+        # An entry holds its data, so no other object can have the same id meanwhile
+        source = self._sources.get(id(data))
+        if source is None:
+            return None
+        return source[1], source[2]
+    
+    @asynccontextmanager
+    async def _http_client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        Get the HTTP client for one request.
         
-        async with httpx.AsyncClient() as client:
+        Without a pool size each request gets its own short-lived client, which is
+        all a stdio session needs. With a pool size the connections (and their TLS
+        sessions) are kept alive and shared by all requests of this client. Once the
+        client is closed (e.g. a retired tenant whose last tool call is still running),
+        requests get short-lived clients again, so no pool is left open.
+        """
+        if self.pool_size is None or self._closed:
+            async with httpx.AsyncClient(transport=self.transport) as client:
+                yield client
+            return
+        
+        if self._pool is None:
+            self._pool = httpx.AsyncClient(transport=self.transport, limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size
+            ))
+        yield self._pool
+    
+    async def aclose(self) -> None:
+        """
+        Close the pooled HTTP connections, if any.
+        
+        The client stays usable, but without a pool.
+        """
+        self._closed = True
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await pool.aclose()
+    
+    async def _request(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        family: str,
+        params: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]]
+    ) -> httpx.Response:
+        """
+        Send a GET request through the scheduler, hedged if hedging is enabled.
+        """
+        if self.hedging is None:
+            return await self.scheduler.run(self._send, client, url, family, params, headers)
+        return await run_hedged(self.scheduler, self.hedging, family, self._send, client, url, family, params, headers)
+    
+    async def _send(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        family: str,
+        params: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]] = None,
+        method: str = "GET",
+        json: Optional[Dict[str, Any]] = None
+    ) -> httpx.Response:
+        """
+        Send a single request and record its upstream latency and status.
+        
+        Timing happens here rather than in get() and _write() so the time spent queueing
+        in the scheduler is not counted as upstream latency (and not in the HTTP span).
+        The outcome is reported to the endpoint family's circuit breaker for the same
+        reason. Only GET latencies feed the hedging policy, as writes are never hedged.
+        """
+        breaker = self.breakers.get(family)
+        with tracer.span(f"HTTP {method}", kind=SPAN_KIND_CLIENT) as span:
+            if span.is_recording():
+                span.set_attribute("http.request.method", method)
+                span.set_attribute("podigee.endpoint", family)
+            started = time.perf_counter()
             try:
-                response = await client.get(url, headers=self.headers, params=params)
-                response.raise_for_status()
-                return response.json()
+                request_headers = dict(self.headers, **headers) if headers else self.headers
+                if method == "GET":
+                    response = await client.get(url, headers=request_headers, params=params, timeout=self.timeout)
+                else:
+                    response = await client.request(
+                        method, url, headers=request_headers, params=params, json=json, timeout=self.timeout
+                    )
             except httpx.HTTPError as e:
-                logger.error(f"HTTP error occurred: {str(e)}")
-                raise ValueError(f"Failed to fetch data from Podigee API: {str(e)}")
-            except Exception as e:
-                logger.error(f"Error during Podigee API request: {str(e)}")
-                raise ValueError(f"Error during API request: {str(e)}")
+                metrics.inc("podigee_upstream_requests", endpoint=family, status="error")
+                breaker.record(not _is_upstream_failure(e))
+                raise
+            latency = time.perf_counter() - started
+            status = response.status_code
+            upstream_ok = not (isinstance(status, int) and status >= 500)
+            breaker.record(upstream_ok, latency)
+            if upstream_ok and method == "GET" and self.hedging is not None:
+                self.hedging.observe(family, latency)
+            metrics.observe("podigee_upstream_latency_seconds", latency, endpoint=family)
+            metrics.inc("podigee_upstream_requests", endpoint=family, status=str(response.status_code))
+            if span.is_recording():
+                span.set_attribute("http.response.status_code", response.status_code)
+            return response
     
+    @traced()
     async def list_podcasts(self) -> Dict[str, Any]:
         """
         Get a list of all podcasts associated with the API key.
@@ -84,11 +502,17 @@ class PodigeeAPIClient:
         Returns:
             Tuple of (from_date, to_date) in YYYY-MM-DD format
         """
-        to_date = datetime.now().strftime("%Y-%m-%d")
-        from_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-        return from_date, to_date
+        window = last_days(days)
+        return window.from_date, window.to_date
     
-    async def get_podcast_analytics(self, podcast_id: int, from_date: Optional[str] = None, to_date: Optional[str] = None) -> Dict[str, Any]:
+    @traced()
+    async def get_podcast_analytics(
+        self,
+        podcast_id: int,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        granularity: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Get analytics data for a podcast.
         
@@ -96,6 +520,8 @@ class PodigeeAPIClient:
             podcast_id: ID of the podcast to fetch analytics for
             from_date: Start date in YYYY-MM-DD format (default: 30 days ago)
             to_date: End date in YYYY-MM-DD format (default: today)
+            granularity: Aggregation granularity ('hour', 'day', 'week', 'month').
+                         If not given, the API picks one based on the time interval.
             
         Returns:
             Analytics data
@@ -107,9 +533,12 @@ class PodigeeAPIClient:
             "from": from_date,
             "to": to_date
         }
+        if granularity:
+            params["granularity"] = granularity
         
         return await self.get(f"podcasts/{podcast_id}/analytics", params)
     
+    @traced()
     async def get_podcast_overview(self, podcast_id: int, from_date: Optional[str] = None, to_date: Optional[str] = None) -> Dict[str, Any]:
         """
         Get overview data for a podcast.
@@ -132,6 +561,7 @@ class PodigeeAPIClient:
         
         return await self.get(f"podcasts/{podcast_id}/overview", params)
     
+    @traced()
     async def get_podcast_listeners(self, podcast_id: int) -> Dict[str, Any]:
         """
         Get listeners data for a podcast.
@@ -144,12 +574,14 @@ class PodigeeAPIClient:
         """
         return await self.get(f"podcasts/{podcast_id}/analytics/listeners")
     
+    @traced()
     async def get_podcast_analytics_summary(
         self, 
         podcast_id: Optional[int] = None, 
         from_date: Optional[str] = None,
-        to_date: Optional[str] = None
-    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        to_date: Optional[str] = None,
+        partial: bool = False
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
         """
         Get a summary of podcast analytics and overview data.
         
@@ -158,6 +590,8 @@ class PodigeeAPIClient:
                       will fetch analytics for the first podcast associated with the API key.
             from_date: Start date in YYYY-MM-DD format (default: 30 days ago)
             to_date: End date in YYYY-MM-DD format (default: today)
+            partial: Return None for a part that misses the tool call's deadline instead
+                     of failing as a whole
             
         Returns:
             Tuple of (analytics_data, overview_data)
@@ -174,11 +608,18 @@ class PodigeeAPIClient:
             logger.info(f"No podcast ID provided, using first podcast from account: {podcast_id}")
         
         # Fetch analytics and overview data
+        if partial:
+            analytics_data, overview_data = await gather_partial(
+                self.get_podcast_analytics(podcast_id, from_date, to_date),
+                self.get_podcast_overview(podcast_id, from_date, to_date),
+            )
+            return analytics_data, overview_data
         analytics_data = await self.get_podcast_analytics(podcast_id, from_date, to_date)
         overview_data = await self.get_podcast_overview(podcast_id, from_date, to_date)
         
         return analytics_data, overview_data
 
+    @traced()
     async def get_episode_analytics(
         self, 
         episode_id: int, 
@@ -199,6 +640,8 @@ class PodigeeAPIClient:
                                    Cannot be used with 'from_date'/'to_date'.
             granularity: Aggregation granularity ('hour', 'day', 'week', 'month'). 
                          If not given, it will be calculated based on the time interval.
+                         Weeks (ISO, starting Monday) and months are resampled locally
+                         from daily data.
 
         Returns:
             Episode analytics data.
@@ -217,12 +660,19 @@ class PodigeeAPIClient:
         elif days_since_published is not None:
             params["days_since_published"] = days_since_published
         
-        if granularity:
-            params["granularity"] = granularity
+        # Weeks and months are rolled up locally from daily data, so that all views
+        # of an episode share one cached upstream response
+        source_granularity = SOURCE_GRANULARITY.get(granularity, granularity)
+        if source_granularity:
+            params["granularity"] = source_granularity
 
         endpoint = f"episodes/{episode_id}/analytics"
-        return await self.get(endpoint, params)
+        analytics_data = await self.get(endpoint, params)
+        if source_granularity != granularity:
+            return resample_analytics(analytics_data, granularity)
+        return analytics_data
 
+    @traced()
     async def list_episodes(
         self,
         podcast_id: Optional[int] = None,
@@ -287,6 +737,145 @@ class PodigeeAPIClient:
         # The API returns the list directly, not nested in a dict
         return await self.get("episodes", params)
         
+    @traced()
+    async def list_episodes_by_podcast(
+        self,
+        podcast_ids: List[int],
+        limit_per_podcast: int,
+        partial: bool = False,
+        **filters: Any
+    ) -> Dict[int, Optional[List[Dict[str, Any]]]]:
+        """
+        Get the first episodes of each of several podcasts.
+        
+        With up to MAX_LIMIT_PER_PODCAST episodes per podcast, as many podcasts as fit
+        into one page are listed with a single podcast_ids[] request using
+        limit_per_podcast; larger sets are split into several such requests, sent
+        concurrently. The API caps limit_per_podcast, so with more episodes per podcast
+        each podcast is paged through on its own, concurrently with the others.
+        
+        Args:
+            podcast_ids: IDs of the podcasts
+            limit_per_podcast: Max episodes per podcast
+            partial: Give None for podcasts whose request misses the tool call's
+                     deadline instead of failing as a whole
+            **filters: Further list_episodes filters (published, sort_by, search, ...)
+            
+        Returns:
+            Podcast ID -> its episodes, in the order of podcast_ids
+            
+        Raises:
+            ValueError: If limit_per_podcast is not positive or an API request fails
+        """
+        if limit_per_podcast < 1:
+            raise ValueError("limit_per_podcast must be at least 1")
+        podcast_ids = list(dict.fromkeys(podcast_ids))
+        
+        if limit_per_podcast > MAX_LIMIT_PER_PODCAST:
+            groups = [[podcast_id] for podcast_id in podcast_ids]
+            requests = [self._page_podcast_episodes(podcast_id, limit_per_podcast, filters) for podcast_id in podcast_ids]
+        else:
+            per_request = EPISODES_PAGE_SIZE // limit_per_podcast
+            groups = [podcast_ids[i:i + per_request] for i in range(0, len(podcast_ids), per_request)]
+            requests = [
+                self.list_episodes(
+                    podcast_ids=group,
+                    limit_per_podcast=limit_per_podcast,
+                    limit=limit_per_podcast * len(group),
+                    **filters
+                )
+                for group in groups
+            ]
+        pages = await gather_partial(*requests) if partial else await asyncio.gather(*requests)
+        
+        episodes: Dict[int, Optional[List[Dict[str, Any]]]] = {}
+        for group, page in zip(groups, pages):
+            for podcast_id in group:
+                episodes[podcast_id] = None if page is None else []
+            for episode in page or ():
+                owner = group[0] if len(group) == 1 else episode.get("podcast_id")
+                podcast_episodes = episodes.get(owner)
+                if podcast_episodes is not None and len(podcast_episodes) < limit_per_podcast:
+                    podcast_episodes.append(episode)
+        return episodes
+    
+    async def _page_podcast_episodes(
+        self,
+        podcast_id: int,
+        limit: int,
+        filters: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        episodes: List[Dict[str, Any]] = []
+        while len(episodes) < limit:
+            page = await self.list_episodes(
+                podcast_id=podcast_id,
+                limit=min(EPISODES_PAGE_SIZE, limit - len(episodes)),
+                offset=len(episodes),
+                **filters
+            )
+            episodes.extend(page)
+            if len(page) < EPISODES_PAGE_SIZE:
+                break
+        return episodes
+    
+    @traced()
+    async def get_episode(self, episode_id: int) -> Dict[str, Any]:
+        """
+        Get the metadata of an episode.
+        
+        Args:
+            episode_id: ID of the episode
+            
+        Returns:
+            Episode data
+        """
+        return await self.get(f"episodes/{episode_id}")
+    
+    @traced()
+    async def update_episode(
+        self,
+        episode_id: int,
+        fields: Dict[str, Any],
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Update the metadata of an episode and drop the cached responses it appears in.
+        
+        Args:
+            episode_id: ID of the episode
+            fields: Fields to change, e.g. {"title": "New title"}
+            idempotency_key: Sent as Idempotency-Key header, so a retried request is
+                             applied only once
+            
+        Returns:
+            The updated episode
+            
+        Raises:
+            ValueError: If the API request fails
+        """
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+        episode = await self.put(f"episodes/{episode_id}", fields, headers)
+        podcast_id = episode.get("podcast_id") if isinstance(episode, dict) else None
+        self.invalidate_episode(episode_id, podcast_id)
+        return episode
+    
+    def invalidate_episode(self, episode_id: int, podcast_id: Optional[int] = None) -> int:
+        """
+        Drop the cached responses that contain an episode's metadata.
+        
+        Args:
+            episode_id: ID of the episode
+            podcast_id: ID of its podcast, if known (its batch analytics list titles)
+            
+        Returns:
+            Number of dropped cache entries
+        """
+        endpoints = [f"episodes/{episode_id}?", "episodes?"]
+        if podcast_id is not None:
+            endpoints.append(f"podcasts/{podcast_id}/analytics/episodes?")
+        return sum(self.cache.invalidate(f"{self.cache_namespace}/{endpoint}") for endpoint in endpoints)
+    
+    @traced()
     async def get_podcast_details(
         self, 
         podcast_id: int,
@@ -313,6 +902,7 @@ class PodigeeAPIClient:
         # The API returns the podcast data directly, not in a list
         return response 
         
+    @traced()
     async def get_podcast_episodes_analytics(
         self,
         podcast_id: int,
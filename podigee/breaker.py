@@ -0,0 +1,213 @@
+"""
+Circuit breakers for the Podigee API and serving stale cached data while it is down.
+
+When the Podigee API is erroring or very slow, waiting for every request to time out
+ties up scheduler slots and leaves agents hanging. A breaker per endpoint family counts
+upstream failures (5xx responses, timeouts, connection errors) and slow responses in
+a sliding window of recent calls. Once too many of them fail, the circuit opens and
+requests fail fast, or are answered from the last cached response marked as stale. After
+a cool-down a single probe request is let through; its outcome closes the circuit or
+opens it again.
+"""
+
+import os
+import time
+import logging
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from podigee.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Constants
+BREAKER_FAILURES = int(os.getenv("PODIGEE_BREAKER_FAILURES", "5"))
+BREAKER_WINDOW = int(os.getenv("PODIGEE_BREAKER_WINDOW", "20"))
+BREAKER_SLOW_SECONDS = float(os.getenv("PODIGEE_BREAKER_SLOW_SECONDS", "5"))
+BREAKER_OPEN_SECONDS = float(os.getenv("PODIGEE_BREAKER_OPEN_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Breaker of one endpoint family. Used from the event loop thread only.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURES,
+        window: int = BREAKER_WINDOW,
+        slow_seconds: float = BREAKER_SLOW_SECONDS,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+        name: str = ""
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Failed or slow calls among the last 'window' calls that
+                               open the circuit (0 disables the breaker)
+            window: Number of recent calls considered
+            slow_seconds: Calls taking at least this long count as failed
+            open_seconds: Seconds the circuit stays open before a probe is let through
+            name: Endpoint family, for logs and metrics
+        """
+        self.failure_threshold = failure_threshold
+        self.slow_seconds = slow_seconds
+        self.open_seconds = open_seconds
+        self.name = name
+        self.state = CLOSED
+        self._results: Deque[bool] = deque(maxlen=max(window, 1))
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            logger.log(
+                logging.WARNING if state == OPEN else logging.INFO,
+                f"Circuit for {self.name or 'Podigee API'} is now {state}"
+            )
+            metrics.inc("podigee_circuit_transitions", endpoint=self.name, state=state)
+        self.state = state
+
+    def retry_in(self) -> float:
+        """
+        Seconds until the next probe request is let through.
+        """
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        """
+        Whether a request may be sent now.
+
+        In the half-open state only one probe is in flight at a time; a probe that never
+        reported back (e.g. a cancelled call) is replaced after open_seconds.
+        """
+        if self.failure_threshold < 1 or self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now - self._opened_at < self.open_seconds:
+                return False
+            self._transition(HALF_OPEN)
+        if self._probe_started is not None and now - self._probe_started < self.open_seconds:
+            return False
+        self._probe_started = now
+        return True
+
+    def record(self, ok: bool, latency: float = 0.0) -> None:
+        """
+        Record the outcome of a request.
+
+        Args:
+            ok: False for upstream failures (5xx, timeouts, connection errors)
+            latency: Upstream latency in seconds
+        """
+        if self.failure_threshold < 1:
+            return
+        failed = not ok or latency >= self.slow_seconds
+        if self.state == HALF_OPEN:
+            self._probe_started = None
+            if failed:
+                self._open()
+            else:
+                self._results.clear()
+                self._transition(CLOSED)
+            return
+        if self.state == OPEN:
+            # Sent before the circuit opened
+            return
+        self._results.append(failed)
+        if sum(self._results) >= self.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._results.clear()
+        self._transition(OPEN)
+
+
+class CircuitBreakers:
+    """
+    One circuit breaker per endpoint family, created on first use.
+    """
+
+    def __init__(self, **settings: float):
+        """
+        Args:
+            settings: Keyword arguments of every CircuitBreaker
+        """
+        self.settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, family: str) -> CircuitBreaker:
+        breaker = self._breakers.get(family)
+        if breaker is None:
+            breaker = self._breakers[family] = CircuitBreaker(name=family, **self.settings)
+        return breaker
+
+    def states(self) -> Dict[str, str]:
+        return {family: breaker.state for family, breaker in self._breakers.items()}
+
+
+# Upstream health is the same for every account, so all clients share the breakers
+default_breakers = CircuitBreakers()
+
+
+# Stale responses served during the current tool call, as (endpoint family, age in seconds)
+_stale_responses: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "podigee_stale_responses", default=None
+)
+
+
+@contextmanager
+def stale_scope() -> Iterator[List[Tuple[str, float]]]:
+    """
+    Collect the stale responses served inside the block (e.g. one tool call).
+
+    Tasks started inside the block (asyncio.gather) report into the same list.
+    """
+    served: List[Tuple[str, float]] = []
+    token = _stale_responses.set(served)
+    try:
+        yield served
+    finally:
+        _stale_responses.reset(token)
+
+
+def note_stale(family: str, age: float) -> None:
+    """
+    Report that a stale cached response was served instead of a live one.
+    """
+    metrics.inc("podigee_stale_responses", endpoint=family)
+    served = _stale_responses.get()
+    if served is not None:
+        served.append((family, age))
+
+
+def stale_notice(served: List[Tuple[str, float]]) -> str:
+    """
+    Build the note appended to a tool result that used stale data.
+
+    Args:
+        served: Stale responses collected by stale_scope
+
+    Returns:
+        Markdown note
+    """
+    oldest = max(age for _, age in served)
+    if oldest < 120:
+        age_text = f"{oldest:.0f} seconds"
+    elif oldest < 7200:
+        age_text = f"{oldest / 60:.0f} minutes"
+    else:
+        age_text = f"{oldest / 3600:.1f} hours"
+    return (
+        "\n\n> **Stale data:** The Podigee API is currently unavailable, so this answer uses "
+        f"cached data up to {age_text} old. It may not reflect the latest numbers."
+    )
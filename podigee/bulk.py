@@ -0,0 +1,218 @@
+"""
+Bulk updates of episode metadata.
+
+A batch is a list of patches like {"id": 123, "title": "New title"}. Each episode is
+read first and only the fields that actually differ are sent with PUT /episodes/{id},
+so running the same batch twice changes nothing the second time. A dry run stops
+after the read and reports the diff. The patches run concurrently through the
+client's scheduler, so its concurrency cap and rate limit apply to the batch.
+
+With an idempotency key, each PUT carries an Idempotency-Key header derived from it,
+and a batch that completed without failures is remembered: sending it again with the
+same key returns the recorded results instead of doing anything.
+"""
+
+import os
+import json
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from podigee.cache import make_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Constants
+BULK_MAX_UPDATES = int(os.getenv("PODIGEE_BULK_MAX_UPDATES", "500"))
+BULK_REMEMBERED_BATCHES = 256
+MAX_VALUE_LENGTH = 60
+
+STATUS_TITLES = {
+    "updated": "updated",
+    "would_update": "would update",
+    "unchanged": "unchanged",
+    "failed": "failed",
+}
+
+
+def parse_updates(updates: Any, max_updates: int = BULK_MAX_UPDATES) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    Validate a batch of episode patches.
+
+    Args:
+        updates: List of dicts with an 'id' and the fields to change, or that list as
+                 a JSON string
+        max_updates: Maximum number of patches in one batch
+
+    Returns:
+        List of (episode ID, fields to change)
+
+    Raises:
+        ValueError: If the batch is malformed, too large or names an episode twice
+    """
+    if isinstance(updates, str):
+        try:
+            updates = json.loads(updates)
+        except ValueError as e:
+            raise ValueError(f"updates is not valid JSON: {str(e)}")
+    if not isinstance(updates, list) or not updates:
+        raise ValueError("updates must be a non-empty list of objects with an 'id' and the fields to change")
+    if len(updates) > max_updates:
+        raise ValueError(f"At most {max_updates} updates are allowed per batch, got {len(updates)}")
+
+    parsed: List[Tuple[int, Dict[str, Any]]] = []
+    seen = set()
+    for i, update in enumerate(updates):
+        if not isinstance(update, dict) or "id" not in update:
+            raise ValueError(f"Update {i + 1} has no episode 'id'")
+        try:
+            episode_id = int(update["id"])
+        except (TypeError, ValueError):
+            raise ValueError(f"Update {i + 1} has an invalid episode id '{update['id']}'")
+        if episode_id in seen:
+            raise ValueError(f"Episode {episode_id} is updated more than once")
+        seen.add(episode_id)
+        fields = {field: value for field, value in update.items() if field != "id"}
+        if not fields:
+            raise ValueError(f"Update of episode {episode_id} changes no fields")
+        parsed.append((episode_id, fields))
+    return parsed
+
+
+def diff_fields(current: Dict[str, Any], fields: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+    """
+    Get the fields whose value differs from the current one.
+
+    Returns:
+        Field -> (current value, new value)
+    """
+    return {field: (current.get(field), value) for field, value in fields.items() if current.get(field) != value}
+
+
+class BulkUpdater:
+    """
+    Applies batches of episode patches and remembers completed idempotent batches.
+    """
+
+    def __init__(self, remembered: int = BULK_REMEMBERED_BATCHES):
+        """
+        Args:
+            remembered: Number of completed batches remembered by idempotency key
+        """
+        self.remembered = remembered
+        # account/key -> (fingerprint of the batch, results)
+        self._batches: "OrderedDict[str, Tuple[str, List[Dict[str, Any]]]]" = OrderedDict()
+
+    async def _update(
+        self,
+        client: Any,
+        episode_id: int,
+        fields: Dict[str, Any],
+        dry_run: bool,
+        idempotency_key: Optional[str]
+    ) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"id": episode_id, "changes": {}}
+        try:
+            if not dry_run:
+                # Diff against the current episode, not a copy cached before someone else's edit
+                client.cache.invalidate(make_cache_key(client.cache_namespace, f"episodes/{episode_id}"))
+            current = await client.get_episode(episode_id)
+            result["changes"] = diff_fields(current, fields)
+            if not result["changes"]:
+                result["status"] = "unchanged"
+            elif dry_run:
+                result["status"] = "would_update"
+            else:
+                changed = {field: fields[field] for field in result["changes"]}
+                key = f"{idempotency_key}:{episode_id}" if idempotency_key else None
+                result["episode"] = await client.update_episode(episode_id, changed, key)
+                result["status"] = "updated"
+        except ValueError as e:
+            result["status"] = "failed"
+            result["error"] = str(e)
+        return result
+
+    async def run(
+        self,
+        client: Any,
+        updates: Any,
+        dry_run: bool = False,
+        idempotency_key: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Apply a batch of episode patches.
+
+        Args:
+            client: PodigeeAPIClient to update with
+            updates: Patches, see parse_updates
+            dry_run: Only report what would change
+            idempotency_key: Key identifying the batch, see the module docstring
+
+        Returns:
+            One result per patch, in order, with 'id', 'status' ('updated',
+            'would_update', 'unchanged' or 'failed'), 'changes' (field -> (old, new)),
+            and 'error' for failed ones
+
+        Raises:
+            ValueError: If the batch is malformed, or the idempotency key was used
+                        for a different batch
+        """
+        parsed = parse_updates(updates)
+        batch_key = fingerprint = None
+        if idempotency_key and not dry_run:
+            batch_key = f"{client.cache_namespace}/{idempotency_key}"
+            fingerprint = hashlib.sha256(json.dumps(parsed, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+            remembered = self._batches.get(batch_key)
+            if remembered is not None:
+                if remembered[0] != fingerprint:
+                    raise ValueError(f"Idempotency key '{idempotency_key}' was already used for a different batch")
+                logger.info(f"Batch {idempotency_key} was already applied, returning its results")
+                return remembered[1]
+
+        results = await asyncio.gather(
+            *(self._update(client, episode_id, fields, dry_run, idempotency_key) for episode_id, fields in parsed)
+        )
+        if batch_key is not None and all(result["status"] != "failed" for result in results):
+            self._batches[batch_key] = (fingerprint, results)
+            while len(self._batches) > self.remembered:
+                self._batches.popitem(last=False)
+        return results
+
+
+def _format_value(value: Any) -> str:
+    text = json.dumps(value, ensure_ascii=False) if not isinstance(value, str) else f'"{value}"'
+    text = text.replace("|", "\\|").replace("\n", " ")
+    return text if len(text) <= MAX_VALUE_LENGTH else text[:MAX_VALUE_LENGTH - 1] + "…"
+
+
+def render_bulk_results(results: List[Dict[str, Any]], dry_run: bool) -> str:
+    """
+    Render the results of a batch as a markdown table.
+
+    Args:
+        results: Result of BulkUpdater.run
+        dry_run: Whether the batch was a dry run
+
+    Returns:
+        Formatted results
+    """
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+
+    summary = f"# Episode Updates{' (dry run)' if dry_run else ''}\n\n"
+    summary += ", ".join(f"{STATUS_TITLES[status].capitalize()}: {counts[status]}"
+                         for status in STATUS_TITLES if status in counts) + "\n\n"
+    summary += "| Episode | Result | Changes |\n|---|---|---|\n"
+    for result in results:
+        if result["status"] == "failed":
+            details = result["error"].replace("|", "\\|")
+        else:
+            details = "<br>".join(f"{field}: {_format_value(old)} → {_format_value(new)}"
+                                  for field, (old, new) in result["changes"].items()) or "-"
+        summary += f"| {result['id']} | {STATUS_TITLES[result['status']]} | {details} |\n"
+    if dry_run and counts.get("would_update"):
+        summary += "\nNothing was changed. Run again with dry_run=false to apply these updates.\n"
+    return summary
@@ -0,0 +1,437 @@
+"""
+Response cache for the Podigee API client.
+
+GET responses are cached per request URL (endpoint plus sorted query parameters) for a
+short TTL. In HTTP serving mode one client, and therefore one cache, is shared by every
+connected MCP client, so repeated questions about the same podcast don't go upstream.
+
+Two backends are available: an in-memory cache private to the process, and a SQLite
+database in WAL mode that several processes (uvicorn workers, or separate stdio
+servers) of the same user can share, so a response fetched by one worker is a cache
+hit in all others. The database holds every account's responses, so it is private to
+that user (see podigee.storage).
+
+Entries keep the response's validators (ETag, Last-Modified) and a digest of its body,
+so an expired entry can be revalidated with a conditional request instead of being
+downloaded and decoded again.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Union
+from urllib.parse import urlencode
+
+from podigee.storage import DEFAULT_DATA_DIR, private_file
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_CACHE_TTL = float(os.getenv("PODIGEE_CACHE_TTL", "60"))
+DEFAULT_CACHE_MAX_ENTRIES = int(os.getenv("PODIGEE_CACHE_MAX_ENTRIES", "1024"))
+DEFAULT_CACHE_BACKEND = os.getenv("PODIGEE_CACHE_BACKEND", "memory")
+DEFAULT_CACHE_PATH = os.getenv("PODIGEE_CACHE_PATH") or os.path.join(DEFAULT_DATA_DIR, "cache.sqlite3")
+CACHE_BACKENDS = ("memory", "sqlite")
+
+
+def key_fingerprint(api_key: str) -> str:
+    """
+    Derive a short, stable fingerprint from an API key.
+
+    Used wherever an account has to be told apart (cache namespaces, tenant ids)
+    without the key itself ending up in a cache file, log line or metric label.
+
+    Args:
+        api_key: Podigee API key
+
+    Returns:
+        Short hex digest
+    """
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def make_cache_key(namespace: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build a cache key that is stable regardless of the order of the query parameters.
+
+    Args:
+        namespace: Prefix separating clients that must not share entries (e.g. base URL)
+        endpoint: API endpoint path (without the base URL)
+        params: Optional query parameters
+
+    Returns:
+        Cache key string
+    """
+    query = urlencode(sorted((params or {}).items()), doseq=True)
+    return f"{namespace}/{endpoint.strip('/')}?{query}"
+
+
+def body_digest(body: bytes) -> str:
+    """
+    Digest of a raw response body, to recognize unchanged responses without validators.
+    """
+    return hashlib.sha256(body).hexdigest()
+
+
+class CacheEntry:
+    """
+    A cached response body, its lifetime and what is needed to revalidate it.
+    """
+    __slots__ = ("data", "stored_at", "expires_at", "etag", "last_modified", "digest")
+
+    def __init__(
+        self,
+        data: Any,
+        stored_at: float,
+        expires_at: float,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        digest: Optional[str] = None
+    ):
+        self.data = data
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (time.time() if now is None else now) < self.expires_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class ResponseCache:
+    """
+    Thread-safe in-memory LRU cache with per-entry TTL.
+
+    Expired entries are not dropped on lookup, only overwritten or evicted, so callers
+    can still fall back to the last known response when they need to.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_CACHE_TTL, max_entries: int = DEFAULT_CACHE_MAX_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Default time to live of entries in seconds (0 disables caching)
+            max_entries: Maximum number of entries before the least recently used is evicted
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """
+        Get the entry for a key, fresh or expired.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The entry, or None if the key was never stored or has been evicted
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def store(
+        self,
+        key: str,
+        data: Any,
+        ttl: Optional[float] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        digest: Optional[str] = None
+    ) -> None:
+        """
+        Store a response body.
+
+        Args:
+            key: Cache key
+            data: Decoded response body
+            ttl: Time to live in seconds (default: the cache's TTL)
+            etag: ETag header of the response
+            last_modified: Last-Modified header of the response
+            digest: body_digest of the raw response body
+        """
+        if not self.enabled:
+            return
+        now = time.time()
+        entry = CacheEntry(data, now, now + (self.ttl if ttl is None else ttl), etag, last_modified, digest)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def renew(self, key: str, ttl: Optional[float] = None) -> None:
+        """
+        Start a new lifetime for an entry that was revalidated.
+
+        Args:
+            key: Cache key
+            ttl: Time to live in seconds (default: the cache's TTL)
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stored_at, entry.expires_at = now, now + (self.ttl if ttl is None else ttl)
+
+    def invalidate(self, prefix: str) -> int:
+        """
+        Drop all entries whose key starts with the prefix.
+
+        Args:
+            prefix: Key prefix, e.g. the key of an endpoint without query parameters
+
+        Returns:
+            Number of dropped entries
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteResponseCache:
+    """
+    Response cache stored in a SQLite database in WAL mode, shared between processes.
+
+    Has the same interface as ResponseCache. WAL lets readers in all workers proceed
+    while one of them writes. Entries are evicted oldest first rather than least
+    recently used, so that cache hits stay read-only.
+    """
+
+    # Check the entry limit every this many stores rather than on each one
+    PRUNE_INTERVAL = 64
+    VALIDATOR_COLUMNS = ("etag", "last_modified", "digest")
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl: float = DEFAULT_CACHE_TTL,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path: Path of the SQLite database (created if missing, readable only by
+                  the current user)
+            ttl: Default time to live of entries in seconds (0 disables caching)
+            max_entries: Maximum number of entries before the oldest are evicted
+
+        Raises:
+            ValueError: If the database file can't be created or belongs to another user
+        """
+        # SQLite gives its -wal and -shm files the permissions of the database file
+        self.path = private_file(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._stores = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # A connection must not be used across fork(), so every worker opens its own
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, data TEXT NOT NULL, stored_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            # Validator columns were added later, databases of older versions lack them
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(responses)")}
+            for column in self.VALIDATOR_COLUMNS:
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE responses ADD COLUMN {column} TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at)")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """
+        Get the entry for a key, fresh or expired.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The entry, or None if the key was never stored, has been evicted or
+            the database can't be read
+        """
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT data, stored_at, expires_at, etag, last_modified, digest FROM responses WHERE key = ?",
+                    (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            # The cache is an optimization, a broken database must not fail requests
+            logger.warning(f"Response cache lookup failed: {str(e)}")
+            return None
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), *row[1:])
+
+    def store(
+        self,
+        key: str,
+        data: Any,
+        ttl: Optional[float] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        digest: Optional[str] = None
+    ) -> None:
+        """
+        Store a response body.
+
+        Args:
+            key: Cache key
+            data: Decoded response body (must be JSON serializable)
+            ttl: Time to live in seconds (default: the cache's TTL)
+            etag: ETag header of the response
+            last_modified: Last-Modified header of the response
+            digest: body_digest of the raw response body
+        """
+        if not self.enabled:
+            return
+        now = time.time()
+        payload = json.dumps(data, separators=(",", ":"))
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, data, stored_at, expires_at, etag, last_modified, digest) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, payload, now, now + (self.ttl if ttl is None else ttl), etag, last_modified, digest)
+                )
+                self._stores += 1
+                if self._stores % self.PRUNE_INTERVAL == 0:
+                    self._prune(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache store failed: {str(e)}")
+
+    def renew(self, key: str, ttl: Optional[float] = None) -> None:
+        """
+        Start a new lifetime for an entry that was revalidated.
+
+        Args:
+            key: Cache key
+            ttl: Time to live in seconds (default: the cache's TTL)
+        """
+        now = time.time()
+        try:
+            with self._lock:
+                self._connection().execute(
+                    "UPDATE responses SET stored_at = ?, expires_at = ? WHERE key = ?",
+                    (now, now + (self.ttl if ttl is None else ttl), key)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache renew failed: {str(e)}")
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def invalidate(self, prefix: str) -> int:
+        """
+        Drop all entries whose key starts with the prefix.
+
+        Args:
+            prefix: Key prefix, e.g. the key of an endpoint without query parameters
+
+        Returns:
+            Number of dropped entries (0 if the database can't be written)
+        """
+        # substr() rather than LIKE, which would treat _ and % in keys as wildcards
+        try:
+            with self._lock:
+                cursor = self._connection().execute(
+                    "DELETE FROM responses WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+                )
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            # Called after writes that already succeeded, which must not be reported as failed
+            logger.warning(f"Response cache invalidation of {prefix} failed: {str(e)}")
+            return 0
+
+    def clear(self) -> None:
+        try:
+            with self._lock:
+                self._connection().execute("DELETE FROM responses")
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache clear failed: {str(e)}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+def create_cache(
+    backend: str = DEFAULT_CACHE_BACKEND,
+    path: Optional[str] = None,
+    ttl: float = DEFAULT_CACHE_TTL,
+    max_entries: int = DEFAULT_CACHE_MAX_ENTRIES
+) -> Union[ResponseCache, SQLiteResponseCache]:
+    """
+    Create a response cache with the configured backend.
+
+    Args:
+        backend: 'memory' (private to the process) or 'sqlite' (shared between processes)
+        path: Database path of the sqlite backend (default: PODIGEE_CACHE_PATH or a
+              file in the user's private cache directory)
+        ttl: Default time to live of entries in seconds
+        max_entries: Maximum number of entries
+
+    Returns:
+        The cache
+
+    Raises:
+        ValueError: If the backend is unknown or the sqlite database can't be used
+    """
+    if backend == "memory":
+        return ResponseCache(ttl=ttl, max_entries=max_entries)
+    if backend == "sqlite":
+        return SQLiteResponseCache(path=path or DEFAULT_CACHE_PATH, ttl=ttl, max_entries=max_entries)
+    raise ValueError(f"Unsupported cache backend: {backend}. Use one of: {', '.join(CACHE_BACKENDS)}")
@@ -0,0 +1,283 @@
+"""
+Record and replay Podigee API traffic with httpx transports.
+
+A cassette is a gzip-compressed JSON lines file with one recorded request per line:
+method, URL, a digest of the request body, whether the request was conditional, the
+response's status, headers and body, and how long the response took.
+
+RecordingTransport sends requests upstream and appends each response to a cassette.
+The API key never reaches the file: request headers are not recorded, and the key is
+replaced in URLs and bodies. ReplayTransport answers requests from a cassette without
+any network access, after the recorded latency multiplied by a scale factor, so tool
+load tests and profiling runs see production-shaped responses and timings offline.
+
+Set PODIGEE_CASSETTE to a file and PODIGEE_CASSETTE_MODE to 'record' or 'replay' to use
+a cassette for every API client of the server.
+"""
+
+import os
+import gzip
+import json
+import time
+import base64
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Constants
+CASSETTE_PATH = os.getenv("PODIGEE_CASSETTE")
+CASSETTE_MODE = os.getenv("PODIGEE_CASSETTE_MODE", "replay")
+CASSETTE_LATENCY_SCALE = float(os.getenv("PODIGEE_CASSETTE_LATENCY_SCALE", "1"))
+CASSETTE_MODES = ("record", "replay")
+CASSETTE_VERSION = 1
+SCRUBBED = "<scrubbed>"
+# Response headers worth replaying; the body is stored decoded, so no content-encoding
+RECORDED_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "retry-after")
+# Relative windows ("last 30 days") give other dates on every day; a replay on a later
+# day falls back to the recording with the same request apart from these
+DATE_PARAMS = ("from", "to")
+
+
+def _scrub(text: str, secret: Optional[str]) -> str:
+    return text.replace(secret, SCRUBBED) if secret else text
+
+
+def _match_key(
+    method: str,
+    url: str,
+    body_digest: Optional[str],
+    conditional: bool,
+    ignored: Tuple[str, ...] = ()
+) -> Tuple[str, str, Optional[str], bool]:
+    # Only path and query identify a request, so a cassette recorded against the
+    # production API replays for any base URL
+    parts = urlsplit(url)
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if name not in ignored
+    ))
+    return (method.upper(), f"{parts.path}?{query}", body_digest, conditional)
+
+
+def _body_digest(body: bytes) -> Optional[str]:
+    return hashlib.sha256(body).hexdigest()[:16] if body else None
+
+
+def _is_conditional(request: httpx.Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def load_cassette(path: str) -> List[Dict[str, Any]]:
+    """
+    Read the recorded interactions of a cassette.
+
+    Args:
+        path: Path of the cassette
+
+    Returns:
+        Interactions in the order they were recorded
+
+    Raises:
+        ValueError: If the file can't be read
+    """
+    interactions = []
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                interaction = json.loads(line)
+                if interaction.get("version") != CASSETTE_VERSION:
+                    logger.warning(f"Skipping interaction of unsupported cassette version in {path}")
+                    continue
+                interactions.append(interaction)
+    except (OSError, EOFError, ValueError) as e:
+        raise ValueError(f"Cannot read cassette {path}: {str(e)}")
+    return interactions
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Sends requests upstream and appends every response to a cassette.
+    """
+
+    def __init__(self, path: str, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Initialize the transport.
+
+        Args:
+            path: Cassette to append to (created if missing)
+            transport: Transport sending the requests (default: a new HTTP transport)
+        """
+        self.path = path
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.recorded = 0
+        self._lock = threading.Lock()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        latency = time.perf_counter() - started
+
+        headers = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+        self._record(request, response.status_code, headers, body, latency)
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    def _record(self, request: httpx.Request, status: int, headers: Dict[str, str], body: bytes, latency: float) -> None:
+        secret = request.headers.get("token")
+        request_body = request.content
+        interaction: Dict[str, Any] = {
+            "version": CASSETTE_VERSION,
+            "method": request.method,
+            "url": _scrub(str(request.url), secret),
+            "body_digest": _body_digest(request_body),
+            "conditional": _is_conditional(request),
+            "status": status,
+            "headers": headers,
+            "latency": round(latency, 6),
+        }
+        try:
+            interaction["body"] = _scrub(body.decode("utf-8"), secret)
+        except UnicodeDecodeError:
+            interaction["body_base64"] = base64.b64encode(body).decode("ascii")
+
+        line = json.dumps(interaction, ensure_ascii=False) + "\n"
+        # One gzip member per interaction: the file stays readable if the process dies
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(line)
+            self.recorded += 1
+
+    async def aclose(self) -> None:
+        # The API client opens and closes an httpx client per request and they all
+        # share this transport, so its connections live as long as the process
+        pass
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Answers requests from a cassette, without network access.
+
+    Requests are matched by method, path, sorted query, request body and whether they
+    were conditional. A request recorded several times is answered with its recorded
+    responses in order, starting over after the last one. Requests that were never
+    recorded get a 404, so a tool reports an error instead of hanging.
+    """
+
+    def __init__(self, path: str, latency_scale: float = CASSETTE_LATENCY_SCALE):
+        """
+        Initialize the transport.
+
+        Args:
+            path: Cassette to replay
+            latency_scale: Factor applied to the recorded latencies (0 to answer
+                           immediately, 2 to simulate a slower upstream)
+
+        Raises:
+            ValueError: If the cassette can't be read or latency_scale is negative
+        """
+        if latency_scale < 0:
+            raise ValueError("latency_scale must not be negative")
+        self.path = path
+        self.latency_scale = latency_scale
+        self.misses = 0
+        self.replayed = 0
+        # Exact match keys, and keys without DATE_PARAMS, -> recorded interactions
+        self._interactions: Dict[Tuple[str, str, Optional[str], bool], List[Dict[str, Any]]] = {}
+        self._undated: Dict[Tuple[str, str, Optional[str], bool], List[Dict[str, Any]]] = {}
+        self._next: Dict[Tuple[str, str, Optional[str], bool], int] = {}
+        for interaction in load_cassette(path):
+            request = (interaction["method"], interaction["url"], interaction.get("body_digest"),
+                       interaction.get("conditional", False))
+            self._interactions.setdefault(_match_key(*request), []).append(interaction)
+            self._undated.setdefault(_match_key(*request, DATE_PARAMS), []).append(interaction)
+
+    def __len__(self) -> int:
+        return sum(len(interactions) for interactions in self._interactions.values())
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        described = (request.method, str(request.url), _body_digest(request.content), _is_conditional(request))
+        key = _match_key(*described)
+        recorded = self._interactions.get(key)
+        if not recorded:
+            key = _match_key(*described, DATE_PARAMS)
+            recorded = self._undated.get(key)
+        if not recorded:
+            self.misses += 1
+            logger.warning(f"{request.method} {request.url.path} is not in cassette {self.path}")
+            message = {"code": 404, "message": f"{request.method} {request.url.path} was not recorded"}
+            return httpx.Response(404, json=message, request=request)
+
+        index = self._next.get(key, 0) % len(recorded)
+        self._next[key] = index + 1
+        interaction = recorded[index]
+        delay = interaction.get("latency", 0) * self.latency_scale
+        if delay:
+            await asyncio.sleep(delay)
+        self.replayed += 1
+
+        if "body_base64" in interaction:
+            body = base64.b64decode(interaction["body_base64"])
+        else:
+            body = interaction.get("body", "").encode("utf-8")
+        return httpx.Response(interaction["status"], headers=interaction.get("headers", {}), content=body, request=request)
+
+
+def create_transport(
+    path: Optional[str] = CASSETTE_PATH,
+    mode: str = CASSETTE_MODE,
+    latency_scale: float = CASSETTE_LATENCY_SCALE
+) -> Optional[httpx.AsyncBaseTransport]:
+    """
+    Create the cassette transport configured through the PODIGEE_CASSETTE* env vars.
+
+    Args:
+        path: Cassette file (None for no cassette)
+        mode: 'record' or 'replay'
+        latency_scale: Factor applied to recorded latencies when replaying
+
+    Returns:
+        The transport, or None to talk to the API directly
+
+    Raises:
+        ValueError: If the mode is unknown or the cassette can't be replayed
+    """
+    if not path:
+        return None
+    if mode == "record":
+        logger.info(f"Recording Podigee API responses to {path}")
+        return RecordingTransport(path)
+    if mode == "replay":
+        transport = ReplayTransport(path, latency_scale)
+        logger.info(f"Replaying {len(transport)} recorded Podigee API responses from {path}")
+        return transport
+    raise ValueError(f"Unsupported cassette mode: {mode}. Use one of: {', '.join(CASSETTE_MODES)}")
+
+
+_default_transport: Optional[httpx.AsyncBaseTransport] = None
+_default_created = False
+
+
+def default_transport() -> Optional[httpx.AsyncBaseTransport]:
+    """
+    Get the process-wide cassette transport, created on first use.
+
+    Every API client (one per tenant in HTTP mode) shares it, so the cassette is read
+    once and recordings go to one file.
+    """
+    global _default_transport, _default_created
+    if not _default_created:
+        _default_transport = create_transport()
+        _default_created = True
+    return _default_transport
@@ -0,0 +1,487 @@
+"""
+Local episode catalogs with an inverted index for fast episode search.
+
+Agents tend to run many exploratory episode searches in one conversation. With the
+catalog enabled (PODIGEE_EPISODE_CATALOG=1), the episodes of a podcast are synced once
+and then searched, filtered and sorted in memory. Search matches the words of the
+title, subtitle and description, whereas the API's search only looks at titles.
+
+After the first full sync, catalogs are kept up to date with delta syncs: episodes are
+listed by updated_at, newest first, until the last sync's high-water mark is reached.
+Deleted episodes never show up in such a listing, so every
+PODIGEE_CATALOG_RECONCILE_INTERVAL seconds the IDs of all episodes are listed as well
+and the ones gone are dropped. Catalogs are saved to PODIGEE_CATALOG_DIR, so a restarted
+server continues with a delta sync instead of downloading everything again.
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import bisect
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from podigee.metrics import metrics
+from podigee.storage import DEFAULT_DATA_DIR, open_private, private_directory
+
+logger = logging.getLogger(__name__)
+
+# Constants
+CATALOG_ENABLED = os.getenv("PODIGEE_EPISODE_CATALOG", "0") == "1"
+CATALOG_TTL = float(os.getenv("PODIGEE_CATALOG_TTL", "300"))
+CATALOG_MAX_PODCASTS = int(os.getenv("PODIGEE_CATALOG_MAX_PODCASTS", "64"))
+CATALOG_RECONCILE_INTERVAL = float(os.getenv("PODIGEE_CATALOG_RECONCILE_INTERVAL", "3600"))
+# Empty to keep catalogs in memory only. Catalogs include unpublished episodes of every
+# account, so they are kept in a private directory.
+CATALOG_DIR = os.getenv("PODIGEE_CATALOG_DIR", os.path.join(DEFAULT_DATA_DIR, "catalog"))
+CATALOG_FILE_VERSION = 1
+# The API returns at most 50 episodes per page
+CATALOG_PAGE_SIZE = 50
+
+# Episode fields whose words are indexed
+INDEXED_FIELDS = ("title", "subtitle", "description")
+
+_TAG = re.compile(r"<[^>]+>")
+_WORD = re.compile(r"\w+")
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """
+    Parse an API timestamp (e.g. 2024-01-01T10:00:00Z) to an aware UTC datetime.
+
+    Args:
+        value: Timestamp string
+
+    Returns:
+        The datetime, or None if the value is missing or invalid
+    """
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def tokenize(text: Any) -> List[str]:
+    """
+    Split a text into lowercase words, ignoring HTML tags.
+
+    Args:
+        text: Text to split (non-strings give no words)
+
+    Returns:
+        List of words
+    """
+    if not isinstance(text, str):
+        return []
+    return _WORD.findall(_TAG.sub(" ", text).lower())
+
+
+class EpisodeCatalog:
+    """
+    The episodes of one podcast, indexed by the words of their text fields.
+    """
+
+    def __init__(self, podcast_id: int):
+        self.podcast_id = podcast_id
+        self.episodes: Dict[Any, Dict[str, Any]] = {}
+        # Monotonic time of the last sync (not persisted)
+        self.synced_at: Optional[float] = None
+        # Largest updated_at seen; episodes updated before it are already known
+        self.high_water: Optional[datetime] = None
+        # Wall clock time of the last full listing of episode IDs
+        self.reconciled_at: Optional[float] = None
+        self._index: Dict[str, Set[Any]] = {}
+        self._words: Dict[Any, Set[str]] = {}
+        # Sorted vocabulary for prefix lookups, rebuilt on the first search after a change
+        self._vocabulary: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.episodes)
+
+    def is_fresh(self, ttl: float = CATALOG_TTL) -> bool:
+        return self.synced_at is not None and time.monotonic() - self.synced_at < ttl
+
+    def add(self, episode: Dict[str, Any]) -> None:
+        """
+        Add or replace an episode.
+
+        Args:
+            episode: Episode dictionary as returned by the API (must have an 'id')
+        """
+        episode_id = episode.get("id")
+        if episode_id is None:
+            logger.warning(f"Skipping episode without id in catalog of podcast {self.podcast_id}")
+            return
+        self.remove(episode_id)
+
+        words = {word for field in INDEXED_FIELDS for word in tokenize(episode.get(field))}
+        for word in words:
+            self._index.setdefault(word, set()).add(episode_id)
+        self.episodes[episode_id] = episode
+        self._words[episode_id] = words
+        self._vocabulary = None
+
+        updated_at = parse_timestamp(episode.get("updated_at"))
+        if updated_at is not None and (self.high_water is None or updated_at > self.high_water):
+            self.high_water = updated_at
+
+    def remove(self, episode_id: Any) -> None:
+        """
+        Remove an episode, if present.
+        """
+        if self.episodes.pop(episode_id, None) is None:
+            return
+        for word in self._words.pop(episode_id, ()):
+            ids = self._index.get(word)
+            if ids is not None:
+                ids.discard(episode_id)
+                if not ids:
+                    del self._index[word]
+        self._vocabulary = None
+
+    def replace(self, episodes: Iterable[Dict[str, Any]]) -> None:
+        """
+        Replace all episodes, e.g. after a full sync.
+        """
+        self.episodes, self._index, self._words, self._vocabulary = {}, {}, {}, None
+        self.high_water = None
+        for episode in episodes:
+            self.add(episode)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the persisted state of the catalog.
+        """
+        return {
+            "version": CATALOG_FILE_VERSION,
+            "podcast_id": self.podcast_id,
+            "reconciled_at": self.reconciled_at,
+            "episodes": list(self.episodes.values()),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EpisodeCatalog":
+        """
+        Restore a catalog saved with to_dict. It counts as not synced yet.
+
+        Raises:
+            ValueError: If the data is not a saved catalog
+        """
+        if not isinstance(data, dict) or data.get("version") != CATALOG_FILE_VERSION:
+            raise ValueError("Unsupported episode catalog format")
+        catalog = cls(data["podcast_id"])
+        catalog.replace(data.get("episodes", []))
+        catalog.reconciled_at = data.get("reconciled_at")
+        return catalog
+
+    def _matching(self, word: str) -> Set[Any]:
+        # Every indexed word starting with the query word matches, so partial words
+        # typed by a user or agent still find the episode
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._index)
+        ids: Set[Any] = set()
+        for position in range(bisect.bisect_left(self._vocabulary, word), len(self._vocabulary)):
+            indexed = self._vocabulary[position]
+            if not indexed.startswith(word):
+                break
+            ids |= self._index[indexed]
+        return ids
+
+    def search(
+        self,
+        search: Optional[str] = None,
+        published: Optional[bool] = None,
+        publication_type: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        sort_direction: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search, filter and sort the episodes.
+
+        Args:
+            search: Words that must all occur (as word prefixes) in the title, subtitle
+                    or description
+            published: Only published (True) or unpublished (False) episodes
+            publication_type: Only episodes of this type ('full', 'trailer', 'bonus')
+            sort_by: Episode field to sort by (default: 'published_at')
+            sort_direction: 'asc' or 'desc' (default: 'desc')
+            limit: Maximum number of episodes to return
+            offset: Number of episodes to skip
+
+        Returns:
+            List of episode dictionaries
+        """
+        # A search without any words (e.g. only punctuation) doesn't filter
+        words = set(tokenize(search))
+        if words:
+            ids: Optional[Set[Any]] = None
+            for word in words:
+                matches = self._matching(word)
+                ids = matches if ids is None else ids & matches
+                if not ids:
+                    return []
+            candidates = [self.episodes[episode_id] for episode_id in ids or ()]
+        else:
+            candidates = list(self.episodes.values())
+
+        if published is not None:
+            candidates = [e for e in candidates if bool(e.get("published_at")) == published]
+        if publication_type is not None:
+            candidates = [e for e in candidates if e.get("publication_type") == publication_type]
+
+        field = sort_by or "published_at"
+        present = [e for e in candidates if e.get(field) is not None]
+        missing = [e for e in candidates if e.get(field) is None]
+        try:
+            present.sort(key=lambda e: e[field], reverse=(sort_direction or "desc") != "asc")
+        except TypeError:
+            # Mixed value types, compare them as text
+            present.sort(key=lambda e: str(e[field]), reverse=(sort_direction or "desc") != "asc")
+        # Episodes without a value (e.g. unpublished ones by published_at) go last
+        ordered = present + missing
+
+        start = offset or 0
+        return ordered[start:start + limit] if limit is not None else ordered[start:]
+
+
+async def fetch_all_episodes(
+    client: Any,
+    podcast_id: int,
+    fields_filter: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Fetch every episode of a podcast, page by page.
+
+    Args:
+        client: PodigeeAPIClient to fetch with
+        podcast_id: ID of the podcast
+        fields_filter: Only fetch these episode fields
+
+    Returns:
+        List of episode dictionaries
+
+    Raises:
+        ValueError: If an API request fails
+    """
+    episodes: List[Dict[str, Any]] = []
+    while True:
+        page = await client.list_episodes(
+            podcast_id=podcast_id,
+            limit=CATALOG_PAGE_SIZE,
+            offset=len(episodes),
+            sort_by="created_at",
+            sort_direction="asc",
+            fields_filter=fields_filter
+        )
+        episodes.extend(page)
+        if len(page) < CATALOG_PAGE_SIZE:
+            return episodes
+
+
+async def fetch_updated_episodes(client: Any, podcast_id: int, since: datetime) -> List[Dict[str, Any]]:
+    """
+    Fetch the episodes of a podcast updated at or after a point in time.
+
+    Pages are listed by updated_at, newest first, until a page reaches back before
+    'since'. Episodes updated exactly at 'since' are fetched again, as another episode
+    may have been updated in the same second after the last sync.
+
+    Args:
+        client: PodigeeAPIClient to fetch with
+        podcast_id: ID of the podcast
+        since: High-water mark of the last sync
+
+    Returns:
+        List of episode dictionaries, newest first
+
+    Raises:
+        ValueError: If an API request fails
+    """
+    episodes: List[Dict[str, Any]] = []
+    offset = 0
+    while True:
+        page = await client.list_episodes(
+            podcast_id=podcast_id,
+            limit=CATALOG_PAGE_SIZE,
+            offset=offset,
+            sort_by="updated_at",
+            sort_direction="desc"
+        )
+        offset += len(page)
+        for episode in page:
+            updated_at = parse_timestamp(episode.get("updated_at"))
+            if updated_at is not None and updated_at < since:
+                return episodes
+            episodes.append(episode)
+        if len(page) < CATALOG_PAGE_SIZE:
+            return episodes
+
+
+class CatalogStore:
+    """
+    Episode catalogs of the most recently used podcasts, per API client.
+
+    Catalogs are keyed by the client's cache namespace, so tenants with their own API
+    key never see each other's episodes.
+    """
+
+    def __init__(
+        self,
+        ttl: float = CATALOG_TTL,
+        max_podcasts: int = CATALOG_MAX_PODCASTS,
+        directory: Optional[str] = CATALOG_DIR,
+        reconcile_interval: float = CATALOG_RECONCILE_INTERVAL
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            ttl: Seconds after which a catalog is synced again
+            max_podcasts: Maximum number of catalogs kept in memory
+            directory: Directory catalogs are saved to (None or empty to not save them)
+            reconcile_interval: Seconds between two checks for deleted episodes
+        """
+        self.ttl = ttl
+        self.max_podcasts = max_podcasts
+        self.directory = directory or None
+        self.reconcile_interval = reconcile_interval
+        self._catalogs: "OrderedDict[str, EpisodeCatalog]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._catalogs)
+
+    def _path(self, key: str) -> Optional[str]:
+        if self.directory is None:
+            return None
+        # The key contains the API key's fingerprint, hash it once more for the file name
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest()[:24] + ".json")
+
+    def _load(self, key: str, podcast_id: int) -> EpisodeCatalog:
+        path = self._path(key)
+        if path is None or not os.path.exists(path):
+            return EpisodeCatalog(podcast_id)
+        try:
+            # Never serve a catalog someone else could have planted
+            private_directory(self.directory)
+            with open(path, encoding="utf-8") as f:
+                return EpisodeCatalog.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable episode catalog {path}: {e}")
+            return EpisodeCatalog(podcast_id)
+
+    def _save(self, key: str, catalog: EpisodeCatalog) -> None:
+        path = self._path(key)
+        if path is None:
+            return
+        try:
+            private_directory(self.directory)
+            # Write and rename, so a crash never leaves a half-written catalog
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open_private(temporary) as f:
+                json.dump(catalog.to_dict(), f)
+            os.replace(temporary, path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not save episode catalog {path}: {e}")
+
+    async def get(self, client: Any, podcast_id: int) -> EpisodeCatalog:
+        """
+        Get the synced catalog of a podcast.
+
+        Args:
+            client: PodigeeAPIClient to sync with
+            podcast_id: ID of the podcast
+
+        Returns:
+            The podcast's catalog, synced within the last ttl seconds
+
+        Raises:
+            ValueError: If syncing fails and there is no catalog to fall back to
+        """
+        key = f"{client.cache_namespace}/{podcast_id}"
+        catalog = self._catalogs.get(key)
+        if catalog is None:
+            catalog = self._load(key, podcast_id)
+            self._catalogs[key] = catalog
+            while len(self._catalogs) > self.max_podcasts:
+                evicted, _ = self._catalogs.popitem(last=False)
+                self._locks.pop(evicted, None)
+        self._catalogs.move_to_end(key)
+
+        if catalog.is_fresh(self.ttl):
+            return catalog
+        # Concurrent searches of a stale catalog wait for one sync
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if not catalog.is_fresh(self.ttl):
+                await self._sync(client, catalog)
+                self._save(key, catalog)
+        return catalog
+
+    def apply(self, client: Any, episode: Dict[str, Any]) -> None:
+        """
+        Put an episode changed through this server into its podcast's catalog, if loaded.
+
+        The next incremental sync would pick the change up as well, but until then
+        searches would match the old title.
+
+        Args:
+            client: PodigeeAPIClient the episode was changed with
+            episode: Episode as returned by the API (with 'id' and 'podcast_id')
+        """
+        key = f"{client.cache_namespace}/{episode.get('podcast_id')}"
+        catalog = self._catalogs.get(key)
+        if catalog is not None:
+            catalog.add(episode)
+            self._save(key, catalog)
+
+    async def _sync(self, client: Any, catalog: EpisodeCatalog) -> None:
+        start = time.perf_counter()
+        if catalog.high_water is None:
+            kind = "full"
+        elif catalog.reconciled_at is None or time.time() - catalog.reconciled_at >= self.reconcile_interval:
+            kind = "reconcile"
+        else:
+            kind = "delta"
+
+        try:
+            if kind == "full":
+                reconciled_at = time.time()
+                catalog.replace(await fetch_all_episodes(client, catalog.podcast_id))
+                catalog.reconciled_at = reconciled_at
+            else:
+                if kind == "reconcile":
+                    # IDs only: a fraction of the full listing's size
+                    reconciled_at = time.time()
+                    listed = await fetch_all_episodes(client, catalog.podcast_id, fields_filter=["id"])
+                    current = {episode.get("id") for episode in listed}
+                    for episode_id in [i for i in catalog.episodes if i not in current]:
+                        catalog.remove(episode_id)
+                    catalog.reconciled_at = reconciled_at
+                for episode in await fetch_updated_episodes(client, catalog.podcast_id, catalog.high_water):
+                    catalog.add(episode)
+        except ValueError:
+            if not catalog.episodes:
+                raise
+            # Keep serving the previous state, the next search retries
+            logger.warning(f"Syncing the episode catalog of podcast {catalog.podcast_id} failed, serving the last sync")
+            return
+
+        catalog.synced_at = time.monotonic()
+        metrics.inc("podigee_catalog_syncs", kind=kind)
+        logger.info(
+            f"Synced episode catalog of podcast {catalog.podcast_id} ({kind}, {len(catalog)} episodes) "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
@@ -0,0 +1,168 @@
+"""
+Period-over-period comparison of podcast analytics.
+
+Compares two aggregated analytics windows (see podigee.formatting.aggregate_analytics)
+dimension by dimension and renders the differences as a compact markdown report.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from podigee.dates import DateWindow, parse_day
+from podigee.formatting import BREAKDOWN_KEYS, get_attribution_footer
+
+# Values of the compare_to argument
+COMPARE_PREVIOUS = "previous"
+COMPARE_YEAR = "year"
+COMPARE_MODES = (COMPARE_PREVIOUS, COMPARE_YEAR)
+
+# Overview numbers compared next to the total downloads
+OVERVIEW_FIELDS = (
+    ("unique_listeners_number", "Unique Listeners"),
+    ("unique_subscribers_number", "Unique Subscribers"),
+    ("mean_episode_download", "Average Downloads per Episode"),
+)
+
+DIMENSION_TITLES = {
+    "formats": "Formats",
+    "platforms": "Platforms",
+    "countries": "Countries",
+    "clients": "Clients",
+    "clients_on_platforms": "Clients on Platforms",
+}
+
+
+def _shift_year(day: date, years: int) -> date:
+    try:
+        return day.replace(year=day.year + years)
+    except ValueError:
+        # February 29th in a year without one
+        return day.replace(year=day.year + years, day=28)
+
+
+def comparison_window(from_date: str, to_date: str, compare_to: str = COMPARE_PREVIOUS) -> Tuple[str, str]:
+    """
+    Get the window the given window is compared with.
+
+    Args:
+        from_date: Start date of the current window in YYYY-MM-DD format
+        to_date: End date of the current window in YYYY-MM-DD format (inclusive)
+        compare_to: 'previous' for the equally long window right before, 'year' for
+                    the same dates one year earlier
+
+    Returns:
+        Tuple of (from_date, to_date) of the comparison window
+
+    Raises:
+        ValueError: If a date is invalid, the window is empty or compare_to is unknown
+    """
+    window = DateWindow(parse_day(from_date), parse_day(to_date))
+    if window.end < window.start:
+        raise ValueError(f"to_date {to_date} is before from_date {from_date}")
+
+    if compare_to == COMPARE_PREVIOUS:
+        length = window.end - window.start + timedelta(days=1)
+        previous = DateWindow(window.start - length, window.start - timedelta(days=1))
+    elif compare_to == COMPARE_YEAR:
+        previous = DateWindow(_shift_year(window.start, -1), _shift_year(window.end, -1))
+    else:
+        raise ValueError(f"Unsupported compare_to '{compare_to}'. Use one of: {', '.join(COMPARE_MODES)}")
+    return previous.from_date, previous.to_date
+
+
+def _change(current: Any, previous: Any) -> Dict[str, Any]:
+    if not isinstance(current, (int, float)) or not isinstance(previous, (int, float)):
+        return {"current": current, "previous": previous, "delta": None, "percent": None}
+    delta = current - previous
+    percent = (delta / previous * 100) if previous else None
+    return {"current": current, "previous": previous, "delta": delta, "percent": percent}
+
+
+def compare_aggregates(
+    current: Optional[Dict[str, Any]],
+    previous: Optional[Dict[str, Any]],
+    current_overview: Optional[Dict[str, Any]],
+    previous_overview: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Compute the changes between two aggregated windows.
+
+    A part that is missing (None, e.g. it missed the tool call's deadline) shows as
+    'N/A'; without both aggregates no breakdown is compared.
+
+    Args:
+        current: aggregate_analytics result of the current window
+        previous: aggregate_analytics result of the comparison window
+        current_overview: Overview data of the current window
+        previous_overview: Overview data of the comparison window
+
+    Returns:
+        Dictionary with 'totals' (label -> change) and, per breakdown dimension, a
+        list of changes sorted by current downloads. Every change has 'key',
+        'current', 'previous', 'delta' and 'percent' (None without a previous value).
+    """
+    totals = {"Total Downloads": _change(
+        current["total_downloads"] if current is not None else "N/A",
+        previous["total_downloads"] if previous is not None else "N/A",
+    )}
+    for field, label in OVERVIEW_FIELDS:
+        totals[label] = _change((current_overview or {}).get(field, "N/A"), (previous_overview or {}).get(field, "N/A"))
+
+    dimensions: Dict[str, List[Dict[str, Any]]] = {}
+    if current is None or previous is None:
+        return {"totals": totals, "dimensions": dimensions}
+    for dimension in BREAKDOWN_KEYS:
+        now, before = current[dimension], previous[dimension]
+        changes = [dict(_change(now.get(key, 0), before.get(key, 0)), key=key) for key in now.keys() | before.keys()]
+        changes.sort(key=lambda change: (-change["current"], -change["previous"], change["key"]))
+        dimensions[dimension] = changes
+    return {"totals": totals, "dimensions": dimensions}
+
+
+def _format_change(change: Dict[str, Any]) -> str:
+    if change["delta"] is None:
+        return "n/a"
+    text = f"{change['delta']:+g}"
+    if change["percent"] is not None:
+        text += f" ({change['percent']:+.1f}%)"
+    elif change["previous"] == 0 and change["current"]:
+        text += " (new)"
+    return text
+
+
+def render_comparison(
+    comparison: Dict[str, Any],
+    current_window: Tuple[str, str],
+    previous_window: Tuple[str, str],
+    top_n: int = 5
+) -> str:
+    """
+    Render a comparison as compact markdown tables.
+
+    Args:
+        comparison: Result of compare_aggregates
+        current_window: (from_date, to_date) of the current window
+        previous_window: (from_date, to_date) of the comparison window
+        top_n: Entries shown per dimension (by current downloads)
+
+    Returns:
+        Formatted comparison
+    """
+    result = "\n# Podcast Analytics Comparison\n"
+    result += f"**Current:** {current_window[0]} to {current_window[1]}\n"
+    result += f"**Compared with:** {previous_window[0]} to {previous_window[1]}\n\n"
+
+    result += "## Overview\n| Metric | Current | Previous | Change |\n|---|---|---|---|\n"
+    for label, change in comparison["totals"].items():
+        result += f"| {label} | {change['current']} | {change['previous']} | {_format_change(change)} |\n"
+
+    for dimension, changes in comparison["dimensions"].items():
+        title = DIMENSION_TITLES[dimension]
+        if not changes:
+            result += f"\n## {title}\nNo data available.\n"
+            continue
+        result += f"\n## {title}\n| Name | Current | Previous | Change |\n|---|---|---|---|\n"
+        for change in changes[:top_n]:
+            result += f"| {change['key']} | {change['current']} | {change['previous']} | {_format_change(change)} |\n"
+
+    return result + get_attribution_footer()
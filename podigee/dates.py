@@ -0,0 +1,160 @@
+"""
+Canonical date windows for Podigee API requests.
+
+Relative windows ("last 30 days", "this month") are computed here on UTC calendar days,
+rather than by every caller from the server's local time. The same logical window
+then always gives the same from/to parameters, and with them the same cache keys,
+regardless of the server's timezone or which side of midnight a request falls on.
+
+A window splits into a settled historical part and the most recent
+PODIGEE_SETTLE_DAYS days, whose numbers can still change. Responses that only cover
+settled days are cached for PODIGEE_SETTLED_CACHE_TTL instead of the regular TTL.
+"""
+
+import os
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import NamedTuple, Optional, Tuple, Union
+
+# Constants
+SETTLE_DAYS = int(os.getenv("PODIGEE_SETTLE_DAYS", "2"))
+SETTLED_CACHE_TTL = float(os.getenv("PODIGEE_SETTLED_CACHE_TTL", "3600"))
+DEFAULT_WINDOW_DAYS = 30
+
+# Windows in resource URIs, e.g. podigee://episode/1/analytics/last-30-days
+_LAST_DAYS_SPEC = re.compile(r"^last-(\d+)-days?$")
+_RANGE_SPEC = re.compile(r"^(\d{4}-\d{2}-\d{2})\.\.(\d{4}-\d{2}-\d{2})$")
+
+
+def utc_today() -> date:
+    """
+    Get the current UTC calendar day.
+    """
+    return datetime.now(timezone.utc).date()
+
+
+def parse_day(value: Union[str, date]) -> date:
+    """
+    Parse a YYYY-MM-DD date; the time part of a timestamp is ignored.
+
+    Raises:
+        ValueError: If the value is not a valid date
+    """
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(value[:10], "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+class DateWindow(NamedTuple):
+    """
+    Range of calendar days, both ends inclusive.
+    """
+
+    start: date
+    end: date
+
+    @property
+    def from_date(self) -> str:
+        return self.start.isoformat()
+
+    @property
+    def to_date(self) -> str:
+        return self.end.isoformat()
+
+    def split(
+        self,
+        today: Optional[date] = None,
+        settle_days: int = SETTLE_DAYS
+    ) -> Tuple[Optional["DateWindow"], Optional["DateWindow"]]:
+        """
+        Split the window into its settled and its recent days.
+
+        Args:
+            today: Current day (default: today in UTC)
+            settle_days: Number of most recent days whose numbers can still change
+
+        Returns:
+            Tuple of (settled part, recent part), either None if the window has no
+            such days
+        """
+        settled_last = (today or utc_today()) - timedelta(days=settle_days)
+        settled = DateWindow(self.start, min(self.end, settled_last)) if self.start <= settled_last else None
+        recent = DateWindow(max(self.start, settled_last + timedelta(days=1)), self.end) if self.end > settled_last else None
+        return settled, recent
+
+
+def last_days(days: int = DEFAULT_WINDOW_DAYS, today: Optional[date] = None) -> DateWindow:
+    """
+    Window from 'days' days ago up to and including today.
+    """
+    today = today or utc_today()
+    return DateWindow(today - timedelta(days=int(days)), today)
+
+
+def this_month(today: Optional[date] = None) -> DateWindow:
+    """
+    Window from the first of the current month up to and including today.
+    """
+    today = today or utc_today()
+    return DateWindow(today.replace(day=1), today)
+
+
+def resolve_window(
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    days: int = DEFAULT_WINDOW_DAYS,
+    today: Optional[date] = None
+) -> Tuple[str, str]:
+    """
+    Get the from/to parameters of a request.
+
+    Args:
+        from_date: Explicit start date in YYYY-MM-DD format
+        to_date: Explicit end date in YYYY-MM-DD format
+        days: Days to look back when no explicit range is given
+        today: Current day (default: today in UTC)
+
+    Returns:
+        The explicit range if both dates are given, otherwise the last 'days' days
+    """
+    if from_date and to_date:
+        return from_date, to_date
+    window = last_days(days, today)
+    return window.from_date, window.to_date
+
+
+def is_settled(to_date: Optional[str], today: Optional[date] = None, settle_days: int = SETTLE_DAYS) -> bool:
+    """
+    Whether a window ending on 'to_date' only covers settled days.
+    """
+    if not to_date:
+        return False
+    try:
+        end = parse_day(to_date)
+    except ValueError:
+        return False
+    return end <= (today or utc_today()) - timedelta(days=settle_days)
+
+
+def window_from_spec(spec: str, today: Optional[date] = None) -> DateWindow:
+    """
+    Parse a window written as 'last-30-days', 'this-month' or '2024-01-01..2024-01-31'.
+
+    Raises:
+        ValueError: If the spec has none of these forms
+    """
+    match = _LAST_DAYS_SPEC.match(spec)
+    if match:
+        return last_days(int(match.group(1)), today)
+    if spec == "this-month":
+        return this_month(today)
+    match = _RANGE_SPEC.match(spec)
+    if match:
+        window = DateWindow(parse_day(match.group(1)), parse_day(match.group(2)))
+        if window.end < window.start:
+            raise ValueError(f"Window '{spec}' ends before it starts")
+        return window
+    raise ValueError(f"Invalid window '{spec}', expected 'last-N-days', 'this-month' or 'YYYY-MM-DD..YYYY-MM-DD'")
@@ -0,0 +1,120 @@
+"""
+Deadlines for tool calls, propagated to every Podigee API request they make.
+
+Each tool call gets a latency budget (PODIGEE_TOOL_BUDGET). The deadline is kept in a
+context variable, so every request made on behalf of the call, including the ones of
+tasks it gathers, waits at most for the time that is left. Tools made of several
+independent requests can then answer with the parts that finished instead of nothing.
+"""
+
+import os
+import time
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Awaitable, Iterator, List, Optional
+
+# Constants
+DEFAULT_TOOL_BUDGET = float(os.getenv("PODIGEE_TOOL_BUDGET", "30"))
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("podigee_deadline", default=None)
+
+
+class DeadlineExceeded(ValueError):
+    """
+    The time budget of the tool call ran out.
+
+    A ValueError, like every other API failure, so tools that don't handle it
+    specially report it like any failed request.
+    """
+
+
+@contextmanager
+def deadline_scope(budget: Optional[float] = DEFAULT_TOOL_BUDGET) -> Iterator[None]:
+    """
+    Give the work started inside the block a deadline.
+
+    A nested scope can only shorten the deadline of the enclosing one.
+
+    Args:
+        budget: Seconds from now (None or 0 for no deadline)
+    """
+    current = _deadline.get()
+    deadline = current
+    if budget:
+        ends = time.monotonic() + budget
+        deadline = ends if current is None else min(current, ends)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """
+    Seconds left until the current deadline, or None without a deadline.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+async def within_deadline(awaitable: Awaitable[Any], what: str = "request") -> Any:
+    """
+    Await something, giving up when the current deadline passes.
+
+    Args:
+        awaitable: Coroutine to await
+        what: Description for the error message
+
+    Returns:
+        Result of the awaitable
+
+    Raises:
+        DeadlineExceeded: If the deadline passed first
+    """
+    left = remaining()
+    if left is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout=left)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"Time budget of the tool call ran out waiting for the {what}")
+
+
+async def gather_partial(*awaitables: Awaitable[Any]) -> List[Any]:
+    """
+    Run awaitables concurrently; the ones that miss the deadline give None.
+
+    Args:
+        awaitables: Coroutines to run
+
+    Returns:
+        Their results, in order, with None for each that ran out of time
+
+    Raises:
+        Exception: The first other error raised by one of them
+    """
+    results = await asyncio.gather(*awaitables, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, DeadlineExceeded):
+            raise result
+    return [None if isinstance(result, DeadlineExceeded) else result for result in results]
+
+
+def partial_notice(missing: List[str]) -> str:
+    """
+    Build the note appended to a tool result that lacks parts.
+
+    Args:
+        missing: Names of the sections that did not finish in time
+
+    Returns:
+        Markdown note
+    """
+    return (
+        f"\n\n> **Partial result:** {', '.join(missing)} did not finish within the time budget "
+        "and is missing above. Try again, or ask for a shorter period."
+    )
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Fast-starting stdio entry point for the Podigee MCP server.
+
+Importing main.py takes well over half a second, almost all of it in the mcp package,
+and MCP hosts launch a new stdio server per session. This entry point only uses the
+standard library until the first answer is sent: it replies to ``initialize`` and
+``tools/list`` from a pre-generated manifest (tool_manifest.json) and loads the real
+server in a background thread right after ``initialize``. Once loaded, the session is
+replayed into it and every further message is passed through unchanged; messages the
+manifest can't answer (tool calls, resources, ...) wait for it.
+
+Use it in place of main.py:
+
+    python /path/to/podigee/fast_start.py
+
+After changing tools, regenerate the manifest:
+
+    python podigee/fast_start.py --write-manifest
+"""
+
+import os
+import sys
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+# Only standard library modules that are cheap to import at module level. Even asyncio
+# is imported where needed (backend thread, --write-manifest) as it adds ~20 ms.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tool_manifest.json")
+
+# Request id of the replayed initialize; its response is the server's, not the client's
+REPLAY_ID = "podigee-fast-start-initialize"
+
+logger = logging.getLogger(__name__)
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> Dict[str, Any]:
+    """
+    Load the tool manifest.
+
+    Args:
+        path: Path of the manifest file
+
+    Returns:
+        Manifest dictionary
+    """
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+async def build_manifest() -> Dict[str, Any]:
+    """
+    Build the manifest from the real server: its initialize result and tool list.
+
+    Returns:
+        Manifest dictionary
+    """
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    import main
+    from mcp import types
+    from mcp.shared.version import SUPPORTED_PROTOCOL_VERSIONS
+
+    options = main.mcp._mcp_server.create_initialization_options()
+    result = types.InitializeResult(
+        protocolVersion=types.LATEST_PROTOCOL_VERSION,
+        capabilities=options.capabilities,
+        serverInfo=types.Implementation(
+            name=options.server_name,
+            version=options.server_version,
+            websiteUrl=options.website_url,
+            icons=options.icons,
+        ),
+        instructions=options.instructions,
+    ).model_dump(by_alias=True, exclude_none=True, mode="json")
+    tools = await main.mcp.list_tools()
+    return {
+        "protocol_versions": list(SUPPORTED_PROTOCOL_VERSIONS),
+        "latest_protocol_version": types.LATEST_PROTOCOL_VERSION,
+        "initialize_result": result,
+        "tools": [tool.model_dump(by_alias=True, exclude_none=True, mode="json") for tool in tools],
+    }
+
+
+class _QueueReader:
+    """
+    Async line iterator over the stdin lines handed to the backend.
+    """
+
+    def __init__(self, queue: "asyncio.Queue[Optional[str]]"):
+        self.queue = queue
+
+    def __aiter__(self) -> "_QueueReader":
+        return self
+
+    async def __anext__(self) -> str:
+        line = await self.queue.get()
+        if line is None:
+            raise StopAsyncIteration
+        return line
+
+
+class _StdoutWriter:
+    """
+    Async file-like writer passing the backend's output to the shared stdout.
+    """
+
+    def __init__(self, proxy: "FastStartProxy"):
+        self.proxy = proxy
+        self.replay_answered = False
+
+    async def write(self, data: str) -> None:
+        for line in data.splitlines():
+            if not self.replay_answered and line.strip():
+                # The response to the replayed initialize was already given from the manifest
+                if json.loads(line).get("id") == REPLAY_ID:
+                    self.replay_answered = True
+                    continue
+            self.proxy.send_line(line)
+
+    async def flush(self) -> None:
+        pass
+
+
+class FastStartProxy:
+    """
+    Answers the session handshake from the manifest until the real server is loaded.
+    """
+
+    def __init__(self, manifest: Dict[str, Any], stdin: Any = None, stdout: Any = None, preload: bool = True):
+        """
+        Initialize the proxy.
+
+        Args:
+            manifest: Tool manifest (see build_manifest)
+            stdin: Binary input stream (default: sys.stdin.buffer)
+            stdout: Binary output stream (default: sys.stdout.buffer)
+            preload: Load the server right after initialize rather than on the first
+                     message the manifest can't answer
+        """
+        self.manifest = manifest
+        self.stdin = stdin or sys.stdin.buffer
+        self.stdout = stdout or sys.stdout.buffer
+        self.preload = preload
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._replay: List[str] = []
+        self._pending: List[str] = []
+        self._deliver = None
+        self._backend: Optional[threading.Thread] = None
+        self._done = threading.Event()
+
+    def send_line(self, line: str) -> None:
+        with self._write_lock:
+            self.stdout.write(line.encode("utf-8") + b"\n")
+            self.stdout.flush()
+
+    def _respond(self, request_id: Any, result: Dict[str, Any]) -> None:
+        self.send_line(json.dumps({"jsonrpc": "2.0", "id": request_id, "result": result}))
+
+    def _handle_locally(self, line: str) -> bool:
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return False
+        method = message.get("method")
+
+        if method == "initialize":
+            requested = message.get("params", {}).get("protocolVersion")
+            result = dict(self.manifest["initialize_result"])
+            result["protocolVersion"] = (
+                requested if requested in self.manifest["protocol_versions"]
+                else self.manifest["latest_protocol_version"]
+            )
+            replayed = dict(message, id=REPLAY_ID)
+            self._replay.append(json.dumps(replayed))
+            self._respond(message.get("id"), result)
+            if self.preload:
+                self._start_backend()
+            return True
+        if method == "notifications/initialized":
+            self._replay.append(line)
+            return True
+        if method == "tools/list" and not message.get("params", {}).get("cursor"):
+            self._respond(message.get("id"), {"tools": self.manifest["tools"]})
+            return True
+        if method == "ping":
+            self._respond(message.get("id"), {})
+            return True
+        return False
+
+    def _start_backend(self) -> None:
+        if self._backend is None:
+            self._backend = threading.Thread(target=self._run_backend, name="podigee-backend", daemon=True)
+            self._backend.start()
+
+    def _run_backend(self) -> None:
+        import asyncio
+        try:
+            asyncio.run(self._serve())
+        except Exception:
+            logger.exception("Podigee MCP server failed")
+        finally:
+            self._done.set()
+
+    async def _serve(self) -> None:
+        if ROOT not in sys.path:
+            sys.path.insert(0, ROOT)
+        import asyncio
+        import main
+        from mcp.server.stdio import stdio_server
+
+        tools = [tool.model_dump(by_alias=True, exclude_none=True, mode="json") for tool in await main.mcp.list_tools()]
+        if tools != self.manifest["tools"]:
+            logger.warning("Tool manifest is out of date, regenerate it with fast_start.py --write-manifest")
+
+        loop = asyncio.get_running_loop()
+        lines: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        with self._lock:
+            for line in self._replay + self._pending:
+                lines.put_nowait(line)
+            self._pending = []
+            self._deliver = lambda line: loop.call_soon_threadsafe(lines.put_nowait, line)
+
+        server = main.mcp._mcp_server
+        async with stdio_server(stdin=_QueueReader(lines), stdout=_StdoutWriter(self)) as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+
+    def serve(self) -> None:
+        """
+        Read stdin until EOF, answering or forwarding every message.
+        """
+        for raw in iter(self.stdin.readline, b""):
+            line = raw.decode("utf-8", errors="replace").strip()
+            if not line:
+                continue
+            with self._lock:
+                if self._deliver is not None:
+                    self._deliver(line)
+                    continue
+                if self._handle_locally(line):
+                    continue
+                self._pending.append(line)
+            self._start_backend()
+
+        with self._lock:
+            deliver = self._deliver
+        if deliver is not None:
+            deliver(None)
+            self._done.wait()
+        elif self._backend is not None:
+            # Still loading: let it answer what is pending, then stop
+            while self._deliver is None and not self._done.is_set():
+                self._done.wait(0.01)
+            if self._deliver is not None:
+                self._deliver(None)
+            self._done.wait()
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if args == ["--write-manifest"]:
+        import asyncio
+        manifest = asyncio.run(build_manifest())
+        with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Wrote {len(manifest['tools'])} tools to {MANIFEST_PATH}")
+        return 0
+    if args:
+        print("Usage: fast_start.py [--write-manifest]", file=sys.stderr)
+        return 2
+
+    # Same format as main.py, which configures logging once it is loaded
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    preload = os.getenv("PODIGEE_FAST_START_PRELOAD", "1") != "0"
+    FastStartProxy(load_manifest(), preload=preload).serve()
+    return 0
+
+
+if __name__ == "__main__":
+    # Run as a script, this file's directory would shadow top-level modules with the
+    # package's own (api, cache, metrics, ...)
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+        sys.path[0] = ROOT
+    sys.exit(main_cli())
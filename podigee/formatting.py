@@ -0,0 +1,249 @@
+"""
+Aggregation and markdown rendering of Podigee analytics responses.
+
+Kept free of server state (no MCP, client or metrics imports) so the aggregation can
+run in a worker process for large payloads, see podigee.offload.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Per-object breakdowns summed up by aggregate_analytics
+BREAKDOWN_KEYS = ("formats", "platforms", "countries", "clients", "clients_on_platforms")
+
+# Most recent time buckets listed in a downloads time series
+MAX_SERIES_ROWS = 31
+
+
+def get_attribution_footer() -> str:
+    """
+    Generate standardized attribution footer for all analytics reports.
+    Required for all free MCP server users who host with Podigee on Advanced or Business Pro plans.
+
+    Returns:
+        Formatted attribution footer string
+    """
+    current_date = datetime.now().strftime("%B %d, %Y")
+
+    return f"\n\n---\n*Data Source: Podigee Analytics API | Generated on {current_date}*"
+
+
+def _date_part(raw: Any, field: str) -> str:
+    # Timestamps look like 2024-01-01T00:00:00Z, only the date is shown
+    if isinstance(raw, str):
+        return raw.split('T')[0]
+    if raw is not None:
+        logger.warning(f"Unexpected type for {field}: {type(raw)}, value: {raw}")
+        return str(raw)
+    return "unknown"
+
+
+def aggregate_analytics(
+    objects: List[Dict[str, Any]],
+    value_types: Tuple[type, ...] = (int,)
+) -> Dict[str, Any]:
+    """
+    Sum up the downloads and breakdowns of analytics objects.
+
+    Args:
+        objects: The 'objects' array of an analytics response (one object per time bucket)
+        value_types: Accepted types of counts; other values are logged and skipped
+
+    Returns:
+        Dictionary with 'total_downloads', 'downloads_by_date' and one dictionary of
+        summed counts per key in BREAKDOWN_KEYS
+    """
+    total_downloads = 0
+    downloads_by_date: Dict[str, Any] = {}
+    breakdowns = {key: defaultdict(int) for key in BREAKDOWN_KEYS}
+
+    for obj in objects:
+        downloads = obj.get("downloads", {}).get("complete", 0)
+        if isinstance(downloads, value_types):
+            total_downloads += downloads
+        else:
+            logger.warning(f"Unexpected type for downloads.complete: {type(downloads)}")
+            downloads = 0
+        downloads_by_date[_date_part(obj.get("downloaded_on"), "downloaded_on")] = downloads
+
+        for breakdown_key in BREAKDOWN_KEYS:
+            agg = breakdowns[breakdown_key]
+            for key, count in obj.get(breakdown_key, {}).items():
+                if isinstance(count, value_types):
+                    agg[key] += count
+                else:
+                    logger.warning(f"Unexpected value type for {breakdown_key} key '{key}': {type(count)}, value: {count}")
+
+    aggregate: Dict[str, Any] = {
+        "total_downloads": total_downloads,
+        "downloads_by_date": downloads_by_date,
+    }
+    # Plain dicts so the result pickles without the defaultdict factory
+    for breakdown_key, agg in breakdowns.items():
+        aggregate[breakdown_key] = dict(agg)
+    return aggregate
+
+
+def format_top_items(agg_dict: Dict[str, int], title: str, top_n: int = 5) -> str:
+    """
+    Format the largest entries of a breakdown as a numbered markdown list.
+
+    Args:
+        agg_dict: Summed counts by key
+        title: Section title
+        top_n: Number of entries to show
+
+    Returns:
+        Markdown section
+    """
+    if not agg_dict:
+        return f"## Top {title}\nNo data available.\n\n"
+
+    sorted_items = sorted(agg_dict.items(), key=lambda item: item[1], reverse=True)
+    formatted_list = f"## Top {title}\n"
+    for i, (item, count) in enumerate(sorted_items[:top_n], 1):
+        formatted_list += f"{i}. {item}: {count} downloads\n"
+    return formatted_list + "\n"
+
+
+def format_breakdowns(aggregate: Dict[str, Any]) -> str:
+    """
+    Format the top entries of every breakdown of an aggregate.
+    """
+    return (
+        format_top_items(aggregate["formats"], "Formats")
+        + format_top_items(aggregate["platforms"], "Platforms")
+        + format_top_items(aggregate["countries"], "Countries")
+        + format_top_items(aggregate["clients"], "Clients")
+        # Show more for this breakdown
+        + format_top_items(aggregate["clients_on_platforms"], "Clients on Platforms", top_n=10)
+    )
+
+
+def render_analytics_summary(
+    analytics_data: Dict[str, Any],
+    overview_data: Optional[Dict[str, Any]],
+    aggregate: Optional[Dict[str, Any]]
+) -> str:
+    """
+    Render the podcast analytics summary.
+
+    Args:
+        analytics_data: Raw analytics data from the Podigee API (for its metadata)
+        overview_data: Raw overview data from the Podigee API, or None if it is missing
+        aggregate: Result of aggregate_analytics for the analytics objects, or None if
+                   the analytics are missing
+
+    Returns:
+        Formatted analytics summary as string
+    """
+    timerange = analytics_data.get("meta", {}).get("timerange", {})
+    start_date = _date_part(timerange.get("start_datetime"), "start_datetime")
+    end_date = _date_part(timerange.get("end_datetime"), "end_datetime")
+
+    # Get overview stats
+    overview_missing = overview_data is None
+    overview_data = overview_data or {}
+    unique_listeners = overview_data.get("unique_listeners_number", "N/A")
+    unique_subscribers = overview_data.get("unique_subscribers_number", "N/A")
+    episodes_count = overview_data.get("published_episodes_count", "N/A")
+    mean_downloads = overview_data.get("mean_episode_download", "N/A")
+
+    # Format top episodes
+    top_episodes = ""
+    for idx, episode in enumerate(overview_data.get("top_episodes", [])[:5], 1):
+        title = episode.get("title", "Unknown")
+        downloads = episode.get("downloads", 0)
+        top_episodes += f"{idx}. {title}: {downloads} downloads\n"
+
+    total_downloads = aggregate["total_downloads"] if aggregate is not None else "N/A"
+    breakdowns = format_breakdowns(aggregate) if aggregate is not None else "## Breakdowns\nNot available.\n\n"
+    if overview_missing:
+        top_episodes = "Not available.\n"
+
+    summary = f"""
+# Podcast Analytics Summary
+**Time Period:** {start_date} to {end_date}
+
+## Overview Stats
+- Total Downloads: {total_downloads}
+- Unique Listeners: {unique_listeners}
+- Unique Subscribers: {unique_subscribers}
+- Published Episodes: {episodes_count}
+- Average Downloads per Episode: {mean_downloads}
+
+## Top Episodes
+{top_episodes}
+{breakdowns}
+"""
+    # Add attribution footer
+    return summary + get_attribution_footer()
+
+
+def format_downloads_series(objects: List[Dict[str, Any]], granularity: str) -> str:
+    """
+    Format the downloads of each time bucket as a markdown table.
+
+    Args:
+        objects: Analytics objects in chronological order
+        granularity: Granularity of the objects (for the title)
+
+    Returns:
+        Markdown section listing at most MAX_SERIES_ROWS of the most recent buckets
+    """
+    if not objects:
+        return f"## Downloads per {granularity}\nNo data available.\n\n"
+
+    shown = objects[-MAX_SERIES_ROWS:]
+    result = f"## Downloads per {granularity}\n"
+    if len(shown) < len(objects):
+        result += f"*Showing the last {len(shown)} of {len(objects)} periods.*\n\n"
+    result += "| Period | Downloads |\n|---|---|\n"
+    for obj in shown:
+        period = obj.get("downloaded_on", "unknown")
+        if granularity != "hour":
+            period = _date_part(period, "downloaded_on")
+        result += f"| {period} | {obj.get('downloads', {}).get('complete', 0)} |\n"
+    return result + "\n"
+
+
+def render_episode_analytics(
+    analytics_data: Dict[str, Any],
+    aggregate: Dict[str, Any],
+    show_series: bool = False
+) -> str:
+    """
+    Render the episode analytics summary.
+
+    Args:
+        analytics_data: Raw episode analytics data from the Podigee API (for its metadata)
+        aggregate: Result of aggregate_analytics for the analytics objects
+        show_series: Include the downloads of each time bucket (used when a specific
+                     granularity was asked for)
+
+    Returns:
+        Formatted episode analytics summary as string
+    """
+    meta = analytics_data.get("meta", {})
+    timerange = meta.get("timerange", {})
+    start_date = timerange.get("start_datetime", "N/A")
+    end_date = timerange.get("end_datetime", "N/A")
+    granularity = meta.get("aggregation_granularity", "N/A")
+    series = format_downloads_series(analytics_data.get("objects", []), granularity) if show_series else ""
+
+    summary = f"""
+# Episode Analytics Summary
+**Time Period:** {start_date} to {end_date}
+**Granularity:** {granularity}
+
+## Overview Stats
+- Total Downloads: {aggregate["total_downloads"]}
+
+{series}{format_breakdowns(aggregate)}
+"""
+    # Add attribution footer
+    return summary + get_attribution_footer()
@@ -0,0 +1,141 @@
+"""
+Hedged requests for the Podigee API.
+
+Every Podigee request is an idempotent GET, so when one takes unusually long it is
+safe to send a duplicate and use whichever response arrives first. With hedging
+enabled (PODIGEE_HEDGE=1), a request that has not been answered after the recent
+PODIGEE_HEDGE_PERCENTILE latency of its endpoint family gets one duplicate. The
+duplicate only starts if the scheduler has a free slot and the rate limiter a spare
+token, so hedging never queues behind or ahead of other work and never exceeds the
+request budget. Which of the two won is counted in podigee_hedged_requests.
+"""
+
+import os
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from podigee.metrics import metrics
+from podigee.scheduler import TaskScheduler
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Constants
+HEDGE_ENABLED = os.getenv("PODIGEE_HEDGE", "0") == "1"
+HEDGE_PERCENTILE = float(os.getenv("PODIGEE_HEDGE_PERCENTILE", "0.95"))
+HEDGE_MIN_DELAY = float(os.getenv("PODIGEE_HEDGE_MIN_DELAY", "0.05"))
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 200
+
+
+class HedgePolicy:
+    """
+    Decides when to hedge, from the recent latencies of each endpoint family.
+    """
+
+    def __init__(
+        self,
+        percentile: float = HEDGE_PERCENTILE,
+        min_delay: float = HEDGE_MIN_DELAY,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        window: int = HEDGE_WINDOW
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            percentile: Latency percentile (0-1) after which a duplicate is sent
+            min_delay: Never hedge sooner than this many seconds
+            min_samples: Latencies needed before an endpoint family is hedged
+            window: Number of recent latencies kept per endpoint family
+        """
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1")
+
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window = window
+        self._latencies: Dict[str, Deque[float]] = {}
+
+    def observe(self, family: str, latency: float) -> None:
+        """
+        Record the upstream latency of a completed request.
+        """
+        latencies = self._latencies.get(family)
+        if latencies is None:
+            latencies = self._latencies[family] = deque(maxlen=self.window)
+        latencies.append(latency)
+
+    def delay(self, family: str) -> Optional[float]:
+        """
+        Seconds to wait for a response before sending a duplicate.
+
+        Returns:
+            The delay, or None while too few latencies are known to pick one
+        """
+        latencies = self._latencies.get(family)
+        if latencies is None or len(latencies) < self.min_samples:
+            return None
+        ordered = sorted(latencies)
+        return max(self.min_delay, ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))])
+
+
+async def run_hedged(
+    scheduler: TaskScheduler,
+    policy: HedgePolicy,
+    family: str,
+    func: Callable[..., Awaitable[T]],
+    *args: Any
+) -> T:
+    """
+    Run ``func(*args)`` through the scheduler, hedging it if it is slow.
+
+    The first successful result wins and the other request is cancelled. If one of
+    them fails while the other is still running, the other one is awaited.
+
+    Args:
+        scheduler: Scheduler to run the requests with
+        policy: Policy deciding the hedge delay
+        family: Endpoint family of the request
+        func: Coroutine function sending the request
+
+    Returns:
+        Result of the request that finished first
+    """
+    delay = policy.delay(family)
+    if delay is None:
+        return await scheduler.run(func, *args)
+
+    primary = asyncio.ensure_future(scheduler.run(func, *args))
+    tasks = {primary: "primary"}
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if not done:
+            hedge = scheduler.try_start(func, *args)
+            if hedge is None:
+                metrics.inc("podigee_hedged_requests", endpoint=family, result="skipped")
+            else:
+                logger.debug(f"Hedging {family} request after {delay:.3f}s")
+                tasks[hedge] = "hedge"
+
+        pending = set(tasks)
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded or not pending:
+                winner = (succeeded or list(done))[0]
+                if succeeded and len(tasks) > 1:
+                    metrics.inc("podigee_hedged_requests", endpoint=family, result=tasks[winner])
+                return winner.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+# Latencies are a property of the upstream API, so all clients learn from each other
+default_hedging = HedgePolicy()
@@ -0,0 +1,316 @@
+"""
+In-process latency and throughput metrics for the Podigee MCP server.
+
+Metrics are kept as fixed-bucket histograms and counters (the Prometheus data model),
+so they can be summarised for the diagnostics tool and dumped as Prometheus text or
+OpenMetrics without any extra dependency.
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Constants
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+METRICS_FILE = os.getenv("PODIGEE_METRICS_FILE")
+METRICS_FORMAT = os.getenv("PODIGEE_METRICS_FORMAT", "prometheus")
+METRICS_DUMP_INTERVAL = float(os.getenv("PODIGEE_METRICS_DUMP_INTERVAL", "10"))
+
+# Numeric path segments are replaced so that e.g. every podcast shares one label value
+# instead of creating a new time series per podcast ID.
+_ID_SEGMENT = re.compile(r"(?<=/)\d+(?=/|$)")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def worker_metrics_path(path: str, workers: Optional[int] = None) -> str:
+    """
+    Get the metrics file of this process.
+
+    Every HTTP worker has its own registry, so with several workers each one writes a
+    file of its own, named after its pid before the extension (metrics.prom ->
+    metrics.1234.prom), which node_exporter's textfile collector still picks up.
+
+    Args:
+        path: The configured PODIGEE_METRICS_FILE
+        workers: Number of worker processes (default: PODIGEE_MCP_WORKERS)
+
+    Returns:
+        The path to write to
+    """
+    if workers is None:
+        workers = int(os.getenv("PODIGEE_MCP_WORKERS", "1"))
+    if workers <= 1:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.{os.getpid()}{extension}"
+
+
+def endpoint_family(endpoint: str) -> str:
+    """
+    Normalize an API endpoint to its family, e.g. 'podcasts/42/analytics' -> 'podcasts/{id}/analytics'.
+
+    Args:
+        endpoint: API endpoint path (without the base URL)
+
+    Returns:
+        Endpoint path with numeric IDs replaced by '{id}'
+    """
+    return _ID_SEGMENT.sub("{id}", endpoint.strip("/"))
+
+
+class Histogram:
+    """
+    Cumulative fixed-bucket histogram for one label set.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile by linear interpolation inside the matching bucket,
+        the same way Prometheus' histogram_quantile() does.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        lower = 0.0
+        for i, bound in enumerate(self.buckets):
+            previous = cumulative
+            cumulative += self.counts[i]
+            if cumulative >= rank:
+                in_bucket = self.counts[i]
+                fraction = (rank - previous) / in_bucket if in_bucket else 0.0
+                return lower + (bound - lower) * fraction
+            lower = bound
+        # The quantile is in the +Inf bucket, the best we can say is "above the last bound"
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of histograms and counters, keyed by name and labels.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, str] = {}
+        self._buckets: Dict[str, Sequence[float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._last_dump = 0.0
+
+    def describe(self, name: str, help_text: str, buckets: Optional[Sequence[float]] = None) -> None:
+        """
+        Register help text (and optionally buckets) for a metric.
+
+        Args:
+            name: Metric name
+            help_text: Description shown in the text exposition
+            buckets: Histogram bucket bounds (default: latency buckets in seconds)
+        """
+        self._help[name] = help_text
+        if buckets is not None:
+            self._buckets[name] = tuple(buckets)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """
+        Record a value in a histogram.
+        """
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self._buckets.get(name, LATENCY_BUCKETS))
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        """
+        Increment a counter. Counter names are given without the '_total' suffix.
+        """
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """
+        Observe the wall-clock duration of the block in seconds.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def histograms(self) -> List[Tuple[str, Dict[str, str], Histogram]]:
+        """
+        Get all histogram series sorted by name and labels.
+        """
+        with self._lock:
+            return [
+                (name, dict(key), histogram)
+                for name in sorted(self._histograms)
+                for key, histogram in sorted(self._histograms[name].items())
+            ]
+
+    def counters(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """
+        Get all counter series sorted by name and labels.
+        """
+        with self._lock:
+            return [
+                (name, dict(key), value)
+                for name in sorted(self._counters)
+                for key, value in sorted(self._counters[name].items())
+            ]
+
+    def reset(self) -> None:
+        """
+        Drop all recorded values (help texts and buckets are kept).
+        """
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self, fmt: str = "prometheus") -> str:
+        """
+        Render all metrics in the Prometheus text format or as OpenMetrics.
+
+        Args:
+            fmt: 'prometheus' (text format 0.0.4) or 'openmetrics'
+
+        Returns:
+            Text exposition of all metrics
+        """
+        if fmt not in ("prometheus", "openmetrics"):
+            raise ValueError(f"Unsupported metrics format: {fmt}")
+        openmetrics = fmt == "openmetrics"
+        lines: List[str] = []
+
+        current = None
+        for name, labels, histogram in self.histograms():
+            if name != current:
+                current = name
+                lines.extend(self._header(name, "histogram", name))
+            cumulative = 0
+            for bound, count in zip(list(histogram.buckets) + [float("inf")], histogram.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels, le=le)} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        current = None
+        for name, labels, value in self.counters():
+            if name != current:
+                current = name
+                # OpenMetrics names the counter family without the _total suffix
+                lines.extend(self._header(name, "counter", name if openmetrics else f"{name}_total"))
+            lines.append(f"{name}_total{_format_labels(labels)} {_format_value(value)}")
+
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str, fmt: str = "prometheus") -> None:
+        """
+        Write the text exposition to a file atomically, e.g. for node_exporter's textfile collector.
+
+        Args:
+            path: Target file path
+            fmt: 'prometheus' or 'openmetrics'
+        """
+        # Write to a temp file and rename, so scrapers never read a half-written file.
+        # The pid keeps processes writing the same file from sharing the temp file.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render(fmt))
+        os.replace(tmp_path, path)
+        self._last_dump = time.monotonic()
+
+    def maybe_dump(self) -> None:
+        """
+        Dump to PODIGEE_METRICS_FILE (one file per worker, see worker_metrics_path) if
+        configured and the dump interval has passed.
+        """
+        if not METRICS_FILE or time.monotonic() - self._last_dump < METRICS_DUMP_INTERVAL:
+            return
+        path = worker_metrics_path(METRICS_FILE)
+        try:
+            self.dump(path, METRICS_FORMAT)
+        except OSError as e:
+            logger.error(f"Failed to write metrics file {path}: {str(e)}")
+            # Don't retry on every single tool call if the path is broken
+            self._last_dump = time.monotonic()
+
+    def _header(self, name: str, metric_type: str, family: str) -> List[str]:
+        help_text = self._help.get(name)
+        header = [f"# HELP {family} {help_text}"] if help_text else []
+        header.append(f"# TYPE {family} {metric_type}")
+        return header
+
+
+def _label_key(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str], **extra: str) -> str:
+    items = list(labels.items()) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label_value(str(v))}"' for k, v in items) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+# Process-wide registry used by the client and the tool wrapper
+metrics = MetricsRegistry()
+
+metrics.describe("podigee_upstream_latency_seconds", "Latency of Podigee API HTTP requests.")
+metrics.describe("podigee_upstream_response_bytes", "Size of Podigee API response bodies.", BYTES_BUCKETS)
+metrics.describe("podigee_json_decode_seconds", "Time spent decoding Podigee API JSON responses.")
+metrics.describe("podigee_upstream_requests", "Podigee API HTTP requests by status.")
+metrics.describe("podigee_cache_requests", "Podigee API response cache lookups by result.")
+metrics.describe("podigee_cache_revalidations", "Requests for expired cache entries by result (not_modified, unchanged, changed).")
+metrics.describe("podigee_circuit_transitions", "Circuit breaker state changes by endpoint family.")
+metrics.describe("podigee_stale_responses", "Expired cached responses served while the Podigee API was failing.")
+metrics.describe("podigee_hedged_requests", "Slow requests by hedging result (primary or hedge won, skipped for lack of budget).")
+metrics.describe("podigee_tool_latency_seconds", "End-to-end latency of MCP tool calls.")
+metrics.describe("podigee_tool_calls", "MCP tool calls by outcome.")
+metrics.describe("podigee_aggregation_seconds", "Time spent aggregating analytics objects.")
+metrics.describe("podigee_render_seconds", "Time spent rendering tool output.")
+metrics.describe("podigee_offloaded_tasks", "CPU-bound tasks by the executor they ran on.")
+metrics.describe("podigee_upload_parts", "Uploaded parts of multipart uploads by result (ok, retry, failed).")
+metrics.describe("podigee_rollup_queries", "Podcast analytics rollup lookups by result (hit, extend, rebuild, bypass).")
+metrics.describe("podigee_catalog_syncs", "Episode catalog syncs by kind (full, delta, reconcile).")
@@ -0,0 +1,87 @@
+"""
+Run CPU-heavy work off the event loop thread.
+
+Aggregating a year of hourly analytics objects takes long enough to stall every other
+tool call sharing the event loop (all sessions of an HTTP worker). Payloads above a size
+threshold are therefore aggregated in a process pool; small ones stay inline, where the
+executor round trip would cost more than the work itself. Pickling the objects for the
+worker still holds the GIL, but takes roughly half as long as aggregating them.
+
+JSON decoding is not moved to a thread: json.loads holds the GIL for the whole call,
+so the event loop would be blocked just the same.
+"""
+
+import os
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+
+from podigee.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Constants
+OFFLOAD_MIN_OBJECTS = int(os.getenv("PODIGEE_OFFLOAD_MIN_OBJECTS", "500"))
+OFFLOAD_WORKERS = int(os.getenv("PODIGEE_OFFLOAD_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+T = TypeVar("T")
+
+_process_pool: Optional[Executor] = None
+
+
+def _get_process_pool() -> Executor:
+    global _process_pool
+    if _process_pool is None:
+        # spawn rather than fork: forking a process running an event loop and
+        # uvicorn's threads can copy held locks into the child
+        _process_pool = ProcessPoolExecutor(
+            max_workers=OFFLOAD_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+
+def shutdown() -> None:
+    """
+    Shut down the process pool, if one was started.
+    """
+    global _process_pool
+    if _process_pool is not None:
+        pool, _process_pool = _process_pool, None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_cpu_bound(func: Callable[..., T], *args: Any, size: int = 0) -> T:
+    """
+    Run a CPU-bound function, in the process pool if the input is large.
+
+    The function and its arguments must be picklable (a module-level function of a
+    module without server state, e.g. podigee.formatting).
+
+    Args:
+        func: Function to run
+        size: Size of the input, compared with PODIGEE_OFFLOAD_MIN_OBJECTS
+
+    Returns:
+        Result of the function
+    """
+    if OFFLOAD_WORKERS < 1 or size < OFFLOAD_MIN_OBJECTS:
+        metrics.inc("podigee_offloaded_tasks", executor="inline")
+        return func(*args)
+
+    loop = asyncio.get_running_loop()
+    try:
+        result = await loop.run_in_executor(_get_process_pool(), func, *args)
+    except BrokenProcessPool:
+        # A crashed worker breaks the whole pool, start a new one for the next call
+        # and don't fail this one
+        logger.warning("Offload process pool broke, running inline")
+        shutdown()
+        metrics.inc("podigee_offloaded_tasks", executor="inline")
+        return func(*args)
+    metrics.inc("podigee_offloaded_tasks", executor="process")
+    return result
+
@@ -0,0 +1,113 @@
+"""
+Local resampling of analytics time series to coarser granularities.
+
+The Podigee API can aggregate episode analytics by hour, day, week or month, but every
+granularity is a separate request. Daily objects are rolled up here into ISO weeks
+(starting Monday) and calendar months instead, so day, week and month views of the same
+episode share one (cached) upstream response.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+# Supported granularities from finest to coarsest
+GRANULARITIES = ("hour", "day", "week", "month")
+
+# Granularity fetched from the API for each requested granularity
+SOURCE_GRANULARITY = {
+    "hour": "hour",
+    "day": "day",
+    "week": "day",
+    "month": "day",
+}
+
+# Per-object breakdown dictionaries summed up when buckets are merged
+SUMMED_KEYS = ("downloads", "formats", "platforms", "countries", "clients", "clients_on_platforms")
+
+
+def bucket_start(timestamp: str, granularity: str) -> str:
+    """
+    Get the start of the bucket a timestamp falls into.
+
+    Args:
+        timestamp: ISO 8601 timestamp as returned by the API (e.g. 2024-01-03T00:00:00Z)
+        granularity: 'day', 'week' (ISO week, starting Monday) or 'month'
+
+    Returns:
+        Bucket start in the API's timestamp format
+
+    Raises:
+        ValueError: If the timestamp or granularity is invalid
+    """
+    try:
+        day = date.fromisoformat(timestamp[:10])
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid timestamp '{timestamp}'")
+
+    if granularity == "day":
+        start = day
+    elif granularity == "week":
+        start = day - timedelta(days=day.weekday())
+    elif granularity == "month":
+        start = day.replace(day=1)
+    else:
+        raise ValueError(f"Cannot resample to granularity '{granularity}'")
+    return datetime(start.year, start.month, start.day).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _add_counts(target: Dict[str, Any], counts: Dict[str, Any]) -> None:
+    for key, count in counts.items():
+        if isinstance(count, (int, float)) and not isinstance(count, bool):
+            target[key] = target.get(key, 0) + count
+
+
+def resample_objects(objects: List[Dict[str, Any]], granularity: str) -> List[Dict[str, Any]]:
+    """
+    Roll up analytics objects into coarser buckets.
+
+    Args:
+        objects: Analytics objects, each with a 'downloaded_on' timestamp
+        granularity: Target granularity ('day', 'week' or 'month')
+
+    Returns:
+        One new object per bucket, in chronological order, with the counts of
+        SUMMED_KEYS summed up. The input objects are not modified.
+
+    Raises:
+        ValueError: If an object has no valid timestamp or the granularity is invalid
+    """
+    buckets: Dict[str, Dict[str, Any]] = {}
+    for obj in objects:
+        start = bucket_start(obj.get("downloaded_on"), granularity)
+        bucket = buckets.get(start)
+        if bucket is None:
+            bucket = buckets[start] = {"downloaded_on": start}
+        for key in SUMMED_KEYS:
+            counts = obj.get(key)
+            if isinstance(counts, dict):
+                _add_counts(bucket.setdefault(key, {}), counts)
+    return [buckets[start] for start in sorted(buckets)]
+
+
+def resample_analytics(analytics_data: Dict[str, Any], granularity: str) -> Dict[str, Any]:
+    """
+    Resample an analytics response to a coarser granularity.
+
+    Args:
+        analytics_data: Analytics response of a finer granularity
+        granularity: Target granularity ('day', 'week' or 'month')
+
+    Returns:
+        A new response with resampled objects; its meta records the granularity the
+        objects were rolled up from in 'resampled_from'
+    """
+    meta = dict(analytics_data.get("meta", {}))
+    source: Optional[str] = meta.get("aggregation_granularity")
+    meta["aggregation_granularity"] = granularity
+    if source:
+        meta["resampled_from"] = source
+    return dict(
+        analytics_data,
+        meta=meta,
+        objects=resample_objects(analytics_data.get("objects", []), granularity)
+    )
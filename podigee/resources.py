@@ -0,0 +1,268 @@
+"""
+MCP resources for Podigee data and change notifications for subscribed ones.
+
+Resources let MCP clients read podcasts and analytics as context without a tool call.
+They are read through the API client, so repeated reads are answered from the response
+cache. Clients can subscribe to a resource: subscribed resources are read again every
+PODIGEE_RESOURCE_POLL_INTERVAL seconds (again through the cache, at background
+priority) and subscribers get a resources/updated notification when the content changed.
+
+Subscriptions live in the memory of the process and belong to a session, so they are
+only offered where a session outlives its requests: over stdio and single-worker
+stateful HTTP, not with stateless HTTP (which several workers imply).
+"""
+
+import os
+import re
+import json
+import asyncio
+import hashlib
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from podigee.dates import window_from_spec
+from podigee.deadline import deadline_scope
+from podigee.scheduler import Priority, tool_scope
+
+logger = logging.getLogger(__name__)
+
+# Constants
+RESOURCE_POLL_INTERVAL = float(os.getenv("PODIGEE_RESOURCE_POLL_INTERVAL", "60"))
+RESOURCE_MIME_TYPE = "application/json"
+
+PODCASTS_URI = "podigee://podcasts"
+PODCAST_URI = "podigee://podcast/{podcast_id}"
+EPISODE_ANALYTICS_URI = "podigee://episode/{episode_id}/analytics/{window}"
+
+
+def _to_json(data: Any) -> str:
+    return json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False)
+
+
+async def read_podcasts(client: Any) -> str:
+    """
+    Content of podigee://podcasts: all podcasts of the account.
+    """
+    return _to_json(await client.list_podcasts())
+
+
+async def read_podcast(client: Any, podcast_id: str) -> str:
+    """
+    Content of podigee://podcast/{podcast_id}: metadata of one podcast.
+    """
+    return _to_json(await client.get_podcast_details(int(podcast_id)))
+
+
+async def read_episode_analytics(client: Any, episode_id: str, window: str) -> str:
+    """
+    Content of podigee://episode/{episode_id}/analytics/{window}.
+
+    The window is 'last-N-days', 'this-month' or 'YYYY-MM-DD..YYYY-MM-DD', in UTC days.
+    """
+    dates = window_from_spec(window)
+    return _to_json(await client.get_episode_analytics(int(episode_id), dates.from_date, dates.to_date))
+
+
+RESOURCES: List[Tuple[str, Callable[..., Awaitable[str]]]] = [
+    (PODCASTS_URI, read_podcasts),
+    (PODCAST_URI, read_podcast),
+    (EPISODE_ANALYTICS_URI, read_episode_analytics),
+]
+
+
+def _uri_pattern(template: str) -> "re.Pattern[str]":
+    return re.compile("^" + re.sub(r"\\\{(\w+)\\\}", r"(?P<\1>[^/]+)", re.escape(template)) + "$")
+
+
+_PATTERNS = [(_uri_pattern(template), reader) for template, reader in RESOURCES]
+
+
+async def read_resource(client: Any, uri: str) -> str:
+    """
+    Read a Podigee resource.
+
+    Args:
+        client: PodigeeAPIClient to read with
+        uri: Resource URI
+
+    Returns:
+        JSON content of the resource
+
+    Raises:
+        ValueError: If the URI is not a Podigee resource or reading it fails
+    """
+    for pattern, reader in _PATTERNS:
+        match = pattern.match(uri)
+        if match:
+            return await reader(client, **match.groupdict())
+    raise ValueError(f"Unknown resource '{uri}'")
+
+
+class ResourceSubscriptions:
+    """
+    Sessions subscribed to resources, and the loop polling those resources for changes.
+    """
+
+    def __init__(self, interval: float = RESOURCE_POLL_INTERVAL):
+        """
+        Initialize the subscriptions.
+
+        Args:
+            interval: Seconds between two reads of each subscribed resource
+        """
+        self.interval = interval
+        # Whether sessions may subscribe, turned off for stateless HTTP
+        self.enabled = True
+        # uri -> session -> client to read with (the session's tenant in HTTP mode)
+        self._subscribers: Dict[str, Dict[Any, Any]] = {}
+        # (uri, id of the client) -> digest of the content last read
+        self._digests: Dict[Tuple[str, int], str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return sum(len(sessions) for sessions in self._subscribers.values())
+
+    def subscribe(self, uri: str, session: Any, client: Any) -> None:
+        """
+        Subscribe a session to a resource and start polling if needed.
+
+        Raises:
+            ValueError: If the URI is not a Podigee resource or subscriptions are disabled
+        """
+        if not self.enabled:
+            raise ValueError("Resource subscriptions are not supported by this server (stateless HTTP)")
+        if not any(pattern.match(uri) for pattern, _ in _PATTERNS):
+            raise ValueError(f"Unknown resource '{uri}'")
+        self._subscribers.setdefault(uri, {})[session] = client
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._poll())
+
+    @asynccontextmanager
+    async def lifespan(self, app: Any) -> AsyncIterator[Set[Any]]:
+        """
+        Lifespan of the MCP server, which runs once per session.
+
+        Yields the set of sessions that subscribed during the run (the request
+        context's lifespan_context); their subscriptions are dropped when the run
+        ends, i.e. when the client disconnects or the transport closes.
+
+        Args:
+            app: The FastMCP server
+        """
+        sessions: Set[Any] = set()
+        try:
+            yield sessions
+        finally:
+            for session in sessions:
+                self.drop_session(session)
+
+    def unsubscribe(self, uri: str, session: Any) -> None:
+        """
+        Remove a session's subscription; polling stops with the last one.
+        """
+        sessions = self._subscribers.get(uri)
+        if sessions is None:
+            return
+        sessions.pop(session, None)
+        if not sessions:
+            del self._subscribers[uri]
+            for key in [key for key in self._digests if key[0] == uri]:
+                del self._digests[key]
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def drop_session(self, session: Any) -> None:
+        """
+        Remove all subscriptions of a session, e.g. when it closed.
+        """
+        for uri in [uri for uri, sessions in self._subscribers.items() if session in sessions]:
+            self.unsubscribe(uri, session)
+
+    async def refresh(self) -> int:
+        """
+        Read every subscribed resource once and notify the subscribers of changes.
+
+        The first read of a resource only records its content.
+
+        Returns:
+            Number of notifications sent
+        """
+        sent = 0
+        for uri, sessions in list(self._subscribers.items()):
+            # Sessions of one account share the content, so it is read once per client
+            by_client: Dict[int, Tuple[Any, List[Any]]] = {}
+            for session, client in sessions.items():
+                by_client.setdefault(id(client), (client, []))[1].append(session)
+
+            for client_id, (client, client_sessions) in by_client.items():
+                try:
+                    with tool_scope("resource_subscriptions", Priority.BACKGROUND), deadline_scope():
+                        content = await read_resource(client, uri)
+                except Exception as e:
+                    # Whatever went wrong with this resource, the others are still polled
+                    logger.warning(f"Could not refresh subscribed resource {uri}: {str(e)}")
+                    continue
+                digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+                previous = self._digests.get((uri, client_id))
+                self._digests[(uri, client_id)] = digest
+                if previous is None or previous == digest:
+                    continue
+                for session in client_sessions:
+                    try:
+                        await session.send_resource_updated(uri)
+                        sent += 1
+                    except Exception as e:
+                        # The session is gone (e.g. the client disconnected)
+                        logger.debug(f"Dropping subscription to {uri}: {str(e)}")
+                        self.unsubscribe(uri, session)
+        return sent
+
+    async def _poll(self) -> None:
+        while self._subscribers:
+            try:
+                await self.refresh()
+            except Exception:
+                # An unexpected error must not end polling for every subscriber
+                logger.exception("Refreshing subscribed resources failed")
+            await asyncio.sleep(self.interval)
+
+
+def enable_subscriptions(server: Any, subscriptions: ResourceSubscriptions, get_client: Callable[[], Any]) -> None:
+    """
+    Handle resources/subscribe and resources/unsubscribe on a low-level MCP server.
+
+    The subscribe capability is advertised while subscriptions.enabled is set. The
+    server has to run with subscriptions.lifespan as its lifespan, which ends the
+    subscriptions of a session with the session.
+
+    Args:
+        server: The FastMCP instance's low-level server
+        subscriptions: Subscriptions to register the sessions with
+        get_client: Returns the API client of the current request
+    """
+
+    @server.subscribe_resource()
+    async def subscribe(uri: Any) -> None:
+        context = server.request_context
+        subscriptions.subscribe(str(uri), context.session, get_client())
+        context.lifespan_context.add(context.session)
+
+    @server.unsubscribe_resource()
+    async def unsubscribe(uri: Any) -> None:
+        subscriptions.unsubscribe(str(uri), server.request_context.session)
+
+    # The low-level server always advertises subscribe=False and FastMCP offers no way
+    # to pass capabilities, so the result is amended; with the handlers above in place
+    # the capability is there, where sessions can hold subscriptions. A session
+    # initialized in test_resources checks that clients actually get to see it.
+    get_capabilities = server.get_capabilities
+
+    def get_capabilities_with_subscribe(*args: Any, **kwargs: Any) -> Any:
+        capabilities = get_capabilities(*args, **kwargs)
+        if capabilities.resources is not None:
+            capabilities.resources.subscribe = subscriptions.enabled
+        return capabilities
+
+    server.get_capabilities = get_capabilities_with_subscribe
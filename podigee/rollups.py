@@ -0,0 +1,270 @@
+"""
+Materialized daily rollups of podcast analytics with prefix sums.
+
+Podcast summaries sum up the daily analytics objects of a window for every breakdown
+dimension. With rollups enabled (PODIGEE_ROLLUPS=1), the days of a podcast are kept
+as running totals per dimension key instead: the counts of any window inside the
+covered days are the difference of two prefix sums, so a summary costs one subtraction
+per key rather than a pass over every day. New days are appended as they settle;
+the most recent PODIGEE_ROLLUP_SETTLE_DAYS days can still change and are always
+fetched and aggregated from the API.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from podigee.dates import SETTLE_DAYS, DateWindow, parse_day
+from podigee.formatting import BREAKDOWN_KEYS, aggregate_analytics
+from podigee.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Constants
+ROLLUPS_ENABLED = os.getenv("PODIGEE_ROLLUPS", "0") == "1"
+ROLLUP_SETTLE_DAYS = int(os.getenv("PODIGEE_ROLLUP_SETTLE_DAYS", str(SETTLE_DAYS)))
+ROLLUP_MAX_PODCASTS = int(os.getenv("PODIGEE_ROLLUP_MAX_PODCASTS", "64"))
+
+
+def _count(value: Any) -> int:
+    # Same accepted types as aggregate_analytics' default
+    return value if isinstance(value, int) and not isinstance(value, bool) else 0
+
+
+def merge_aggregates(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge the aggregates of two disjoint windows.
+
+    Args:
+        first: aggregate_analytics result
+        second: aggregate_analytics result
+
+    Returns:
+        Aggregate of both windows
+    """
+    merged: Dict[str, Any] = {
+        "total_downloads": first["total_downloads"] + second["total_downloads"],
+        "downloads_by_date": dict(first["downloads_by_date"], **second["downloads_by_date"]),
+    }
+    for dimension in BREAKDOWN_KEYS:
+        counts = dict(first[dimension])
+        for key, count in second[dimension].items():
+            counts[key] = counts.get(key, 0) + count
+        merged[dimension] = counts
+    return merged
+
+
+class DailyRollup:
+    """
+    Prefix sums of the daily downloads and breakdowns of one podcast.
+
+    Covers a contiguous range of days starting at 'start'. Index i of every prefix sum
+    list holds the total of the first i days, so a window's count is one subtraction.
+    """
+
+    def __init__(self, podcast_id: int):
+        self.podcast_id = podcast_id
+        self.start: Optional[date] = None
+        self.days = 0
+        self.downloads: List[int] = [0]
+        self.prefix: Dict[str, Dict[str, List[int]]] = {dimension: {} for dimension in BREAKDOWN_KEYS}
+
+    @property
+    def end(self) -> Optional[date]:
+        if self.start is None or self.days == 0:
+            return None
+        return self.start + timedelta(days=self.days - 1)
+
+    def covers(self, first: date, last: date) -> bool:
+        return self.end is not None and self.start <= first and last <= self.end
+
+    def _append_day(self, obj: Dict[str, Any]) -> None:
+        self.downloads.append(self.downloads[-1] + _count(obj.get("downloads", {}).get("complete", 0)))
+        for dimension in BREAKDOWN_KEYS:
+            sums = self.prefix[dimension]
+            counts = obj.get(dimension) or {}
+            for key in counts:
+                if key not in sums:
+                    # A key seen for the first time had no downloads before
+                    sums[key] = [0] * (self.days + 1)
+            for key, column in sums.items():
+                column.append(column[-1] + _count(counts.get(key, 0)))
+        self.days += 1
+
+    def extend(self, objects: List[Dict[str, Any]], first: date, last: date) -> None:
+        """
+        Append the days from 'first' to 'last' (inclusive).
+
+        Args:
+            objects: Daily analytics objects of those days; days without an object
+                     had no downloads
+            first: First day, the day after the current end (or any day if empty)
+            last: Last day
+
+        Raises:
+            ValueError: If the days don't continue the covered range or an object
+                        has no valid date
+        """
+        if self.end is not None and first != self.end + timedelta(days=1):
+            raise ValueError(f"Rollup of podcast {self.podcast_id} ends {self.end}, cannot append from {first}")
+        by_day: Dict[date, Dict[str, Any]] = {}
+        for obj in objects:
+            raw = obj.get("downloaded_on")
+            by_day[parse_day(raw)] = obj
+
+        if self.start is None:
+            self.start = first
+        day = first
+        while day <= last:
+            self._append_day(by_day.get(day, {}))
+            day += timedelta(days=1)
+
+    def query(self, first: date, last: date) -> Dict[str, Any]:
+        """
+        Aggregate a window of covered days.
+
+        Args:
+            first: First day of the window
+            last: Last day of the window (inclusive)
+
+        Returns:
+            Aggregate in the format of aggregate_analytics
+        """
+        i, j = (first - self.start).days, (last - self.start).days + 1
+        aggregate: Dict[str, Any] = {
+            "total_downloads": self.downloads[j] - self.downloads[i],
+            "downloads_by_date": {
+                (self.start + timedelta(days=k)).isoformat(): self.downloads[k + 1] - self.downloads[k]
+                for k in range(i, j)
+            },
+        }
+        for dimension, sums in self.prefix.items():
+            counts = {}
+            for key, column in sums.items():
+                count = column[j] - column[i]
+                if count:
+                    counts[key] = count
+            aggregate[dimension] = counts
+        return aggregate
+
+
+class RollupStore:
+    """
+    Daily rollups of the most recently used podcasts, per API client.
+    """
+
+    def __init__(self, max_podcasts: int = ROLLUP_MAX_PODCASTS, settle_days: int = ROLLUP_SETTLE_DAYS):
+        """
+        Initialize the store.
+
+        Args:
+            max_podcasts: Maximum number of podcast rollups kept in memory
+            settle_days: Number of most recent days that are not materialized, as their
+                         counts may still change
+        """
+        self.max_podcasts = max_podcasts
+        self.settle_days = settle_days
+        self._rollups: "OrderedDict[str, DailyRollup]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._rollups)
+
+    def _rollup(self, key: str, podcast_id: int) -> DailyRollup:
+        rollup = self._rollups.get(key)
+        if rollup is None:
+            rollup = self._rollups[key] = DailyRollup(podcast_id)
+            while len(self._rollups) > self.max_podcasts:
+                evicted, _ = self._rollups.popitem(last=False)
+                self._locks.pop(evicted, None)
+        self._rollups.move_to_end(key)
+        return rollup
+
+    async def _materialize(self, client: Any, key: str, podcast_id: int, first: date, last: date) -> Optional[str]:
+        # Make the rollup cover first..last with as few fetched days as possible.
+        # Returns how that went, or None if the API doesn't return daily data.
+        rollup = self._rollup(key, podcast_id)
+        if rollup.covers(first, last):
+            return "hit"
+        if rollup.end is not None and rollup.start <= first:
+            fetch_first, result = rollup.end + timedelta(days=1), "extend"
+        else:
+            # Starts earlier than what is covered: rebuild, keeping the later days covered
+            fetch_first, result = first, "rebuild"
+            last = max(last, rollup.end or last)
+        # Without an explicit granularity the API answers short windows hourly
+        data = await client.get_podcast_analytics(
+            rollup.podcast_id, fetch_first.isoformat(), last.isoformat(), granularity="day"
+        )
+        granularity = data.get("meta", {}).get("aggregation_granularity")
+        if granularity not in (None, "day"):
+            logger.warning(f"Podcast analytics of {rollup.podcast_id} came in {granularity} granularity, not using rollups")
+            return None
+
+        if result == "rebuild":
+            rollup = self._rollups[key] = DailyRollup(rollup.podcast_id)
+        rollup.extend(data.get("objects", []), fetch_first, last)
+        return result
+
+    async def aggregate(
+        self,
+        client: Any,
+        podcast_id: int,
+        from_date: str,
+        to_date: str,
+        today: Optional[date] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Aggregate the analytics of a podcast over a window.
+
+        Settled days come from the rollup (fetching only days not covered yet), the
+        remaining recent days from the API.
+
+        Args:
+            client: PodigeeAPIClient to fetch with
+            podcast_id: ID of the podcast
+            from_date: Start date in YYYY-MM-DD format
+            to_date: End date in YYYY-MM-DD format (inclusive)
+            today: Current day (default: today in UTC)
+
+        Returns:
+            Tuple of (analytics_data with the window's meta, aggregate in the format of
+            aggregate_analytics)
+
+        Raises:
+            ValueError: If a date is invalid or an API request fails
+        """
+        window = DateWindow(parse_day(from_date), parse_day(to_date))
+        if window.end < window.start:
+            raise ValueError(f"to_date {to_date} is before from_date {from_date}")
+        settled, recent = window.split(today, self.settle_days)
+        key = f"{client.cache_namespace}/{podcast_id}"
+        started = time.perf_counter()
+
+        aggregate: Optional[Dict[str, Any]] = None
+        if settled is not None:
+            async with self._locks.setdefault(key, asyncio.Lock()):
+                result = await self._materialize(client, key, podcast_id, settled.start, settled.end)
+                if result is not None:
+                    aggregate = self._rollups[key].query(settled.start, settled.end)
+            metrics.inc("podigee_rollup_queries", result=result or "bypass")
+            if result is None:
+                data = await client.get_podcast_analytics(podcast_id, from_date, to_date)
+                return data, aggregate_analytics(data.get("objects", []))
+
+        if recent is not None:
+            # Recent days are few, aggregating them inline is cheap
+            data = await client.get_podcast_analytics(podcast_id, recent.from_date, recent.to_date, granularity="day")
+            tail = aggregate_analytics(data.get("objects", []))
+            aggregate = tail if aggregate is None else merge_aggregates(aggregate, tail)
+
+        logger.debug(f"Aggregated podcast {podcast_id} {from_date}..{to_date} in {time.perf_counter() - started:.4f}s")
+        analytics_data = {"meta": {
+            "timerange": {"start_datetime": f"{from_date}T00:00:00Z", "end_datetime": f"{to_date}T23:59:59Z"},
+            "aggregation_granularity": "day",
+        }}
+        return analytics_data, aggregate
@@ -0,0 +1,288 @@
+"""
+Bounded-concurrency task scheduler shared by all Podigee API calls.
+
+Every network call made by PodigeeAPIClient is funnelled through a TaskScheduler so
+that fan-out features (portfolio views, batch episodes, prefetching) cannot flood
+the Podigee API or the event loop with unbounded asyncio.gather calls.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("PODIGEE_MAX_CONCURRENCY", "8"))
+DEFAULT_MAX_RPS = float(os.getenv("PODIGEE_MAX_RPS", "0"))
+DEFAULT_TOOL_NAME = "default"
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    """
+    Scheduling priority of a unit of work. Lower values are served first.
+    """
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+# The tool and priority of the current call are tracked in context variables so that
+# deeply nested client methods don't need extra parameters to be scheduled correctly.
+_current_tool: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "podigee_current_tool", default=None
+)
+_current_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "podigee_current_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def tool_scope(tool_name: str, priority: Priority = Priority.INTERACTIVE) -> Iterator[None]:
+    """
+    Tag all scheduled work started inside the block with a tool name and priority.
+
+    Args:
+        tool_name: Name used for per-tool fairness (usually the MCP tool name)
+        priority: Priority of the work (interactive tool calls by default)
+    """
+    tool_token = _current_tool.set(tool_name)
+    priority_token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(priority_token)
+        _current_tool.reset(tool_token)
+
+
+def current_tool() -> Optional[str]:
+    """
+    Get the name of the tool the current call is running for.
+
+    Returns:
+        Tool name, or None when called outside of a tool scope
+    """
+    return _current_tool.get()
+
+
+class RateLimiter:
+    """
+    Token bucket limiting how many requests start per second.
+
+    The concurrency cap alone doesn't bound the request rate once responses are fast
+    (e.g. many clients hitting the server in HTTP mode), so the scheduler can also be
+    given a rate limit to stay within the Podigee API's quota.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            rate: Sustained number of requests per second
+            burst: Number of requests allowed back to back (default: one second's worth)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.capacity = float(burst or max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """
+        Take a token if one is available right now.
+
+        Returns:
+            True if a token was taken
+        """
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def acquire(self) -> None:
+        """
+        Wait until a token is available and take it.
+        """
+        while not self.try_acquire():
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class TaskScheduler:
+    """
+    Runs coroutines under a global concurrency cap.
+
+    Waiters are queued per priority and per tool. Interactive work always goes before
+    background work, and within a priority the tools take turns (round-robin), so one
+    tool fanning out 50 requests cannot starve a tool that only needs one.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        rate_limiter: Optional[RateLimiter] = None
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency: Maximum number of tasks allowed to run at the same time
+            rate_limiter: Optional limit on how many tasks start per second
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter
+        self._active = 0
+        # priority -> tool name -> FIFO of waiting futures. The OrderedDict doubles as
+        # the round-robin ring: a served tool is moved to the end.
+        self._queues: Dict[Priority, "OrderedDict[str, Deque[asyncio.Future]]"] = {
+            priority: OrderedDict() for priority in Priority
+        }
+
+    @property
+    def active(self) -> int:
+        """Number of tasks currently holding a slot."""
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        """Number of tasks queued for a slot."""
+        return sum(len(queue) for tools in self._queues.values() for queue in tools.values())
+
+    async def run(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        priority: Optional[Priority] = None,
+        tool: Optional[str] = None,
+        **kwargs: Any
+    ) -> T:
+        """
+        Run ``func(*args, **kwargs)`` once a slot is available.
+
+        If the calling task is cancelled (e.g. because the MCP request was aborted)
+        while waiting, it is removed from the queue; if cancelled while running, the
+        slot is released to the next waiter.
+
+        Args:
+            func: Coroutine function to run
+            priority: Priority of the work (default: priority of the current tool scope)
+            tool: Tool name used for fairness (default: tool of the current tool scope)
+
+        Returns:
+            Result of the coroutine
+        """
+        if priority is None:
+            priority = _current_priority.get()
+        if tool is None:
+            tool = _current_tool.get() or DEFAULT_TOOL_NAME
+
+        await self._acquire(priority, tool)
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            return await func(*args, **kwargs)
+        finally:
+            self._release()
+
+    def try_start(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> Optional["asyncio.Task[T]"]:
+        """
+        Start ``func(*args, **kwargs)`` as a task only if it can run right away.
+
+        Used for optional work such as hedged requests: it never queues, never jumps
+        ahead of waiting tasks and never waits for the rate limiter, so it only uses
+        capacity nobody else is asking for.
+
+        Args:
+            func: Coroutine function to run
+
+        Returns:
+            The running task holding a slot, or None if no slot or rate token was free
+        """
+        if self._active >= self.max_concurrency or self.waiting:
+            return None
+        if self.rate_limiter is not None and not self.rate_limiter.try_acquire():
+            return None
+        self._active += 1
+
+        async def run_in_slot() -> T:
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self._release()
+
+        return asyncio.ensure_future(run_in_slot())
+
+    async def _acquire(self, priority: Priority, tool: str) -> None:
+        if self._active < self.max_concurrency and not self.waiting:
+            self._active += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues[priority].setdefault(tool, deque()).append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed to us right before the cancellation arrived,
+                # pass it on instead of leaking it.
+                self._release()
+            else:
+                self._discard(priority, tool, waiter)
+            raise
+
+    def _release(self) -> None:
+        waiter = self._next_waiter()
+        if waiter is None:
+            self._active -= 1
+        else:
+            # Hand the slot over directly, the active count stays the same
+            waiter.set_result(None)
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        for priority in Priority:
+            tools = self._queues[priority]
+            while tools:
+                tool, queue = next(iter(tools.items()))
+                waiter = queue.popleft()
+                if queue:
+                    tools.move_to_end(tool)
+                else:
+                    del tools[tool]
+                if not waiter.done():
+                    return waiter
+        return None
+
+    def _discard(self, priority: Priority, tool: str, waiter: asyncio.Future) -> None:
+        queue = self._queues[priority].get(tool)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            pass
+        if not queue:
+            del self._queues[priority][tool]
+
+
+# Process-wide scheduler shared by every PodigeeAPIClient unless one is injected
+default_scheduler = TaskScheduler(
+    rate_limiter=RateLimiter(DEFAULT_MAX_RPS) if DEFAULT_MAX_RPS > 0 else None
+)
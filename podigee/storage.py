@@ -0,0 +1,114 @@
+"""
+Private on-disk locations for the server's caches and state.
+
+The response cache, episode catalogs and upload manifests hold API responses of every
+account served, unpublished episode metadata and presigned storage URLs. They default
+to a directory of the user running the server (under XDG_CACHE_HOME, ~/.cache by
+default) rather than a predictable path in the shared temp directory. Directories are
+created with mode 0o700 and files with 0o600, and a location owned by another user is
+refused, so other local users can neither read the data nor plant entries in it.
+"""
+
+import os
+import stat
+import logging
+from typing import IO
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_DATA_DIR = os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "podigee-mcp"
+)
+
+
+def _check_owner(path: str, status: os.stat_result) -> None:
+    # Not available on Windows, where the user's profile directory is private anyway
+    if hasattr(os, "getuid") and status.st_uid != os.getuid():
+        raise ValueError(f"{path} is owned by another user, refusing to use it")
+
+
+def private_directory(path: str) -> str:
+    """
+    Create a directory only the current user can access, or check an existing one.
+
+    An existing directory of the current user that others can access is restricted.
+
+    Args:
+        path: Directory path
+
+    Returns:
+        The path
+
+    Raises:
+        ValueError: If the directory can't be created, is not a directory or is owned
+                    by another user
+    """
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        status = os.lstat(path)
+        if not stat.S_ISDIR(status.st_mode):
+            raise ValueError(f"{path} is not a directory")
+        _check_owner(path, status)
+        if status.st_mode & 0o077:
+            logger.warning(f"Restricting access to {path} to the current user")
+            os.chmod(path, 0o700)
+    except OSError as e:
+        raise ValueError(f"Cannot use directory {path}: {str(e)}")
+    return path
+
+
+def private_file(path: str) -> str:
+    """
+    Create a file only the current user can access, or check an existing one.
+
+    A missing parent directory is created with private_directory; an existing one
+    (e.g. a system cache directory) is left as it is.
+
+    Args:
+        path: File path
+
+    Returns:
+        The path
+
+    Raises:
+        ValueError: If the file can't be created or is owned by another user
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(parent):
+        private_directory(parent)
+    try:
+        # O_NOFOLLOW: a symlink planted at the path must not redirect the file
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o600)
+        try:
+            status = os.fstat(fd)
+            _check_owner(path, status)
+            if status.st_mode & 0o077:
+                logger.warning(f"Restricting access to {path} to the current user")
+                os.fchmod(fd, 0o600)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        raise ValueError(f"Cannot use file {path}: {str(e)}")
+    return path
+
+
+def open_private(path: str) -> IO[str]:
+    """
+    Open a new file for writing text that only the current user can read.
+
+    Meant for the temporary file of a write-and-rename, so the renamed file keeps
+    the mode as well.
+
+    Args:
+        path: File path (replaced if it exists)
+
+    Returns:
+        The file, opened for writing UTF-8 text
+
+    Raises:
+        OSError: If the file can't be created
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_NOFOLLOW", 0), 0o600)
+    return os.fdopen(fd, "w", encoding="utf-8")
@@ -0,0 +1,214 @@
+"""
+Per-tenant Podigee API clients for serving several Podigee accounts from one server.
+
+In HTTP mode each MCP request may carry its own Podigee API key. Every distinct key
+(a tenant) gets its own PodigeeAPIClient with its own scheduler (concurrency and
+rate-limit budget), connection pool and cache namespace, so one busy account cannot
+use up the limits of the others. Idle tenants are evicted least recently used first.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, List, Optional, Union
+
+from podigee.api import PodigeeAPIClient
+from podigee.cache import ResponseCache, SQLiteResponseCache, create_cache, key_fingerprint
+from podigee.scheduler import RateLimiter, TaskScheduler
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_MAX_TENANTS = int(os.getenv("PODIGEE_MAX_TENANTS", "256"))
+DEFAULT_TENANT_IDLE_TTL = float(os.getenv("PODIGEE_TENANT_IDLE_TTL", "900"))
+DEFAULT_TENANT_MAX_CONCURRENCY = int(os.getenv("PODIGEE_TENANT_MAX_CONCURRENCY", "4"))
+DEFAULT_TENANT_MAX_RPS = float(os.getenv("PODIGEE_TENANT_MAX_RPS", "0"))
+DEFAULT_TENANT_POOL_SIZE = int(os.getenv("PODIGEE_TENANT_POOL_SIZE", "4"))
+# Serve HTTP requests without an API key of their own with the server's PODIGEE_API_KEY.
+# Only for deployments where everyone who can reach the server may use that account.
+SINGLE_TENANT = os.getenv("PODIGEE_MCP_SINGLE_TENANT", "0") == "1"
+
+# Where a request can carry its Podigee API key
+API_KEY_HEADER = "x-podigee-api-key"
+API_KEY_META_FIELD = "podigee_api_key"
+
+
+def tenant_id(api_key: str) -> str:
+    """
+    Derive a stable tenant id from an API key.
+
+    The key itself is never used as cache namespace, log field or metric label.
+
+    Args:
+        api_key: Podigee API key
+
+    Returns:
+        Short hex digest identifying the tenant
+    """
+    return key_fingerprint(api_key)
+
+
+def api_key_from_request(request_context: Any) -> Optional[str]:
+    """
+    Get the Podigee API key an MCP request was made with.
+
+    Looks at the HTTP request headers (``X-Podigee-Api-Key`` or an ``Authorization:
+    Bearer`` token) and then at the ``podigee_api_key`` field of the request's
+    ``_meta``.
+
+    Args:
+        request_context: The MCP request context (may be None outside of a request)
+
+    Returns:
+        The API key, or None if the request didn't carry one
+    """
+    if request_context is None:
+        return None
+
+    headers = getattr(getattr(request_context, "request", None), "headers", None)
+    if headers is not None:
+        api_key = headers.get(API_KEY_HEADER)
+        if api_key:
+            return api_key.strip()
+        scheme, _, token = (headers.get("authorization") or "").partition(" ")
+        if scheme.lower() == "bearer" and token.strip():
+            return token.strip()
+
+    meta = getattr(request_context, "meta", None)
+    api_key = getattr(meta, API_KEY_META_FIELD, None)
+    return api_key if isinstance(api_key, str) and api_key else None
+
+
+class _Tenant:
+    __slots__ = ("client", "last_used")
+
+    def __init__(self, client: PodigeeAPIClient):
+        self.client = client
+        self.last_used = time.monotonic()
+
+
+class TenantRegistry:
+    """
+    LRU registry of per-tenant PodigeeAPIClient instances.
+
+    All tenants share one response cache so memory stays bounded, but each tenant's
+    entries live under its own namespace and are never served to another tenant.
+    """
+
+    def __init__(
+        self,
+        max_tenants: int = DEFAULT_MAX_TENANTS,
+        idle_ttl: float = DEFAULT_TENANT_IDLE_TTL,
+        max_concurrency: int = DEFAULT_TENANT_MAX_CONCURRENCY,
+        max_rps: float = DEFAULT_TENANT_MAX_RPS,
+        pool_size: Optional[int] = DEFAULT_TENANT_POOL_SIZE,
+        cache: Optional[Union[ResponseCache, SQLiteResponseCache]] = None,
+        base_url: Optional[str] = None
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            max_tenants: Maximum number of tenants kept at once
+            idle_ttl: Seconds after which an unused tenant is evicted
+            max_concurrency: Concurrent API requests per tenant
+            max_rps: API requests started per second per tenant (0 for no limit)
+            pool_size: Kept-alive connections per tenant (None for a connection per request)
+            cache: Response cache shared by all tenants (default: a new cache configured
+                   through the PODIGEE_CACHE_* env vars)
+            base_url: API base URL of the tenant clients
+        """
+        if max_tenants < 1:
+            raise ValueError("max_tenants must be at least 1")
+
+        self.max_tenants = max_tenants
+        self.idle_ttl = idle_ttl
+        self.max_concurrency = max_concurrency
+        self.max_rps = max_rps
+        self.pool_size = pool_size
+        self.cache = cache if cache is not None else create_cache()
+        self.base_url = base_url
+        self._tenants: "OrderedDict[str, _Tenant]" = OrderedDict()
+        # Evicted clients with requests still in flight, closed once they are idle
+        self._retired: List[PodigeeAPIClient] = []
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+    def __contains__(self, api_key: str) -> bool:
+        return tenant_id(api_key) in self._tenants
+
+    def client_for(self, api_key: str) -> PodigeeAPIClient:
+        """
+        Get (or create) the client of the tenant owning an API key.
+
+        Args:
+            api_key: Podigee API key of the request
+
+        Returns:
+            The tenant's client
+        """
+        tid = tenant_id(api_key)
+        tenant = self._tenants.get(tid)
+        if tenant is None:
+            tenant = _Tenant(self._create_client(api_key))
+            self._tenants[tid] = tenant
+            logger.info(f"Created client for tenant {tid}")
+        self._tenants.move_to_end(tid)
+        tenant.last_used = time.monotonic()
+        self._evict()
+        return tenant.client
+
+    def _create_client(self, api_key: str) -> PodigeeAPIClient:
+        scheduler = TaskScheduler(
+            max_concurrency=self.max_concurrency,
+            rate_limiter=RateLimiter(self.max_rps) if self.max_rps > 0 else None
+        )
+        return PodigeeAPIClient(
+            api_key=api_key,
+            scheduler=scheduler,
+            base_url=self.base_url,
+            cache=self.cache,
+            pool_size=self.pool_size
+        )
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._tenants:
+            tid, tenant = next(iter(self._tenants.items()))
+            if len(self._tenants) <= self.max_tenants and now - tenant.last_used < self.idle_ttl:
+                break
+            del self._tenants[tid]
+            # With a shared cache backend the entries stay useful to other workers
+            if isinstance(self.cache, ResponseCache):
+                self.cache.invalidate(tenant.client.cache_namespace)
+            self._retired.append(tenant.client)
+            logger.info(f"Evicted tenant {tid}")
+        self._close_retired()
+
+    def _close_retired(self) -> None:
+        # Closing a connection pool needs the event loop, and a client that still
+        # has requests queued or running must keep its pool until they finish
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        busy = []
+        for client in self._retired:
+            if client.scheduler.active or client.scheduler.waiting:
+                busy.append(client)
+            else:
+                loop.create_task(client.aclose())
+        self._retired = busy
+
+    async def aclose(self) -> None:
+        """
+        Close the connection pools of all tenants.
+        """
+        clients = [tenant.client for tenant in self._tenants.values()] + self._retired
+        self._tenants.clear()
+        self._retired = []
+        for client in clients:
+            await client.aclose()
@@ -0,0 +1,66 @@
+"""
+Shared plumbing wrapped around every MCP tool of the Podigee server.
+"""
+
+import time
+import functools
+from typing import Any, Awaitable, Callable
+
+from podigee.breaker import stale_notice, stale_scope
+from podigee.deadline import deadline_scope
+from podigee.metrics import metrics
+from podigee.scheduler import tool_scope
+from podigee.tracing import SPAN_KIND_SERVER, STATUS_ERROR, tracer
+
+
+def managed_tool(func: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+    """
+    Wrap an MCP tool so each invocation runs inside its own scheduler scope and is timed.
+
+    The scope tags every Podigee API call made by the tool with the tool name, which
+    lets the shared scheduler serve tools fairly and rank interactive tool calls ahead
+    of background work. When the MCP request is aborted, the cancellation propagates
+    through the awaited calls and frees any slots queued in the scheduler.
+
+    Every call gets the time budget of podigee.deadline, which bounds all API requests
+    it makes. When the Podigee API is failing and cached data was served instead, a
+    note saying so is appended to the result.
+
+    The end-to-end latency of every call is recorded in the metrics registry, and the
+    metrics file (if configured) is refreshed afterwards. When tracing is enabled, the
+    call becomes the root span of the client and HTTP spans it triggers.
+
+    functools.wraps keeps the original signature visible, so FastMCP still builds
+    the tool schema from the wrapped function's parameters.
+
+    Args:
+        func: The tool coroutine function
+
+    Returns:
+        The wrapped tool coroutine function
+    """
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> str:
+        tool_name = func.__name__
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with tracer.span(f"tool {tool_name}", kind=SPAN_KIND_SERVER) as span, tool_scope(tool_name), \
+                    deadline_scope(), stale_scope() as stale:
+                if span.is_recording():
+                    span.set_attribute("mcp.tool.name", tool_name)
+                result = await func(*args, **kwargs)
+                # Tools report API failures as "Error ..." strings instead of raising
+                outcome = "error" if isinstance(result, str) and result.startswith("Error") else "ok"
+                if outcome == "error" and span.is_recording():
+                    span.set_status(STATUS_ERROR, result[:200])
+                if stale and outcome == "ok":
+                    outcome = "stale"
+                    result += stale_notice(stale)
+            return result
+        finally:
+            metrics.observe("podigee_tool_latency_seconds", time.perf_counter() - started, tool=tool_name)
+            metrics.inc("podigee_tool_calls", tool=tool_name, outcome=outcome)
+            metrics.maybe_dump()
+
+    return wrapper
@@ -0,0 +1,226 @@
+"""
+Optional OpenTelemetry-compatible tracing for the Podigee MCP server.
+
+Spans are created around each MCP tool call, each PodigeeAPIClient method and each
+HTTP request, and are exported as OTLP/JSON lines to a local file (the format read by
+the OpenTelemetry Collector's otlpjsonfile receiver) named by PODIGEE_TRACE_FILE.
+Without PODIGEE_TRACE_FILE, span() hands out a shared no-op object and no IDs,
+timestamps or attributes are computed at all.
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import functools
+import threading
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Constants
+TRACE_FILE = os.getenv("PODIGEE_TRACE_FILE")
+SERVICE_NAME = os.getenv("PODIGEE_TRACE_SERVICE_NAME", "podigee-mcp")
+
+# OTLP enum values
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+T = TypeVar("T")
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "podigee_current_span", default=None
+)
+
+
+class Span:
+    """
+    A single timed operation, modelled after the OpenTelemetry span.
+    """
+
+    def __init__(self, tracer: "Tracer", name: str, kind: int, attributes: Dict[str, Any]):
+        parent = _current_span.get()
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes: Dict[str, Any] = dict(attributes)
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+        self.start_ns = 0
+        self.end_ns = 0
+        self._token: Optional[contextvars.Token] = None
+
+    def is_recording(self) -> bool:
+        return True
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_status(self, code: int, message: str = "") -> None:
+        self.status_code = code
+        self.status_message = message
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.time_ns()
+        if self._token is not None:
+            _current_span.reset(self._token)
+        if exc is not None and self.status_code == STATUS_UNSET:
+            self.set_status(STATUS_ERROR, f"{exc_type.__name__}: {exc}")
+        self.tracer.export(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """
+        Convert the span to its OTLP/JSON representation.
+        """
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status_code},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class _NoopSpan:
+    """
+    Stand-in returned while tracing is disabled. Doubles as its own context manager
+    so the disabled path allocates nothing.
+    """
+
+    def is_recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_status(self, code: int, message: str = "") -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class FileSpanExporter:
+    """
+    Appends finished spans as OTLP/JSON lines (one ExportTraceServiceRequest per line).
+    """
+
+    def __init__(self, path: str, service_name: str = SERVICE_NAME):
+        self.path = path
+        self.resource = {"attributes": [_otlp_attribute("service.name", service_name)]}
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        line = json.dumps({
+            "resourceSpans": [{
+                "resource": self.resource,
+                "scopeSpans": [{
+                    "scope": {"name": "podigee"},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }]
+        })
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            logger.error(f"Failed to write trace file {self.path}: {str(e)}")
+
+
+class Tracer:
+    """
+    Creates spans and hands finished ones to the exporter.
+    """
+
+    def __init__(self, exporter: Optional[FileSpanExporter] = None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def span(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any):
+        """
+        Start a span as a context manager.
+
+        Args:
+            name: Span name
+            kind: OTLP span kind (internal by default)
+            **attributes: Initial span attributes
+
+        Returns:
+            The span, or a shared no-op span while tracing is disabled
+        """
+        if self.exporter is None:
+            return NOOP_SPAN
+        return Span(self, name, kind, attributes)
+
+    def export(self, span: Span) -> None:
+        if self.exporter is not None:
+            self.exporter.export([span])
+
+
+def traced(name: Optional[str] = None) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Decorate a coroutine function so each call runs inside a span.
+
+    Args:
+        name: Span name (default: the function's qualified name)
+    """
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            # Checked per call so the disabled path is a single attribute lookup
+            if tracer.exporter is None:
+                return await func(*args, **kwargs)
+            with tracer.span(span_name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        # OTLP/JSON encodes 64-bit integers as strings
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+# Process-wide tracer, enabled only when a trace file is configured
+tracer = Tracer(FileSpanExporter(TRACE_FILE) if TRACE_FILE else None)
@@ -0,0 +1,367 @@
+"""
+Parallel, resumable multipart uploads of audio files to Podigee.
+
+POST /uploads?filename=...&filesize=... starts an upload. Small files get a single
+presigned upload_url the whole file is PUT to. Large files get a multipart upload: an
+upload_key, a multipart_upload_id, the part_size chosen by Podigee and presigned
+upload_part_urls. The parts are PUT to those URLs directly, several at a time; a part
+whose URL is missing or may have expired (on a retry or a resumed upload) gets a fresh
+one from POST /uploads/part_url. POST /uploads/complete_multipart_url returns the URL
+that assembles the parts into the final file.
+
+The file is memory-mapped and each part is read from the mapping when it is sent, so
+memory use is bounded by the number of parts in flight, not by the file size. Failed
+parts are retried. Progress is saved to a manifest after every part: an upload that
+was interrupted (or ran out of the tool's time budget) continues with the missing
+parts when it is started again for the same, unchanged file.
+"""
+
+import os
+import json
+import mmap
+import asyncio
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+import httpx
+
+from podigee.deadline import DeadlineExceeded, within_deadline
+from podigee.metrics import metrics
+from podigee.storage import DEFAULT_DATA_DIR, open_private, private_directory
+
+logger = logging.getLogger(__name__)
+
+# Constants
+UPLOAD_CONCURRENCY = int(os.getenv("PODIGEE_UPLOAD_CONCURRENCY", "4"))
+UPLOAD_RETRIES = int(os.getenv("PODIGEE_UPLOAD_RETRIES", "3"))
+# Only files below this directory can be uploaded; required in HTTP mode, where the
+# MCP client is not on the server's machine
+UPLOAD_ROOT = os.getenv("PODIGEE_UPLOAD_ROOT")
+# Manifests hold presigned storage URLs, so they are kept in a private directory
+UPLOAD_STATE_DIR = os.getenv("PODIGEE_UPLOAD_STATE_DIR", os.path.join(DEFAULT_DATA_DIR, "uploads"))
+RETRY_BACKOFF = 0.5
+
+
+class UploadState:
+    """
+    Manifest of one multipart upload: the upload's IDs and the parts already uploaded.
+    """
+
+    def __init__(self, path: str, size: int, mtime_ns: int, part_size: int, upload: Dict[str, Any]):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.part_size = part_size
+        self.upload = upload
+        # part number -> ETag returned by the storage
+        self.parts: Dict[int, str] = {}
+
+    @property
+    def part_count(self) -> int:
+        return max(1, -(-self.size // self.part_size))
+
+    def missing_parts(self) -> List[int]:
+        return [number for number in range(1, self.part_count + 1) if number not in self.parts]
+
+    def matches(self, size: int, mtime_ns: int) -> bool:
+        return (self.size, self.mtime_ns) == (size, mtime_ns)
+
+    @property
+    def ids(self) -> Dict[str, Any]:
+        """Query parameters identifying the multipart upload."""
+        return {"upload_key": self.upload["upload_key"], "multipart_upload_id": self.upload["multipart_upload_id"]}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "part_size": self.part_size,
+            "upload": self.upload,
+            "parts": {str(number): etag for number, etag in self.parts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "UploadState":
+        state = cls(data["path"], data["size"], data["mtime_ns"], data["part_size"], data["upload"])
+        state.parts = {int(number): etag for number, etag in data["parts"].items()}
+        return state
+
+
+def _complete_body(parts: Dict[int, str]) -> bytes:
+    items = "".join(
+        f"<Part><PartNumber>{number}</PartNumber><ETag>{escape(etag)}</ETag></Part>"
+        for number, etag in sorted(parts.items())
+    )
+    return f"<CompleteMultipartUpload>{items}</CompleteMultipartUpload>".encode("utf-8")
+
+
+class MultipartUploader:
+    """
+    Uploads local files in parts through a PodigeeAPIClient.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        concurrency: int = UPLOAD_CONCURRENCY,
+        retries: int = UPLOAD_RETRIES,
+        state_dir: Optional[str] = UPLOAD_STATE_DIR,
+        storage: Optional[httpx.AsyncClient] = None
+    ):
+        """
+        Initialize the uploader.
+
+        Args:
+            client: PodigeeAPIClient used for the /uploads endpoints
+            concurrency: Number of parts uploaded at the same time
+            retries: Attempts per part after the first one failed
+            state_dir: Directory of the resumable manifests (None to not persist them)
+            storage: HTTP client for the presigned storage URLs (default: a new one
+                     per upload)
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.client = client
+        self.concurrency = concurrency
+        self.retries = retries
+        self.state_dir = state_dir
+        self.storage = storage
+
+    def _state_path(self, path: str) -> Optional[str]:
+        if self.state_dir is None:
+            return None
+        # Uploads belong to an account, so the same file uploaded by two accounts has two manifests
+        key = f"{self.client.cache_namespace}|{path}"
+        return os.path.join(self.state_dir, hashlib.sha256(key.encode("utf-8")).hexdigest()[:24] + ".json")
+
+    def _load_state(self, path: str, size: int, mtime_ns: int) -> Optional[UploadState]:
+        state_path = self._state_path(path)
+        if state_path is None or not os.path.exists(state_path):
+            return None
+        try:
+            # Never resume from a manifest someone else could have planted
+            private_directory(self.state_dir)
+            with open(state_path, encoding="utf-8") as f:
+                state = UploadState.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable upload manifest {state_path}: {e}")
+            return None
+        if not state.matches(size, mtime_ns):
+            logger.info(f"{path} changed since its upload was started, starting over")
+            return None
+        return state
+
+    def _save_state(self, state: UploadState) -> None:
+        state_path = self._state_path(state.path)
+        if state_path is None:
+            return
+        try:
+            private_directory(self.state_dir)
+            # Write and rename, so a crash never leaves a half-written manifest
+            temporary = f"{state_path}.{os.getpid()}.tmp"
+            with open_private(temporary) as f:
+                json.dump(state.to_dict(), f)
+            os.replace(temporary, state_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not save upload manifest {state_path}: {e}")
+
+    def _drop_state(self, state: UploadState) -> None:
+        state_path = self._state_path(state.path)
+        if state_path is None:
+            return
+        try:
+            os.remove(state_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # The upload is complete, a leftover manifest must not fail it
+            logger.warning(f"Could not remove upload manifest {state_path}: {e}")
+
+    async def _part_url(self, state: UploadState, number: int, listed: bool) -> str:
+        urls = state.upload.get("upload_part_urls") or []
+        if listed and number <= len(urls) and urls[number - 1]:
+            return urls[number - 1]
+        presigned = await self.client.post("uploads/part_url", params=dict(state.ids, part_number=number))
+        if not presigned.get("upload_part_url"):
+            raise ValueError(f"Podigee API returned no URL for part {number}")
+        return presigned["upload_part_url"]
+
+    async def _upload_part(
+        self,
+        storage: httpx.AsyncClient,
+        state: UploadState,
+        data: mmap.mmap,
+        number: int,
+        resumed: bool
+    ) -> None:
+        start = (number - 1) * state.part_size
+        for attempt in range(self.retries + 1):
+            try:
+                # The URLs listed when the upload started may have expired by the time
+                # a part is retried or an interrupted upload is resumed
+                url = await self._part_url(state, number, listed=attempt == 0 and not resumed)
+                # Slicing the mapping reads just this part from the file
+                chunk = data[start:start + state.part_size]
+                response = await within_deadline(
+                    storage.put(url, content=chunk, timeout=self.client.timeout),
+                    what=f"upload of part {number}"
+                )
+                response.raise_for_status()
+                state.parts[number] = response.headers.get("etag", "")
+                metrics.inc("podigee_upload_parts", result="ok")
+                self._save_state(state)
+                return
+            except DeadlineExceeded:
+                raise
+            except (httpx.HTTPError, ValueError) as e:
+                metrics.inc("podigee_upload_parts", result="retry" if attempt < self.retries else "failed")
+                if attempt == self.retries:
+                    raise ValueError(f"Part {number} failed after {attempt + 1} attempts: {str(e)}")
+                logger.warning(f"Part {number} failed ({str(e)}), retrying")
+                await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+    async def upload(self, path: str, filename: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Upload a file, continuing a previous attempt if there is one.
+
+        Args:
+            path: Path of the local file
+            filename: File name given to Podigee (default: the file's own name)
+
+        Returns:
+            Dict with the uploaded 'file_url', the 'size', the number of 'parts' and
+            the number of parts that were already uploaded before ('resumed_parts')
+
+        Raises:
+            ValueError: If the file can't be read or the upload fails; the parts
+                        uploaded so far are kept for the next attempt
+        """
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            raise ValueError(f"Cannot read {path}: {e.strerror}")
+        if stat.st_size == 0:
+            raise ValueError(f"{path} is empty")
+
+        storage = self.storage or httpx.AsyncClient()
+        try:
+            state = self._load_state(path, stat.st_size, stat.st_mtime_ns)
+            if state is None:
+                upload = await self.client.post("uploads", params={
+                    "filename": filename or os.path.basename(path),
+                    "filesize": stat.st_size,
+                })
+                if not upload.get("multipart_upload"):
+                    return await self._upload_whole(storage, path, stat.st_size, upload)
+                if not (upload.get("upload_key") and upload.get("multipart_upload_id") and upload.get("part_size")):
+                    raise ValueError("Podigee API did not start a multipart upload")
+                # Podigee decides the part size, and the presigned part URLs are made for it
+                state = UploadState(path, stat.st_size, stat.st_mtime_ns, int(upload["part_size"]), upload)
+                self._save_state(state)
+            resumed = len(state.parts)
+
+            await self._upload_missing(storage, state, resumed > 0)
+            await self._complete(storage, state)
+        finally:
+            if self.storage is None:
+                await storage.aclose()
+        self._drop_state(state)
+
+        return {
+            "file_url": state.upload.get("file_url"),
+            "size": state.size,
+            "parts": state.part_count,
+            "resumed_parts": resumed,
+        }
+
+    async def _upload_whole(
+        self,
+        storage: httpx.AsyncClient,
+        path: str,
+        size: int,
+        upload: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        # Podigee only chooses a single upload for small files, so reading it whole is fine;
+        # there is nothing to resume
+        if not upload.get("upload_url"):
+            raise ValueError("Podigee API returned no upload URL")
+        headers = {"Content-Type": upload["content_type"]} if upload.get("content_type") else None
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            response = await within_deadline(
+                storage.put(upload["upload_url"], content=content, headers=headers, timeout=self.client.timeout),
+                what=f"upload of {os.path.basename(path)}"
+            )
+            response.raise_for_status()
+        except OSError as e:
+            raise ValueError(f"Cannot read {path}: {e.strerror}")
+        except httpx.HTTPError as e:
+            raise ValueError(f"Upload of {os.path.basename(path)} failed: {str(e)}")
+        metrics.inc("podigee_upload_parts", result="ok")
+        return {"file_url": upload.get("file_url"), "size": size, "parts": 1, "resumed_parts": 0}
+
+    async def _upload_missing(self, storage: httpx.AsyncClient, state: UploadState, resumed: bool) -> None:
+        missing = state.missing_parts()
+        if not missing:
+            return
+        semaphore = asyncio.Semaphore(self.concurrency)
+        name = os.path.basename(state.path)
+
+        async def upload_part(data: mmap.mmap, number: int) -> None:
+            async with semaphore:
+                await self._upload_part(storage, state, data, number, resumed)
+
+        with open(state.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            results = await asyncio.gather(*(upload_part(data, number) for number in missing), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            progress = f"{len(state.parts)} of {state.part_count} parts uploaded, start it again to resume"
+            if any(isinstance(error, DeadlineExceeded) for error in errors):
+                raise DeadlineExceeded(f"Upload of {name} did not finish in time ({progress})")
+            raise ValueError(f"Upload of {name} failed: {errors[0]} ({progress})")
+
+    async def _complete(self, storage: httpx.AsyncClient, state: UploadState) -> None:
+        completion = await self.client.post("uploads/complete_multipart_url", params=state.ids)
+        if not completion.get("complete_multipart_upload_url"):
+            raise ValueError("Podigee API returned no completion URL")
+        try:
+            response = await within_deadline(
+                storage.post(
+                    completion["complete_multipart_upload_url"],
+                    content=_complete_body(state.parts),
+                    timeout=self.client.timeout
+                ),
+                what="upload completion"
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise ValueError(f"Completing the upload of {os.path.basename(state.path)} failed: {str(e)}")
+
+
+def resolve_upload_path(path: str, root: Optional[str] = None) -> str:
+    """
+    Resolve the path of a file to upload, keeping it inside 'root' if one is set.
+
+    Args:
+        path: Path given by the MCP client (relative paths are relative to 'root')
+        root: Directory uploads are restricted to (None for no restriction)
+
+    Returns:
+        Absolute path of the file
+
+    Raises:
+        ValueError: If the path is outside of 'root'
+    """
+    if root is None:
+        return os.path.realpath(os.path.expanduser(path))
+    root = os.path.realpath(root)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"{path} is outside of the upload directory")
+    return resolved
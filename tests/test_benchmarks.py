@@ -0,0 +1,47 @@
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from benchmarks.mock_api import MockAPIConfig, MockAPIServer
+from benchmarks.run_benchmarks import TOOL_CALLS, format_results, percentile, run_benchmarks
+from podigee.api import PodigeeAPIClient
+
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    """Run the mock Podigee API and point the server's client at it"""
+    with MockAPIServer(MockAPIConfig(objects=3, episodes=5)) as server:
+        monkeypatch.setattr(main, "podigee_client", PodigeeAPIClient("benchmark", base_url=server.base_url))
+        yield server
+
+
+def test_percentile_nearest_rank():
+    """Test the nearest-rank percentile used in reports"""
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile(samples, 100) == 100.0
+    assert percentile([], 50) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_every_tool_runs_against_mock_api(mock_api):
+    """Test that all benchmarked tools succeed against the mock API"""
+    results = await run_benchmarks(list(TOOL_CALLS), [1, 2], requests=2)
+
+    assert len(results) == len(TOOL_CALLS) * 2
+    assert all(r.requests == 2 and r.errors == 0 for r in results)
+    assert all(r.p50 <= r.p95 <= r.p99 for r in results)
+    assert "get_podcast_analytics_summary" in format_results(results)
+
+
+@pytest.mark.asyncio
+async def test_mock_api_error_rate(mock_api):
+    """Test that the configured error rate surfaces as tool errors"""
+    mock_api.api.config.error_rate = 1.0
+
+    results = await run_benchmarks(["list_podcasts"], [1], requests=3)
+
+    assert results[0].errors == 3
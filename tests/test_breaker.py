@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from podigee.api import PodigeeAPIClient
+from podigee.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakers, stale_scope
+from podigee.cache import ResponseCache, make_cache_key
+from podigee.tooling import managed_tool
+
+
+def test_breaker_opens_on_failures_and_slow_calls():
+    """Test that failed and slow calls in the window open the circuit"""
+    breaker = CircuitBreaker(failure_threshold=3, window=5, slow_seconds=1, open_seconds=60)
+    breaker.record(False)
+    breaker.record(True, latency=2)
+    breaker.record(True, latency=0.1)
+    assert breaker.state == CLOSED and breaker.allow()
+
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.retry_in() > 0
+
+
+def test_breaker_probe_closes_or_reopens():
+    """Test that one probe is let through after the cool-down"""
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=0.01)
+    breaker.record(False)
+    time.sleep(0.02)
+
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record(False)
+    assert breaker.state == OPEN
+
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CLOSED
+
+
+def _client_with_expired_entry(breakers):
+    cache = ResponseCache(ttl=60)
+    client = PodigeeAPIClient("test_key", cache=cache, breakers=breakers)
+    cache.store(make_cache_key(client.cache_namespace, "podcasts"), [{"id": 1}], ttl=-1)
+    return client
+
+
+def _failing_http_client(status_code):
+    response = MagicMock(status_code=status_code, headers={})
+    response.raise_for_status.side_effect = httpx.HTTPStatusError(
+        "failed", request=httpx.Request("GET", "https://example.com"), response=httpx.Response(status_code)
+    )
+    mock_client = MagicMock()
+    mock_client.__aenter__.return_value.get = AsyncMock(return_value=response)
+    return mock_client
+
+
+@pytest.mark.asyncio
+async def test_client_serves_stale_data_when_api_fails():
+    """Test that server errors fall back to the expired entry and open the circuit"""
+    breakers = CircuitBreakers(failure_threshold=1, open_seconds=60)
+    client = _client_with_expired_entry(breakers)
+    mock_client = _failing_http_client(503)
+
+    with patch("httpx.AsyncClient", return_value=mock_client), stale_scope() as stale:
+        assert await client.get("podcasts") == [{"id": 1}]
+        # Circuit is open now: answered without a request
+        assert await client.get("podcasts") == [{"id": 1}]
+
+    assert mock_client.__aenter__.return_value.get.await_count == 1
+    assert breakers.states() == {"podcasts": OPEN}
+    assert [family for family, _ in stale] == ["podcasts", "podcasts"]
+    # Nothing cached to fall back to: fail fast
+    with pytest.raises(ValueError, match="currently unavailable"):
+        await PodigeeAPIClient("other_key", cache=ResponseCache(ttl=60), breakers=breakers).get("podcasts")
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_open_the_circuit():
+    """Test that 4xx responses are raised and not counted as upstream failures"""
+    breakers = CircuitBreakers(failure_threshold=1)
+    client = _client_with_expired_entry(breakers)
+
+    with patch("httpx.AsyncClient", return_value=_failing_http_client(404)):
+        with pytest.raises(ValueError):
+            await client.get("podcasts")
+
+    assert breakers.states() == {"podcasts": CLOSED}
+
+
+@pytest.mark.asyncio
+async def test_managed_tool_marks_stale_results():
+    """Test that a tool result built from stale data carries a notice"""
+    breakers = CircuitBreakers(failure_threshold=1, open_seconds=60)
+    client = _client_with_expired_entry(breakers)
+
+    @managed_tool
+    async def list_things():
+        return f"Found {len(await client.get('podcasts'))} podcast"
+
+    with patch("httpx.AsyncClient", return_value=_failing_http_client(502)):
+        result = await list_things()
+
+    assert result.startswith("Found 1 podcast")
+    assert "**Stale data:**" in result
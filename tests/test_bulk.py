@@ -0,0 +1,116 @@
+import os
+import sys
+import pytest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from benchmarks.mock_api import MockAPIConfig, MockAPIServer
+from podigee.api import PodigeeAPIClient
+from podigee.bulk import BulkUpdater, parse_updates
+from podigee.cache import ResponseCache, make_cache_key
+
+
+def _client(server):
+    return PodigeeAPIClient(api_key="test_key", base_url=server.base_url, cache=ResponseCache(ttl=300))
+
+
+def test_parse_updates_validates_the_batch():
+    """Test that malformed batches are rejected before anything is sent"""
+    assert parse_updates('[{"id": "7", "title": "A"}]') == [(7, {"title": "A"})]
+    for updates in ([], "not json", [{"title": "A"}], [{"id": 1}], [{"id": 1, "title": "A"}, {"id": 1, "title": "B"}]):
+        with pytest.raises(ValueError):
+            parse_updates(updates)
+    with pytest.raises(ValueError, match="At most 1"):
+        parse_updates([{"id": 1, "title": "A"}, {"id": 2, "title": "B"}], max_updates=1)
+
+
+@pytest.mark.asyncio
+async def test_dry_run_sends_no_updates():
+    """Test that a dry run reports the diff without changing anything"""
+    with MockAPIServer(MockAPIConfig()) as server:
+        results = await BulkUpdater().run(_client(server), [
+            {"id": 100001, "title": "Pilot"},
+            {"id": 100002, "title": "Episode 2"},
+        ], dry_run=True)
+        edited = dict(server.api.edited_episodes)
+
+    assert [result["status"] for result in results] == ["would_update", "unchanged"]
+    assert results[0]["changes"] == {"title": ("Episode 1", "Pilot")}
+    assert edited == {}
+
+
+@pytest.mark.asyncio
+async def test_updates_invalidate_cached_episode_lists():
+    """Test that changed episodes are PUT with idempotency keys and drop cached lists"""
+    with MockAPIServer(MockAPIConfig()) as server:
+        client = _client(server)
+        await client.list_episodes(1)
+        assert make_cache_key(client.cache_namespace, "episodes", {"podcast_id": 1}) in client.cache._entries
+
+        results = await BulkUpdater().run(client, [
+            {"id": 100001, "title": "Pilot", "subtitle": "Subtitle of episode 1"},
+            {"id": 100002, "title": "Episode 2"},
+            {"id": 999999, "title": "Missing"},
+        ], idempotency_key="batch-1")
+        keys = list(server.api.idempotency_keys)
+        title = (await client.get_episode(100001))["title"]
+
+    assert [result["status"] for result in results] == ["updated", "unchanged", "failed"]
+    assert results[0]["changes"] == {"title": ("Episode 1", "Pilot")}
+    assert keys == ["batch-1:100001"]
+    assert not any(key.startswith(f"{client.cache_namespace}/episodes?") for key in client.cache._entries)
+    assert title == "Pilot"
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_replays_completed_batches():
+    """Test that a completed batch is not applied twice and keys can't be reused"""
+    updater = BulkUpdater()
+    updates = [{"id": 100001, "title": "Pilot"}]
+    with MockAPIServer(MockAPIConfig()) as server:
+        client = _client(server)
+        first = await updater.run(client, updates, idempotency_key="batch-1")
+        again = await updater.run(client, updates, idempotency_key="batch-1")
+        with pytest.raises(ValueError, match="different batch"):
+            await updater.run(client, [{"id": 100001, "title": "Other"}], idempotency_key="batch-1")
+        keys = list(server.api.idempotency_keys)
+
+    assert again is first
+    assert keys == ["batch-1:100001"]
+
+
+@pytest.mark.asyncio
+async def test_update_episodes_tool():
+    """Test the tool's dry-run default and its table"""
+    with MockAPIServer(MockAPIConfig()) as server, patch.object(main, "get_client", return_value=_client(server)):
+        preview = await main.update_episodes(updates=[{"id": 100001, "title": "Pilot | 1"}])
+        applied = await main.update_episodes(updates=[{"id": 100001, "title": "Pilot | 1"}], dry_run=False)
+        error = await main.update_episodes(updates="[]")
+
+    assert preview.startswith("# Episode Updates (dry run)")
+    assert '| 100001 | would update | title: "Episode 1" → "Pilot \\| 1" |' in preview
+    assert "dry_run=false" in preview
+    assert "Updated: 1" in applied
+    assert error.startswith("Error updating episodes:")
+
+
+@pytest.mark.asyncio
+async def test_update_episodes_tool_parses_dry_run_strings():
+    """Test that dry_run sent as a string, as the tool schema advertises, is honored"""
+    with MockAPIServer(MockAPIConfig()) as server, patch.object(main, "get_client", return_value=_client(server)):
+        preview = await main.update_episodes(updates=[{"id": 100001, "title": "Pilot"}], dry_run="TRUE")
+        # Through FastMCP, which passes the string on as the schema types it
+        content, _ = await main.mcp.call_tool(
+            "update_episodes", {"updates": [{"id": 100001, "title": "Pilot"}], "dry_run": "false"}
+        )
+        applied = content[0].text
+        invalid = await main.update_episodes(updates=[{"id": 100001, "title": "Other"}], dry_run="no")
+        edited = dict(server.api.edited_episodes)
+
+    assert preview.startswith("# Episode Updates (dry run)")
+    assert "(dry run)" not in applied
+    assert "Updated: 1" in applied
+    assert invalid.startswith("Error updating episodes:")
+    assert "dry_run must be true or false" in invalid
+    assert list(edited) == [100001]
@@ -0,0 +1,259 @@
+import os
+import sys
+import time
+import asyncio
+import multiprocessing
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from podigee.api import PodigeeAPIClient
+from podigee.cache import ResponseCache, SQLiteResponseCache, create_cache, make_cache_key
+from podigee.metrics import metrics
+from podigee.scheduler import RateLimiter, TaskScheduler
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_cache_key_ignores_param_order():
+    """Test that query parameter order does not change the cache key"""
+    assert make_cache_key("ns", "episodes", {"a": 1, "b": 2}) == make_cache_key("ns", "episodes", {"b": 2, "a": 1})
+    assert make_cache_key("ns", "episodes", {"a": 1}) != make_cache_key("other", "episodes", {"a": 1})
+
+
+def test_cache_ttl_and_lru_eviction():
+    """Test entry expiry and least-recently-used eviction"""
+    cache = ResponseCache(ttl=60, max_entries=2)
+    cache.store("a", 1)
+    cache.store("b", 2)
+    cache.lookup("a")
+    cache.store("c", 3)
+
+    assert cache.lookup("b") is None
+    assert cache.lookup("a").data == 1
+
+    cache.store("a", 1, ttl=-1)
+    assert not cache.lookup("a").is_fresh()
+
+    assert cache.invalidate("a") == 1
+    assert len(cache) == 1
+
+
+def test_disabled_cache_stores_nothing():
+    """Test that a TTL of 0 disables the cache"""
+    cache = ResponseCache(ttl=0)
+    cache.store("a", 1)
+    assert cache.lookup("a") is None
+
+
+def _mock_http_client(payload):
+    mock_response = MagicMock()
+    mock_response.json.return_value = payload
+    mock_response.content = b"[]"
+    mock_response.status_code = 200
+    mock_client = MagicMock()
+    mock_client.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+    return mock_client
+
+
+@pytest.mark.asyncio
+async def test_client_serves_repeated_get_from_cache():
+    """Test that a repeated GET is answered from the cache and counted as a hit"""
+    client = PodigeeAPIClient("test_key", cache=ResponseCache(ttl=60))
+    mock_client = _mock_http_client([{"id": 1}])
+
+    with patch("httpx.AsyncClient", return_value=mock_client):
+        first = await client.get("podcasts", {"b": 1, "a": 2})
+        second = await client.get("podcasts", {"a": 2, "b": 1})
+
+    assert first == second == [{"id": 1}]
+    assert mock_client.__aenter__.return_value.get.await_count == 1
+    counters = {tuple(sorted(labels.items())): value for name, labels, value in metrics.counters()
+                if name == "podigee_cache_requests"}
+    assert counters[(("endpoint", "podcasts"), ("result", "miss"))] == 1
+    assert counters[(("endpoint", "podcasts"), ("result", "hit"))] == 1
+
+
+@pytest.mark.asyncio
+async def test_pooled_client_reuses_connections():
+    """Test that a pooled client keeps one httpx client until aclose()"""
+    client = PodigeeAPIClient("test_key", cache=ResponseCache(ttl=0), pool_size=4)
+
+    async with client._http_client() as first:
+        pass
+    async with client._http_client() as second:
+        pass
+
+    assert first is second and not first.is_closed
+    await client.aclose()
+    assert first.is_closed
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_out_requests():
+    """Test that the scheduler's rate limit delays requests beyond the burst"""
+    scheduler = TaskScheduler(max_concurrency=10, rate_limiter=RateLimiter(rate=20, burst=2))
+
+    async def noop():
+        return time.monotonic()
+
+    started = time.monotonic()
+    times = await asyncio.gather(*(scheduler.run(noop) for _ in range(4)))
+
+    # Two requests go out immediately, the other two wait ~50ms each for a token
+    assert max(times) - started >= 0.09
+    assert scheduler.active == 0
+
+
+def _store_in_other_process(path, key):
+    SQLiteResponseCache(path, ttl=60).store(key, {"from": os.getpid()})
+
+
+def test_sqlite_cache_is_shared_between_processes(tmp_path):
+    """Test that an entry stored by one process is a hit in another"""
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteResponseCache(path, ttl=60)
+    cache.store("warmup", 1)
+
+    process = multiprocessing.get_context("spawn").Process(target=_store_in_other_process, args=(path, "podcasts?"))
+    process.start()
+    process.join(timeout=30)
+
+    entry = cache.lookup("podcasts?")
+    assert entry is not None and entry.is_fresh()
+    assert entry.data["from"] == process.pid
+
+
+def test_sqlite_cache_prunes_and_invalidates(tmp_path):
+    """Test entry limit, prefix invalidation and disabled caching of the SQLite backend"""
+    cache = SQLiteResponseCache(str(tmp_path / "cache.sqlite3"), ttl=60, max_entries=10)
+    for i in range(SQLiteResponseCache.PRUNE_INTERVAL):
+        cache.store(f"a_{i}", i)
+
+    assert len(cache) == 10
+    assert cache.lookup(f"a_{SQLiteResponseCache.PRUNE_INTERVAL - 1}").data == SQLiteResponseCache.PRUNE_INTERVAL - 1
+
+    cache.store("b%", 1)
+    assert cache.invalidate("a_") == 10
+    assert cache.invalidate("b") == 1
+    assert len(cache) == 0
+
+    disabled = SQLiteResponseCache(str(tmp_path / "disabled.sqlite3"), ttl=0)
+    disabled.store("a", 1)
+    assert disabled.lookup("a") is None
+
+
+def test_sqlite_cache_errors_are_not_raised(tmp_path):
+    """Test that every operation of a broken SQLite cache logs instead of failing the caller"""
+    import sqlite3
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteResponseCache(path, ttl=60)
+    cache.store("a", 1)
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE responses")
+    conn.commit()
+    conn.close()
+
+    cache.store("b", 2)
+    cache.renew("a")
+    assert cache.lookup("a") is None
+    assert cache.invalidate("a") == 0
+    cache.clear()
+
+
+def test_create_cache_backends(tmp_path):
+    """Test backend selection"""
+    assert isinstance(create_cache("memory"), ResponseCache)
+    assert isinstance(create_cache("sqlite", path=str(tmp_path / "c.sqlite3")), SQLiteResponseCache)
+    with pytest.raises(ValueError):
+        create_cache("redis")
+
+
+def test_clients_sharing_a_cache_are_namespaced_by_api_key():
+    """Test that two accounts sharing a cache get different keys for the same request"""
+    cache = ResponseCache(ttl=60)
+
+    a = PodigeeAPIClient("key-a", cache=cache)
+    b = PodigeeAPIClient("key-b", cache=cache)
+
+    assert a.cache_namespace != b.cache_namespace
+    assert "key-a" not in a.cache_namespace
+
+
+def _response(status_code, body=b"", payload=None, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = body
+    response.headers = headers or {}
+    response.json.return_value = payload
+    return response
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_revalidated_with_etag():
+    """Test that a 304 answer serves the cached data and renews the entry"""
+    cache = ResponseCache(ttl=60)
+    client = PodigeeAPIClient("test_key", cache=cache)
+    mock_client = MagicMock()
+    get = mock_client.__aenter__.return_value.get = AsyncMock(side_effect=[
+        _response(200, b'{"id": 1}', {"id": 1}, {"etag": '"v1"', "last-modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+        _response(304),
+    ])
+
+    with patch("httpx.AsyncClient", return_value=mock_client):
+        first = await client.get("podcasts/1")
+        cache.lookup(make_cache_key(client.cache_namespace, "podcasts/1")).expires_at = 0
+        second = await client.get("podcasts/1")
+
+    assert second is first
+    assert get.await_args_list[1].kwargs["headers"]["If-None-Match"] == '"v1"'
+    assert get.await_args_list[1].kwargs["headers"]["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert cache.lookup(make_cache_key(client.cache_namespace, "podcasts/1")).is_fresh()
+    assert ("podigee_cache_revalidations", {"endpoint": "podcasts/{id}", "result": "not_modified"}, 1) in metrics.counters()
+
+
+@pytest.mark.asyncio
+async def test_unchanged_body_without_validators_is_not_decoded_again():
+    """Test that an identical body reuses the decoded data of the expired entry"""
+    cache = ResponseCache(ttl=60)
+    client = PodigeeAPIClient("test_key", cache=cache)
+    unchanged = _response(200, b'{"id": 1}', {"id": 1})
+    mock_client = MagicMock()
+    mock_client.__aenter__.return_value.get = AsyncMock(side_effect=[
+        _response(200, b'{"id": 1}', {"id": 1}), unchanged, _response(200, b'{"id": 2}', {"id": 2}),
+    ])
+
+    with patch("httpx.AsyncClient", return_value=mock_client):
+        first = await client.get("podcasts/1")
+        cache.lookup(make_cache_key(client.cache_namespace, "podcasts/1")).expires_at = 0
+        second = await client.get("podcasts/1")
+        cache.lookup(make_cache_key(client.cache_namespace, "podcasts/1")).expires_at = 0
+        third = await client.get("podcasts/1")
+
+    assert second is first
+    unchanged.json.assert_not_called()
+    assert third == {"id": 2}
+
+
+def test_sqlite_cache_keeps_validators_and_upgrades_old_databases(tmp_path):
+    """Test validator round trip, renew and adding the columns to an old database"""
+    import sqlite3
+    path = str(tmp_path / "cache.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE responses (key TEXT PRIMARY KEY, data TEXT NOT NULL, "
+                 "stored_at REAL NOT NULL, expires_at REAL NOT NULL)")
+    conn.commit()
+    conn.close()
+
+    cache = SQLiteResponseCache(path=path, ttl=60)
+    cache.store("a", {"x": 1}, ttl=-1, etag='"e"', digest="d")
+    entry = cache.lookup("a")
+    assert (entry.etag, entry.last_modified, entry.digest, entry.is_fresh()) == ('"e"', None, "d", False)
+    cache.renew("a")
+    assert cache.lookup("a").is_fresh()
+    cache.close()
@@ -0,0 +1,104 @@
+import os
+import sys
+import gzip
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from benchmarks.mock_api import MockAPIConfig, MockAPIServer
+from podigee.api import PodigeeAPIClient
+from podigee.cache import ResponseCache
+from podigee.cassette import RecordingTransport, ReplayTransport, create_transport, load_cassette
+
+
+def _client(transport, base_url=None, api_key="secret-api-key"):
+    return PodigeeAPIClient(api_key=api_key, base_url=base_url, cache=ResponseCache(ttl=0), transport=transport)
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    """A cassette recorded against the stand-in API, with the responses it recorded"""
+    path = str(tmp_path / "traffic.jsonl.gz")
+
+    async def record(base_url):
+        client = _client(RecordingTransport(path), base_url)
+        return await client.list_podcasts(), await client.list_episodes(podcast_id=1, limit=5)
+
+    with MockAPIServer(MockAPIConfig(latency=0.05)) as server:
+        podcasts, episodes = asyncio.run(record(server.base_url))
+    return path, podcasts, episodes
+
+
+def test_recording_is_compressed_and_scrubbed(cassette):
+    """Test that the cassette is gzip-compressed and never contains the API key"""
+    path, _, _ = cassette
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        content = f.read()
+    interactions = load_cassette(path)
+
+    assert "secret-api-key" not in content
+    assert [interaction["status"] for interaction in interactions] == [200, 200]
+    assert all(interaction["latency"] >= 0.05 for interaction in interactions)
+
+
+@pytest.mark.asyncio
+async def test_replay_without_network(cassette):
+    """Test that a replay answers from the cassette, for any base URL and API key"""
+    path, podcasts, episodes = cassette
+    transport = ReplayTransport(path, latency_scale=0)
+    client = _client(transport, "https://unreachable.invalid/api/v1", api_key="other-key")
+
+    assert await client.list_podcasts() == podcasts
+    assert await client.list_episodes(podcast_id=1, limit=5) == episodes
+    with pytest.raises(ValueError):
+        await client.list_episodes(podcast_id=2)
+    assert (transport.replayed, transport.misses) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_replay_scales_latency(cassette):
+    """Test that recorded latencies are replayed times the scale"""
+    path, _, _ = cassette
+    started = time.perf_counter()
+    await _client(ReplayTransport(path, latency_scale=1)).list_podcasts()
+    recorded = time.perf_counter() - started
+    started = time.perf_counter()
+    await _client(ReplayTransport(path, latency_scale=0.1)).list_podcasts()
+    scaled = time.perf_counter() - started
+
+    assert recorded >= 0.05
+    assert scaled < recorded
+
+
+@pytest.mark.asyncio
+async def test_replay_matches_other_dates(tmp_path):
+    """Test that a relative window recorded on another day still replays"""
+    path = str(tmp_path / "dated.jsonl.gz")
+    with MockAPIServer(MockAPIConfig()) as server:
+        await _client(RecordingTransport(path), server.base_url).get_podcast_analytics(1, "2024-01-01", "2024-01-31")
+    replayed = await _client(ReplayTransport(path, latency_scale=0)).get_podcast_analytics(1, "2026-09-01", "2026-09-30")
+
+    assert "objects" in replayed
+
+
+@pytest.mark.asyncio
+async def test_tool_runs_on_replay(cassette):
+    """Test a tool call driven by the cassette"""
+    path, podcasts, _ = cassette
+    with patch.object(main, "get_client", return_value=_client(ReplayTransport(path, latency_scale=0))):
+        result = await main.list_podcasts()
+
+    assert podcasts[0]["title"] in result
+
+
+def test_create_transport_from_settings(cassette):
+    """Test the PODIGEE_CASSETTE* settings"""
+    path, _, _ = cassette
+    assert create_transport(None) is None
+    assert isinstance(create_transport(path, "replay"), ReplayTransport)
+    assert isinstance(create_transport(path, "record"), RecordingTransport)
+    with pytest.raises(ValueError):
+        create_transport(path, "rewind")
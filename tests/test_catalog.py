@@ -0,0 +1,179 @@
+import os
+import sys
+import stat
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from podigee.catalog import CATALOG_PAGE_SIZE, CatalogStore, EpisodeCatalog, tokenize
+
+
+def _episode(episode_id, title, published_at=None, description="", publication_type="full", updated_at=None):
+    return {"id": episode_id, "title": title, "subtitle": None, "description": description,
+            "published_at": published_at, "publication_type": publication_type, "updated_at": updated_at}
+
+
+class FakeEpisodesAPI:
+    """Serves list_episodes pages from a mutable list of episodes"""
+
+    def __init__(self, episodes):
+        self.episodes = episodes
+        self.calls = []
+
+    async def list_episodes(self, podcast_id, limit, offset, sort_by, sort_direction, fields_filter=None):
+        self.calls.append((sort_by, offset, fields_filter))
+        ordered = sorted(self.episodes, key=lambda e: e[sort_by], reverse=sort_direction == "desc")
+        if fields_filter:
+            ordered = [{field: e[field] for field in fields_filter} for e in ordered]
+        return ordered[offset:offset + limit]
+
+
+def _catalog():
+    catalog = EpisodeCatalog(1)
+    catalog.replace([
+        _episode(1, "Interview with Ada", "2024-01-01T10:00:00Z", "<p>Talking about <b>compilers</b></p>"),
+        _episode(2, "Compiler deep dive", "2024-02-01T10:00:00Z"),
+        _episode(3, "Teaser", None, "Coming soon: compilers", "trailer"),
+    ])
+    return catalog
+
+
+def test_tokenize_strips_html():
+    """Test that words are lowercased and tags are not indexed"""
+    assert tokenize("<p>Hello, <b>World</b>!</p>") == ["hello", "world"]
+    assert tokenize(None) == []
+
+
+def test_search_matches_all_fields_and_prefixes():
+    """Test word prefix search over title and description with AND semantics"""
+    catalog = _catalog()
+
+    assert [e["id"] for e in catalog.search("compil")] == [2, 1, 3]
+    assert [e["id"] for e in catalog.search("compilers ada")] == [1]
+    assert catalog.search("nothing") == []
+    assert [e["id"] for e in catalog.search("!!!")] == [2, 1, 3]
+    assert [e["id"] for e in catalog.search("compil", published=False)] == [3]
+    assert [e["id"] for e in catalog.search(publication_type="full", sort_direction="asc")] == [1, 2]
+    assert [e["id"] for e in catalog.search(limit=1, offset=1)] == [1]
+
+
+def test_remove_updates_the_index():
+    """Test that replaced and removed episodes are no longer found by old words"""
+    catalog = _catalog()
+    catalog.add(_episode(2, "Renamed", "2024-02-01T10:00:00Z"))
+    catalog.remove(1)
+
+    assert [e["id"] for e in catalog.search("compil")] == [3]
+    assert [e["id"] for e in catalog.search("renamed")] == [2]
+    assert catalog.search("ada") == []
+
+
+@pytest.mark.asyncio
+async def test_store_syncs_all_pages_once():
+    """Test that a catalog is synced page by page and reused while fresh"""
+    episodes = [_episode(i, f"Episode {i}") for i in range(CATALOG_PAGE_SIZE + 3)]
+    client = MagicMock(cache_namespace="tenant@api")
+    client.list_episodes = AsyncMock(side_effect=lambda **kwargs: episodes[kwargs["offset"]:kwargs["offset"] + kwargs["limit"]])
+    store = CatalogStore(ttl=60, directory=None)
+
+    catalog = await store.get(client, 7)
+    assert await store.get(client, 7) is catalog
+
+    assert len(catalog) == CATALOG_PAGE_SIZE + 3
+    assert [call.kwargs["offset"] for call in client.list_episodes.call_args_list] == [0, CATALOG_PAGE_SIZE]
+
+
+@pytest.mark.asyncio
+async def test_list_episodes_tool_uses_catalog():
+    """Test that the tool answers from the catalog when it is enabled"""
+    store = CatalogStore(ttl=60, directory=None)
+    with patch.object(main, "episode_catalogs", store), \
+            patch("main.podigee_client.list_episodes", new_callable=AsyncMock) as mock_list:
+        mock_list.return_value = [_episode(1, "Compiler deep dive", "2024-02-01T10:00:00Z")]
+        first = await main.list_episodes(podcast_id=1, search="deep")
+        second = await main.list_episodes(podcast_id=1, search="missing")
+
+    assert "Compiler deep dive (ID: 1)" in first
+    assert second == "No episodes found matching the criteria."
+    assert mock_list.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_list_episodes_tool_parses_published():
+    """Test that published sent as a string filters the catalog like the API"""
+    store = CatalogStore(ttl=60, directory=None)
+    with patch.object(main, "episode_catalogs", store), \
+            patch("main.podigee_client.list_episodes", new_callable=AsyncMock) as mock_list:
+        mock_list.return_value = [
+            _episode(1, "Compiler deep dive", "2024-02-01T10:00:00Z"),
+            _episode(2, "Draft", None),
+        ]
+        published = await main.list_episodes(podcast_id=1, published="true")
+        unpublished = await main.list_episodes(podcast_id=1, published="False")
+        invalid = await main.list_episodes(podcast_id=1, published="maybe")
+
+    assert "(ID: 1)" in published and "(ID: 2)" not in published
+    assert "(ID: 2)" in unpublished and "(ID: 1)" not in unpublished
+    assert invalid.startswith("Error listing episodes:")
+
+
+def _stamp(minute):
+    return f"2024-05-01T10:{minute:02d}:00Z"
+
+
+def _updated_episodes(count):
+    return [dict(_episode(i, f"Episode {i}", updated_at=_stamp(i % 60)), created_at=_stamp(i % 60))
+            for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_delta_sync_fetches_only_changed_episodes():
+    """Test that a stale catalog only lists episodes updated since the high-water mark"""
+    api = FakeEpisodesAPI(_updated_episodes(58))
+    api.cache_namespace = "tenant@api"
+    store = CatalogStore(ttl=0, directory=None)
+    catalog = await store.get(api, 1)
+    api.calls.clear()
+
+    api.episodes[3] = dict(api.episodes[3], title="Fresh title", updated_at=_stamp(59))
+    await store.get(api, 1)
+
+    assert api.calls == [("updated_at", 0, None)]
+    assert [e["id"] for e in catalog.search("fresh")] == [3]
+    assert len(catalog) == 58
+
+
+@pytest.mark.asyncio
+async def test_reconcile_drops_deleted_episodes():
+    """Test that the periodic ID listing removes episodes deleted upstream"""
+    api = FakeEpisodesAPI(_updated_episodes(5))
+    api.cache_namespace = "tenant@api"
+    store = CatalogStore(ttl=0, directory=None, reconcile_interval=0)
+    catalog = await store.get(api, 1)
+    api.calls.clear()
+
+    del api.episodes[2]
+    await store.get(api, 1)
+
+    assert api.calls[0] == ("created_at", 0, ["id"])
+    assert sorted(catalog.episodes) == [0, 1, 3, 4]
+    assert catalog.search("2") == []
+
+
+@pytest.mark.asyncio
+async def test_catalog_is_persisted_between_stores(tmp_path):
+    """Test that a new store continues from the saved catalog with a delta sync"""
+    api = FakeEpisodesAPI(_updated_episodes(5))
+    api.cache_namespace = "tenant@api"
+    directory = str(tmp_path / "catalog")
+    await CatalogStore(ttl=60, directory=directory).get(api, 1)
+    api.calls.clear()
+
+    catalog = await CatalogStore(ttl=60, directory=directory).get(api, 1)
+
+    assert len(catalog) == 5
+    assert api.calls == [("updated_at", 0, None)]
+    # Catalogs include unpublished episodes, only the server's user may read them
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+    assert [stat.S_IMODE(os.stat(os.path.join(directory, name)).st_mode) for name in os.listdir(directory)] == [0o600]
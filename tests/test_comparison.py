@@ -0,0 +1,98 @@
+import os
+import sys
+import pytest
+from unittest.mock import AsyncMock, patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from podigee.deadline import DeadlineExceeded
+from podigee.comparison import compare_aggregates, comparison_window
+from podigee.formatting import aggregate_analytics
+
+
+def _analytics(downloads, countries):
+    return {"objects": [{"downloaded_on": "2024-01-01T00:00:00Z", "downloads": {"complete": downloads},
+                         "countries": countries}]}
+
+
+def test_comparison_window_previous_and_year():
+    """Test the previous-period and year-over-year windows"""
+    assert comparison_window("2024-03-01", "2024-03-31") == ("2024-01-30", "2024-02-29")
+    assert comparison_window("2024-03-01", "2024-03-01") == ("2024-02-29", "2024-02-29")
+    assert comparison_window("2024-02-01", "2024-02-29", "year") == ("2023-02-01", "2023-02-28")
+
+
+def test_comparison_window_rejects_invalid_input():
+    """Test invalid dates, reversed windows and unknown modes"""
+    with pytest.raises(ValueError):
+        comparison_window("2024-03-31", "2024-03-01")
+    with pytest.raises(ValueError):
+        comparison_window("2024/03/01", "2024-03-31")
+    with pytest.raises(ValueError):
+        comparison_window("2024-03-01", "2024-03-31", "quarter")
+
+
+def test_compare_aggregates_deltas():
+    """Test per-dimension deltas, including keys present in only one window"""
+    current = aggregate_analytics(_analytics(150, {"DE": 100, "US": 50})["objects"])
+    previous = aggregate_analytics(_analytics(100, {"DE": 80, "AT": 20})["objects"])
+
+    comparison = compare_aggregates(current, previous, {"unique_listeners_number": 30}, {})
+
+    total = comparison["totals"]["Total Downloads"]
+    assert (total["delta"], total["percent"]) == (50, 50.0)
+    assert comparison["totals"]["Unique Listeners"]["delta"] is None
+    countries = {c["key"]: c for c in comparison["dimensions"]["countries"]}
+    assert [c["key"] for c in comparison["dimensions"]["countries"]] == ["DE", "US", "AT"]
+    assert countries["DE"]["delta"] == 20 and countries["DE"]["percent"] == 25.0
+    assert countries["US"]["previous"] == 0 and countries["US"]["percent"] is None
+    assert countries["AT"]["current"] == 0 and countries["AT"]["delta"] == -20
+
+
+@pytest.mark.asyncio
+@patch("main.podigee_client.get_podcast_overview", new_callable=AsyncMock)
+@patch("main.podigee_client.get_podcast_analytics", new_callable=AsyncMock)
+async def test_compare_podcast_periods_tool(mock_analytics, mock_overview):
+    """Test that the tool fetches both windows and renders the changes"""
+    mock_analytics.side_effect = lambda podcast_id, from_date, to_date: (
+        _analytics(150, {"DE": 100}) if from_date == "2024-03-01" else _analytics(100, {"DE": 80})
+    )
+    mock_overview.return_value = {"unique_listeners_number": 10}
+
+    result = await main.compare_podcast_periods(podcast_id=1, from_date="2024-03-01", to_date="2024-03-31")
+
+    assert "**Compared with:** 2024-01-30 to 2024-02-29" in result
+    assert "| Total Downloads | 150 | 100 | +50 (+50.0%) |" in result
+    assert "| DE | 100 | 80 | +20 (+25.0%) |" in result
+    assert "## Platforms\nNo data available." in result
+    assert mock_analytics.await_count == 2 and mock_overview.await_count == 2
+    mock_analytics.assert_any_await(1, "2024-01-30", "2024-02-29")
+
+
+@pytest.mark.asyncio
+@patch("main.podigee_client.get_podcast_overview", new_callable=AsyncMock)
+@patch("main.podigee_client.get_podcast_analytics", new_callable=AsyncMock)
+async def test_compare_podcast_periods_renders_parts_that_arrived(mock_analytics, mock_overview):
+    """Test that a window missing the deadline leaves the parts that arrived"""
+    def analytics(podcast_id, from_date, to_date):
+        if from_date != "2024-03-01":
+            raise DeadlineExceeded("late")
+        return _analytics(150, {"DE": 100})
+
+    mock_analytics.side_effect = analytics
+    mock_overview.return_value = {"unique_listeners_number": 10}
+
+    result = await main.compare_podcast_periods(podcast_id=1, from_date="2024-03-01", to_date="2024-03-31")
+
+    assert "| Total Downloads | 150 | N/A | n/a |" in result
+    assert "| Unique Listeners | 10 | 10 | +0 (+0.0%) |" in result
+    assert "## Countries" not in result
+    assert "**Partial result:** Previous period downloads and breakdowns did not finish" in result
+
+
+@pytest.mark.asyncio
+async def test_compare_podcast_periods_invalid_mode():
+    """Test that an unknown compare_to is reported as an error"""
+    result = await main.compare_podcast_periods(podcast_id=1, compare_to="quarter")
+
+    assert result.startswith("Error comparing podcast periods")
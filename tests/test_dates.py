@@ -0,0 +1,60 @@
+import os
+import sys
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from podigee.api import PodigeeAPIClient
+from podigee.cache import ResponseCache
+from podigee.dates import DateWindow, is_settled, last_days, parse_day, resolve_window, this_month, utc_today
+
+TODAY = date(2024, 3, 15)
+
+
+def test_relative_windows_are_utc_days():
+    """Test that relative windows end today in UTC and include both ends"""
+    assert last_days(30, TODAY) == DateWindow(date(2024, 2, 14), TODAY)
+    assert this_month(TODAY).from_date == "2024-03-01"
+    assert utc_today() == datetime.now(timezone.utc).date()
+
+
+def test_resolve_window_prefers_explicit_dates():
+    """Test that a complete explicit range is kept and anything else falls back"""
+    assert resolve_window("2024-01-01", "2024-01-31") == ("2024-01-01", "2024-01-31")
+    assert resolve_window("2024-01-01", None, days=7, today=TODAY) == ("2024-03-08", "2024-03-15")
+    assert parse_day("2024-03-10T18:30:00Z") == date(2024, 3, 10)
+    with pytest.raises(ValueError):
+        parse_day("yesterday")
+
+
+def test_split_into_settled_and_recent_days():
+    """Test the split at the last settled day"""
+    window = DateWindow(date(2024, 3, 1), TODAY)
+
+    assert window.split(TODAY, settle_days=2) == (
+        DateWindow(date(2024, 3, 1), date(2024, 3, 13)),
+        DateWindow(date(2024, 3, 14), TODAY),
+    )
+    assert DateWindow(TODAY, TODAY).split(TODAY, settle_days=2) == (None, DateWindow(TODAY, TODAY))
+    assert window.split(TODAY + timedelta(days=5), settle_days=2) == (window, None)
+    assert is_settled("2024-03-13", TODAY, settle_days=2)
+    assert not is_settled("2024-03-14", TODAY, settle_days=2)
+    assert not is_settled(None)
+
+
+@pytest.mark.asyncio
+async def test_settled_responses_are_cached_longer():
+    """Test that a window of settled days gets the longer cache TTL"""
+    cache = ResponseCache(ttl=60)
+    client = PodigeeAPIClient(api_key="test_key", cache=cache)
+    mock_response = MagicMock(status_code=200, content=b"{}", headers={})
+    mock_response.json.return_value = {"objects": []}
+
+    with patch("httpx.AsyncClient") as mock_client, patch("podigee.api.SETTLED_CACHE_TTL", 3600):
+        mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+        await client.get_podcast_analytics(1, "2024-01-01", "2024-01-31")
+        await client.get_podcast_analytics(1)
+
+    lifetimes = sorted(entry.expires_at - entry.stored_at for entry in cache._entries.values())
+    assert lifetimes == [60, 3600]
@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import pytest
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from podigee.api import PodigeeAPIClient
+from podigee.breaker import stale_scope
+from podigee.cache import ResponseCache, make_cache_key
+from podigee.deadline import DeadlineExceeded, deadline_scope, gather_partial, remaining
+
+
+def _slow_http_client(slow_fragment, payload):
+    async def get(url, headers=None, params=None, timeout=None):
+        if slow_fragment in url:
+            await asyncio.sleep(5)
+        response = MagicMock(status_code=200, headers={}, content=json.dumps(payload).encode())
+        response.json.return_value = payload
+        return response
+
+    mock_client = MagicMock()
+    mock_client.__aenter__.return_value.get = get
+    return mock_client
+
+
+def test_nested_scopes_only_shorten_the_deadline():
+    """Test that the innermost scope cannot extend the outer deadline"""
+    assert remaining() is None
+    with deadline_scope(0.5):
+        with deadline_scope(10):
+            assert remaining() <= 0.5
+        with deadline_scope(0.1):
+            assert remaining() <= 0.1
+        with deadline_scope(None):
+            assert remaining() <= 0.5
+    assert remaining() is None
+
+
+@pytest.mark.asyncio
+async def test_gather_partial_replaces_late_parts():
+    """Test that only deadline errors become None"""
+    async def late():
+        raise DeadlineExceeded("late")
+
+    async def on_time():
+        return 1
+
+    assert await gather_partial(late(), on_time()) == [None, 1]
+
+    async def broken():
+        raise ValueError("broken")
+
+    with pytest.raises(ValueError, match="broken"):
+        await gather_partial(broken(), on_time())
+
+
+@pytest.mark.asyncio
+async def test_client_request_stops_at_deadline():
+    """Test that a slow request fails at the deadline or serves the expired entry"""
+    cache = ResponseCache(ttl=60)
+    client = PodigeeAPIClient("test_key", cache=cache)
+
+    started = time.perf_counter()
+    with patch("httpx.AsyncClient", return_value=_slow_http_client("podcasts", {})), deadline_scope(0.1):
+        with pytest.raises(DeadlineExceeded):
+            await client.get("podcasts")
+        cache.store(make_cache_key(client.cache_namespace, "podcasts"), [{"id": 1}], ttl=-1)
+        with stale_scope() as stale:
+            assert await client.get("podcasts") == [{"id": 1}]
+
+    assert time.perf_counter() - started < 1
+    assert len(stale) == 1
+
+
+@pytest.mark.asyncio
+async def test_summary_tool_returns_overview_when_analytics_run_late():
+    """Test the partial summary when the analytics request misses the deadline"""
+    overview = {"unique_listeners_number": 77, "top_episodes": [{"title": "Pilot", "downloads": 5}]}
+
+    with patch("httpx.AsyncClient", return_value=_slow_http_client("/analytics", overview)), deadline_scope(0.2):
+        result = await main.get_podcast_analytics_summary(podcast_id=98765, from_date="2024-01-01", to_date="2024-01-31")
+
+    assert "**Time Period:** 2024-01-01 to 2024-01-31" in result
+    assert "Unique Listeners: 77" in result
+    assert "1. Pilot: 5 downloads" in result
+    assert "Total Downloads: N/A" in result
+    assert "**Partial result:** Downloads and breakdowns did not finish" in result
@@ -0,0 +1,65 @@
+import io
+import os
+import sys
+import json
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.startup_benchmark import run_startup_benchmark
+from podigee.fast_start import FastStartProxy, build_manifest, load_manifest
+
+
+def _initialize(request_id, version):
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "method": "initialize", "params": {
+        "protocolVersion": version, "capabilities": {}, "clientInfo": {"name": "test", "version": "1"}
+    }})
+
+
+@pytest.mark.asyncio
+async def test_manifest_matches_server():
+    """Test that the checked-in manifest is up to date (regenerate with fast_start.py --write-manifest)"""
+    manifest, live = load_manifest(), await build_manifest()
+
+    assert live["tools"] == manifest["tools"]
+    assert live["initialize_result"]["capabilities"] == manifest["initialize_result"]["capabilities"]
+
+
+def test_handshake_is_answered_from_manifest():
+    """Test initialize, tools/list and ping without loading the server"""
+    manifest = load_manifest()
+    stdout = io.BytesIO()
+    proxy = FastStartProxy(manifest, stdin=io.BytesIO(), stdout=stdout, preload=False)
+
+    for line in [
+        _initialize(1, "2025-06-18"),
+        json.dumps({"jsonrpc": "2.0", "method": "notifications/initialized"}),
+        json.dumps({"jsonrpc": "2.0", "id": 2, "method": "tools/list"}),
+        json.dumps({"jsonrpc": "2.0", "id": 3, "method": "ping"}),
+    ]:
+        assert proxy._handle_locally(line)
+    assert not proxy._handle_locally(json.dumps({"jsonrpc": "2.0", "id": 4, "method": "tools/call"}))
+
+    responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert [r["id"] for r in responses] == [1, 2, 3]
+    assert responses[0]["result"]["protocolVersion"] == "2025-06-18"
+    assert responses[0]["result"]["serverInfo"]["name"] == "Podigee"
+    assert responses[1]["result"]["tools"] == manifest["tools"]
+    assert len(proxy._replay) == 2
+
+
+def test_unknown_protocol_version_gets_latest():
+    """Test protocol version negotiation"""
+    manifest = load_manifest()
+    stdout = io.BytesIO()
+    proxy = FastStartProxy(manifest, stdin=io.BytesIO(), stdout=stdout, preload=False)
+
+    proxy._handle_locally(_initialize(1, "1999-01-01"))
+
+    assert json.loads(stdout.getvalue())["result"]["protocolVersion"] == manifest["latest_protocol_version"]
+
+
+def test_fast_start_serves_tool_calls():
+    """Test a full stdio session through the fast start entry point against the mock API"""
+    result = run_startup_benchmark(["fast_start.py"], repeat=1)[0]
+
+    assert 0 < result.initialize <= result.tools_list <= result.first_tool_call
@@ -0,0 +1,134 @@
+import os
+import sys
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from podigee.api import PodigeeAPIClient
+from podigee.cache import ResponseCache
+from podigee.hedging import HedgePolicy, run_hedged
+from podigee.metrics import metrics
+from podigee.scheduler import RateLimiter, TaskScheduler
+
+
+def _trained_policy(latency=0.01, samples=20):
+    policy = HedgePolicy(percentile=0.9, min_delay=0.01, min_samples=samples)
+    for _ in range(samples):
+        policy.observe("podcasts", latency)
+    return policy
+
+
+def _hedge_counts():
+    return {labels["result"]: value for name, labels, value in metrics.counters()
+            if name == "podigee_hedged_requests"}
+
+
+def test_policy_delay_follows_the_percentile():
+    """Test that the hedge delay is the recent percentile latency, with a floor"""
+    policy = HedgePolicy(percentile=0.9, min_delay=0.05, min_samples=10)
+    for latency in range(1, 10):
+        policy.observe("podcasts", latency / 10)
+    assert policy.delay("podcasts") is None
+
+    policy.observe("podcasts", 5.0)
+    assert policy.delay("podcasts") == 5.0
+    assert policy.delay("episodes") is None
+    assert _trained_policy(latency=0.001).delay("podcasts") == 0.01
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_and_the_duplicate_wins():
+    """Test that a duplicate is sent after the delay and the first response is used"""
+    metrics.reset()
+    calls = []
+
+    async def send(name):
+        calls.append(name)
+        if len(calls) == 1:
+            await asyncio.sleep(10)
+        return len(calls)
+
+    result = await asyncio.wait_for(
+        run_hedged(TaskScheduler(max_concurrency=2), _trained_policy(), "podcasts", send, "x"),
+        timeout=1
+    )
+
+    assert result == 2
+    assert calls == ["x", "x"]
+    assert _hedge_counts() == {"hedge": 1}
+
+
+@pytest.mark.asyncio
+async def test_hedge_respects_the_rate_limit():
+    """Test that no duplicate is sent without a spare rate limit token"""
+    metrics.reset()
+    scheduler = TaskScheduler(max_concurrency=4, rate_limiter=RateLimiter(rate=0.001, burst=1))
+    calls = []
+
+    async def send():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "primary"
+
+    assert await run_hedged(scheduler, _trained_policy(), "podcasts", send) == "primary"
+    assert len(calls) == 1
+    assert _hedge_counts() == {"skipped": 1}
+    assert scheduler.active == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_duplicate_waits_for_the_other_request():
+    """Test that a failing hedge doesn't fail a request that is still running"""
+    calls = []
+
+    async def send():
+        calls.append(1)
+        if len(calls) == 2:
+            raise ValueError("hedge failed")
+        await asyncio.sleep(0.05)
+        return "primary"
+
+    assert await run_hedged(TaskScheduler(max_concurrency=2), _trained_policy(), "podcasts", send) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_client_learns_latencies_and_hedges():
+    """Test the client's hedging of GET requests end to end"""
+    policy = _trained_policy()
+    client = PodigeeAPIClient(
+        api_key="test_key",
+        cache=ResponseCache(ttl=0),
+        scheduler=TaskScheduler(max_concurrency=2),
+        hedging=policy
+    )
+    responses = iter([10, 0])
+
+    async def get(url, **kwargs):
+        await asyncio.sleep(next(responses))
+        response = MagicMock(status_code=200, content=b"{}", headers={})
+        response.json.return_value = {"ok": True}
+        return response
+
+    http_client = MagicMock()
+    http_client.get = get
+    client._pool = http_client
+    client.pool_size = 1
+
+    assert await asyncio.wait_for(client.get("podcasts"), timeout=1) == {"ok": True}
+    assert len(policy._latencies["podcasts"]) == 21
+
+
+@pytest.mark.asyncio
+async def test_only_reads_train_the_policy():
+    """Test that writes, sent through the same path as reads, are not observed for hedging"""
+    from benchmarks.mock_api import MockAPIConfig, MockAPIServer
+
+    policy = MagicMock(wraps=HedgePolicy(min_samples=1))
+    with MockAPIServer(MockAPIConfig()) as server:
+        client = PodigeeAPIClient(api_key="k", base_url=server.base_url, cache=ResponseCache(ttl=0), hedging=policy)
+        await client.update_episode(100001, {"title": "Pilot"})
+        assert policy.observe.call_count == 0
+        await client.get_episode(100001)
+
+    assert [call.args[0] for call in policy.observe.call_args_list] == ["episodes/{id}"]
@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import pytest
+import uvicorn
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+import podigee.cache
+from podigee.cache import SQLiteResponseCache
+from benchmarks.mock_api import MockAPIConfig, MockAPIServer
+
+
+@pytest.fixture
+def http_server(monkeypatch):
+    """Serve main.create_http_app() on a free port, backed by the mock Podigee API"""
+    with MockAPIServer(MockAPIConfig(objects=3, episodes=5)) as api:
+        monkeypatch.setenv("PODIGEE_API_BASE_URL", api.base_url)
+        monkeypatch.setenv("PODIGEE_API_KEY", "test_key")
+        monkeypatch.setenv("PODIGEE_MCP_TRANSPORT", "streamable-http")
+        # Restore the module state create_http_app() replaces
+        monkeypatch.setattr(main, "podigee_client", main.podigee_client)
+        monkeypatch.setattr(main, "tenants", main.tenants)
+        monkeypatch.setattr(main.mcp, "_session_manager", None)
+        monkeypatch.setattr(main.mcp.settings, "stateless_http", main.mcp.settings.stateless_http)
+        monkeypatch.setattr(main.resource_subscriptions, "enabled", main.resource_subscriptions.enabled)
+
+        app = main.create_http_app()
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+        port = server.servers[0].sockets[0].getsockname()[1]
+        yield api, f"http://127.0.0.1:{port}/mcp"
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+async def call_tool(url, name, arguments, headers=None):
+    async with streamablehttp_client(url, headers=headers) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            result = await session.call_tool(name, arguments)
+            return result.content[0].text
+
+
+@pytest.mark.asyncio
+async def test_http_clients_share_client_and_cache(http_server, monkeypatch):
+    """Test that concurrent MCP sessions share one pooled PodigeeAPIClient and its cache"""
+    api, url = http_server
+    monkeypatch.setattr(main, "SINGLE_TENANT", True)
+
+    results = await asyncio.gather(*(call_tool(url, "list_podcasts", {}) for _ in range(4)))
+
+    assert all("Podcast" in text and not text.startswith("Error") for text in results)
+    assert main.podigee_client.pool_size == main.HTTP_POOL_SIZE
+    assert main.resource_subscriptions.enabled
+    assert len(main.podigee_client.cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_http_requests_with_own_api_key_use_tenant_clients(http_server):
+    """Test that requests carrying an API key are served by that tenant's client"""
+    api, url = http_server
+
+    text = await call_tool(url, "list_podcasts", {}, headers={"X-Podigee-Api-Key": "tenant-key"})
+
+    assert not text.startswith("Error")
+    assert "tenant-key" in main.tenants
+    assert len(main.tenants) == 1
+
+
+@pytest.mark.asyncio
+async def test_http_requests_without_api_key_are_rejected(http_server):
+    """Test that a keyless request doesn't get to use the server's own API key"""
+    api, url = http_server
+
+    text = await call_tool(url, "list_podcasts", {})
+
+    assert text.startswith("Error")
+    assert "No Podigee API key" in text
+    assert api.api.request_count == 0
+
+
+def test_workers_make_sessions_stateless_and_share_cache(monkeypatch, tmp_path):
+    """Test that several workers switch to stateless HTTP without subscriptions, and a shared cache"""
+    monkeypatch.setenv("PODIGEE_MCP_WORKERS", "2")
+    monkeypatch.delenv("PODIGEE_CACHE_BACKEND", raising=False)
+    monkeypatch.setattr(podigee.cache, "DEFAULT_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(main, "podigee_client", main.podigee_client)
+    monkeypatch.setattr(main, "tenants", main.tenants)
+    monkeypatch.setattr(main.mcp, "_session_manager", None)
+    monkeypatch.setattr(main.mcp.settings, "stateless_http", False)
+    monkeypatch.setattr(main.resource_subscriptions, "enabled", True)
+
+    main.create_http_app()
+
+    assert main.mcp.settings.stateless_http is True
+    assert main.resource_subscriptions.enabled is False
+    assert main.mcp._mcp_server.create_initialization_options().capabilities.resources.subscribe is False
+    assert isinstance(main.podigee_client.cache, SQLiteResponseCache)
+    assert main.tenants.cache is main.podigee_client.cache
+
+
+def test_sse_rejects_multiple_workers():
+    """Test that SSE, which needs sticky sessions, cannot run with several workers"""
+    with pytest.raises(ValueError):
+        main.serve_http("sse", "127.0.0.1", 8000, workers=2)
@@ -0,0 +1,123 @@
+import os
+import sys
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from podigee.api import PodigeeAPIClient
+from podigee.metrics import Histogram, MetricsRegistry, endpoint_family, metrics, worker_metrics_path
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    """Start every test with an empty process-wide registry"""
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_endpoint_family_replaces_ids():
+    """Test that numeric path segments are collapsed into one label value"""
+    assert endpoint_family("podcasts/42/analytics") == "podcasts/{id}/analytics"
+    assert endpoint_family("episodes/101") == "episodes/{id}"
+    assert endpoint_family("podcasts") == "podcasts"
+
+
+def test_histogram_quantiles():
+    """Test bucket counting and quantile interpolation"""
+    histogram = Histogram((0.1, 0.2, 0.4))
+    for value in (0.05, 0.05, 0.15, 0.3, 1.0):
+        histogram.observe(value)
+
+    assert histogram.count == 5
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.quantile(0.4) == pytest.approx(0.1)
+    assert histogram.quantile(0.5) == pytest.approx(0.15)
+    assert histogram.quantile(0.99) == 0.4
+
+
+def test_render_prometheus_and_openmetrics():
+    """Test the text exposition formats"""
+    registry = MetricsRegistry()
+    registry.describe("tool_seconds", "Tool latency.", buckets=(0.1, 1.0))
+    registry.observe("tool_seconds", 0.5, tool="list_podcasts")
+    registry.inc("calls", tool="list_podcasts")
+
+    text = registry.render("prometheus")
+    assert "# HELP tool_seconds Tool latency." in text
+    assert "# TYPE tool_seconds histogram" in text
+    assert 'tool_seconds_bucket{tool="list_podcasts",le="0.1"} 0' in text
+    assert 'tool_seconds_bucket{tool="list_podcasts",le="1"} 1' in text
+    assert 'tool_seconds_bucket{tool="list_podcasts",le="+Inf"} 1' in text
+    assert 'tool_seconds_count{tool="list_podcasts"} 1' in text
+    assert "# TYPE calls_total counter" in text
+    assert 'calls_total{tool="list_podcasts"} 1' in text
+    assert "# EOF" not in text
+
+    text = registry.render("openmetrics")
+    assert "# TYPE calls counter" in text
+    assert text.endswith("# EOF\n")
+
+    with pytest.raises(ValueError):
+        registry.render("json")
+
+
+def test_dump_writes_file(tmp_path):
+    """Test that dump writes the exposition to the given path"""
+    registry = MetricsRegistry()
+    registry.inc("calls")
+    path = tmp_path / "metrics.prom"
+
+    registry.dump(str(path))
+
+    assert path.read_text() == registry.render()
+    assert os.listdir(tmp_path) == ["metrics.prom"]
+
+
+def test_workers_write_their_own_metrics_file():
+    """Test that each of several workers gets its own metrics file"""
+    assert worker_metrics_path("/var/lib/textfile/podigee.prom", workers=1) == "/var/lib/textfile/podigee.prom"
+    assert worker_metrics_path("/var/lib/textfile/podigee.prom", workers=4) == f"/var/lib/textfile/podigee.{os.getpid()}.prom"
+
+
+@pytest.mark.asyncio
+async def test_client_get_records_upstream_metrics():
+    """Test that PodigeeAPIClient.get records latency, size, decode time and status"""
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.content = b'{"ok": true}'
+    mock_response.json.return_value = {"ok": True}
+    mock_client = AsyncMock()
+    mock_client.__aenter__.return_value.get.return_value = mock_response
+
+    client = PodigeeAPIClient("test_key")
+    with patch("httpx.AsyncClient", return_value=mock_client):
+        await client.get("podcasts/42/analytics")
+
+    names = {(name, labels.get("endpoint")) for name, labels, _ in metrics.histograms()}
+    assert ("podigee_upstream_latency_seconds", "podcasts/{id}/analytics") in names
+    assert ("podigee_upstream_response_bytes", "podcasts/{id}/analytics") in names
+    assert ("podigee_json_decode_seconds", "podcasts/{id}/analytics") in names
+    assert ("podigee_upstream_requests", {"endpoint": "podcasts/{id}/analytics", "status": "200"}, 1) in metrics.counters()
+
+
+@pytest.mark.asyncio
+@patch("main.podigee_client.get_podcast_analytics_summary")
+async def test_tool_calls_are_instrumented(mock_analytics_summary):
+    """Test that tool latency, aggregation and render time are recorded and shown in diagnostics"""
+    mock_analytics_summary.return_value = ({"objects": [{"downloads": {"complete": 1}}]}, {})
+
+    await main.get_podcast_analytics_summary(podcast_id=42)
+
+    names = {(name, labels.get("tool")) for name, labels, _ in metrics.histograms()}
+    assert ("podigee_tool_latency_seconds", "get_podcast_analytics_summary") in names
+    assert ("podigee_aggregation_seconds", "get_podcast_analytics_summary") in names
+    assert ("podigee_render_seconds", "get_podcast_analytics_summary") in names
+
+    result = await main.get_server_diagnostics()
+    assert "# Server Diagnostics" in result
+    assert "podigee_tool_latency_seconds" in result
+    assert "podigee_tool_calls_total | outcome=ok, tool=get_podcast_analytics_summary | 1" in result
+
+    assert "podigee_tool_latency_seconds_bucket" in await main.get_server_diagnostics("prometheus")
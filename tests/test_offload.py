@@ -0,0 +1,126 @@
+import os
+import sys
+import pytest
+from concurrent.futures import Future
+from unittest.mock import AsyncMock, patch
+from concurrent.futures.process import BrokenProcessPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+import podigee.offload as offload
+from benchmarks.mock_api import MockAPIConfig, MockAPIServer
+from benchmarks.synthetic import generate_analytics
+from podigee.api import PodigeeAPIClient
+from podigee.cache import SQLiteResponseCache
+from podigee.formatting import aggregate_analytics
+from podigee.metrics import metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _offloaded():
+    return {labels["executor"]: value for name, labels, value in metrics.counters()
+            if name == "podigee_offloaded_tasks"}
+
+
+def test_aggregate_analytics_sums_breakdowns():
+    """Test the aggregation and that invalid counts are skipped"""
+    objects = [
+        {"downloaded_on": "2024-01-01T00:00:00Z", "downloads": {"complete": 3}, "countries": {"DE": 2, "AT": 1}},
+        {"downloaded_on": "2024-01-02T00:00:00Z", "downloads": {"complete": 4}, "countries": {"DE": "x"}},
+    ]
+
+    aggregate = aggregate_analytics(objects)
+
+    assert aggregate["total_downloads"] == 7
+    assert aggregate["downloads_by_date"] == {"2024-01-01": 3, "2024-01-02": 4}
+    assert aggregate["countries"] == {"DE": 2, "AT": 1}
+    assert aggregate["clients"] == {}
+
+
+@pytest.mark.asyncio
+async def test_small_payloads_stay_inline():
+    """Test that payloads below the threshold are aggregated on the event loop"""
+    analytics = generate_analytics(objects=3)
+
+    aggregate = await main.aggregate_analytics_data(analytics)
+
+    assert aggregate == aggregate_analytics(analytics["objects"])
+    assert _offloaded() == {"inline": 1}
+
+
+@pytest.mark.asyncio
+async def test_large_payloads_use_process_pool(monkeypatch):
+    """Test that large payloads are aggregated in the process pool with the same result"""
+    monkeypatch.setattr(offload, "OFFLOAD_MIN_OBJECTS", 100)
+    analytics = generate_analytics(objects=200, granularity="hour", countries=50, clients=50, density=0.5)
+
+    try:
+        aggregate = await main.aggregate_analytics_data(analytics)
+    finally:
+        offload.shutdown()
+
+    assert aggregate == aggregate_analytics(analytics["objects"])
+    assert _offloaded() == {"process": 1}
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_falls_back_inline(monkeypatch):
+    """Test that a crashed process pool doesn't fail the tool call"""
+    class BrokenPool:
+        def submit(self, *args, **kwargs):
+            future = Future()
+            future.set_exception(BrokenProcessPool("worker died"))
+            return future
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            pass
+
+    monkeypatch.setattr(offload, "OFFLOAD_MIN_OBJECTS", 1)
+    monkeypatch.setattr(offload, "_process_pool", BrokenPool())
+
+    result = await offload.run_cpu_bound(sum, [1, 2, 3], size=3)
+
+    assert result == 6
+    assert offload._process_pool is None
+    assert _offloaded() == {"inline": 1}
+
+
+@pytest.mark.asyncio
+async def test_aggregation_is_memoized_for_the_same_response():
+    """Test that a response with the same cache key and digest is aggregated only once"""
+    analytics = {"objects": [{"downloaded_on": "2024-01-01T00:00:00Z", "downloads": {"complete": 3}}]}
+
+    with patch("main.run_cpu_bound", new_callable=AsyncMock) as mock_run:
+        mock_run.return_value = {"total_downloads": 3}
+        first = await main.aggregate_analytics_data(analytics, source=("ns/analytics?", "digest-1"))
+        second = await main.aggregate_analytics_data(dict(analytics), source=("ns/analytics?", "digest-1"))
+        await main.aggregate_analytics_data(analytics, source=("ns/analytics?", "digest-2"))
+        await main.aggregate_analytics_data(analytics)
+
+    assert first is second
+    assert mock_run.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_aggregation_is_memoized_with_the_sqlite_cache(tmp_path):
+    """Test that cache hits of the SQLite cache, new objects every time, skip aggregation"""
+    cache = SQLiteResponseCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+    with MockAPIServer(MockAPIConfig()) as server, \
+            patch("main.run_cpu_bound", new_callable=AsyncMock) as mock_run:
+        mock_run.return_value = {"total_downloads": 3}
+        client = PodigeeAPIClient(api_key="test_key", base_url=server.base_url, cache=cache)
+        first = await client.get_podcast_analytics(1, "2024-01-01", "2024-01-31")
+        second = await client.get_podcast_analytics(1, "2024-01-01", "2024-01-31")
+        await main.aggregate_analytics_data(first, source=client.response_source(first))
+        await main.aggregate_analytics_data(second, source=client.response_source(second))
+        requests = server.api.request_count
+
+    assert first is not second
+    assert client.response_source(first) == client.response_source(second) is not None
+    assert (requests, mock_run.await_count) == (1, 1)
@@ -10,7 +10,9 @@ from mcp.server.fastmcp import FastMCP
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import main
+from benchmarks.mock_api import MockAPIConfig, MockAPIServer
 from podigee.api import PodigeeAPIClient
+from podigee.cache import ResponseCache
 
 
 @pytest.fixture
@@ -483,6 +485,49 @@ async def test_list_episodes_tool_success(mock_list_episodes_api, mock_podigee_r
     assert "- Status: Published" in result
     assert "- Published Date: 2023-03-01" in result
 
+@pytest.mark.asyncio
+async def test_list_episodes_by_podcast_batches_requests():
+    """Test that many podcasts are listed with as few podcast_ids[] requests as fit"""
+    with MockAPIServer(MockAPIConfig(podcasts=40, episodes=60)) as server:
+        client = PodigeeAPIClient(api_key="dummy_key", base_url=server.base_url, cache=ResponseCache(ttl=0))
+        grouped = await client.list_episodes_by_podcast(list(range(1, 41)), 5)
+        batched_requests = server.api.request_count
+        capped = await client.list_episodes(podcast_ids=[1, 2], limit_per_podcast=20, limit=40)
+        server.api.request_count = 0
+        per_podcast = await client.list_episodes_by_podcast([1, 2], 20)
+        per_podcast_requests = server.api.request_count
+        paged = await client.list_episodes_by_podcast([1, 2], 55)
+    
+    # 10 podcasts with 5 episodes each fit into one page of 50
+    assert batched_requests == 4
+    assert list(grouped) == list(range(1, 41))
+    assert all(len(episodes) == 5 and {e["podcast_id"] for e in episodes} == {podcast_id}
+               for podcast_id, episodes in grouped.items())
+    # The API returns at most 10 per podcast in a batch, so more are listed per podcast
+    assert len(capped) == 20
+    assert per_podcast_requests == 2
+    assert [len(episodes) for episodes in per_podcast.values()] == [20, 20]
+    assert [len(episodes) for episodes in paged.values()] == [55, 55]
+    assert len({episode["id"] for episode in paged[1]}) == 55
+
+@pytest.mark.asyncio
+@patch("main.podigee_client.list_podcasts", new_callable=AsyncMock)
+@patch("main.podigee_client.list_episodes_by_podcast", new_callable=AsyncMock)
+async def test_list_episodes_tool_groups_by_podcast(mock_by_podcast, mock_list_podcasts, mock_podigee_response):
+    """Test the main.list_episodes tool with several podcast IDs."""
+    mock_list_podcasts.return_value = mock_podigee_response["podcasts"]
+    mock_by_podcast.return_value = {42: mock_podigee_response["episodes_list"][:1], 7: []}
+    
+    result = await main.list_episodes(podcast_ids="42, 7", limit_per_podcast=3, published=True)
+    
+    assert mock_by_podcast.call_args[0] == ([42, 7], 3)
+    assert mock_by_podcast.call_args[1]["published"] is True
+    assert result.startswith("# Episodes of 2 Podcasts (showing up to 3 each)")
+    assert "## Test Podcast (Podcast ID: 42)\n\n### First Episode (ID: 101)" in result
+    assert "## Podcast (Podcast ID: 7)\n\nNo episodes found" in result
+    assert "Error listing episodes" in await main.list_episodes(podcast_ids=[42], offset=10)
+    assert "Error listing episodes" in await main.list_episodes(podcast_ids="42,abc")
+
 @pytest.mark.asyncio
 @patch("main.podigee_client.list_episodes", new_callable=AsyncMock)
 async def test_list_episodes_tool_limit_cap(mock_list_episodes_api):
@@ -0,0 +1,82 @@
+import os
+import sys
+import copy
+import pytest
+from unittest.mock import AsyncMock, patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from podigee.api import PodigeeAPIClient
+from podigee.resample import bucket_start, resample_analytics
+
+
+def _daily(days):
+    return {
+        "meta": {"aggregation_granularity": "day"},
+        "objects": [
+            {"downloaded_on": f"{day}T00:00:00Z", "downloads": {"complete": downloads},
+             "countries": {"DE": downloads}}
+            for day, downloads in days
+        ]
+    }
+
+
+def test_bucket_start_week_and_month_boundaries():
+    """Test ISO weeks across a year change and calendar months"""
+    # 2024-12-30 is the Monday of ISO week 1 of 2025
+    assert bucket_start("2025-01-05T00:00:00Z", "week") == "2024-12-30T00:00:00Z"
+    assert bucket_start("2025-01-06T00:00:00Z", "week") == "2025-01-06T00:00:00Z"
+    assert bucket_start("2024-02-29T00:00:00Z", "month") == "2024-02-01T00:00:00Z"
+    assert bucket_start("2024-02-29T13:00:00Z", "day") == "2024-02-29T00:00:00Z"
+    with pytest.raises(ValueError):
+        bucket_start("2024-02-29T00:00:00Z", "quarter")
+    with pytest.raises(ValueError):
+        bucket_start(None, "week")
+
+
+def test_resample_analytics_sums_buckets_without_mutating_input():
+    """Test that daily objects are rolled up per week and the input is left as is"""
+    daily = _daily([("2024-12-29", 1), ("2024-12-30", 2), ("2025-01-05", 3), ("2025-01-06", 4)])
+    original = copy.deepcopy(daily)
+
+    weekly = resample_analytics(daily, "week")
+
+    assert daily == original
+    assert weekly["meta"] == {"aggregation_granularity": "week", "resampled_from": "day"}
+    assert [(o["downloaded_on"], o["downloads"]["complete"], o["countries"]["DE"]) for o in weekly["objects"]] == [
+        ("2024-12-23T00:00:00Z", 1, 1),
+        ("2024-12-30T00:00:00Z", 5, 5),
+        ("2025-01-06T00:00:00Z", 4, 4),
+    ]
+    monthly = resample_analytics(daily, "month")
+    assert [o["downloads"]["complete"] for o in monthly["objects"]] == [3, 7]
+
+
+@pytest.mark.asyncio
+@patch("podigee.api.PodigeeAPIClient.get", new_callable=AsyncMock)
+async def test_get_episode_analytics_resamples_from_daily(mock_get):
+    """Test that week and month views request daily data and roll it up locally"""
+    client = PodigeeAPIClient(api_key="dummy_key")
+    mock_get.return_value = _daily([("2024-01-30", 1), ("2024-02-01", 2)])
+
+    monthly = await client.get_episode_analytics(episode_id=1, from_date="2024-01-30", to_date="2024-02-01",
+                                                 granularity="month")
+    weekly = await client.get_episode_analytics(episode_id=1, from_date="2024-01-30", to_date="2024-02-01",
+                                                granularity="week")
+
+    for call in mock_get.call_args_list:
+        assert call.args == ("episodes/1/analytics", {"from": "2024-01-30", "to": "2024-02-01", "granularity": "day"})
+    assert [o["downloads"]["complete"] for o in monthly["objects"]] == [1, 2]
+    assert [o["downloads"]["complete"] for o in weekly["objects"]] == [3]
+
+
+@pytest.mark.asyncio
+@patch("main.podigee_client.get_episode_analytics", new_callable=AsyncMock)
+async def test_get_episode_analytics_tool_lists_series(mock_analytics):
+    """Test that an explicit granularity adds the downloads per period"""
+    mock_analytics.return_value = resample_analytics(_daily([("2024-01-01", 5), ("2024-01-08", 7)]), "week")
+
+    result = await main.get_episode_analytics(episode_id=1, granularity="week")
+
+    assert "## Downloads per week" in result
+    assert "| 2024-01-08 | 7 |" in result
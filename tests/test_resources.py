@@ -0,0 +1,146 @@
+import os
+import sys
+import json
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from mcp.shared.memory import create_connected_server_and_client_session
+from pydantic import AnyUrl
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from podigee.dates import last_days
+from podigee.resources import ResourceSubscriptions, read_resource
+
+
+@pytest.mark.asyncio
+async def test_resources_are_listed_and_advertise_subscriptions():
+    """Test that the resources and templates are registered with subscribe support"""
+    resources = [str(resource.uri) for resource in await main.mcp.list_resources()]
+    templates = [template.uriTemplate for template in await main.mcp.list_resource_templates()]
+
+    assert resources == ["podigee://podcasts"]
+    assert "podigee://episode/{episode_id}/analytics/{window}" in templates
+    assert main.mcp._mcp_server.create_initialization_options().capabilities.resources.subscribe
+
+
+@pytest.mark.asyncio
+async def test_read_episode_analytics_resource():
+    """Test that a window in the URI becomes a canonical date range"""
+    with patch("main.podigee_client.get_episode_analytics", new_callable=AsyncMock) as mock_analytics:
+        mock_analytics.return_value = {"objects": [{"downloads": {"complete": 3}}]}
+        contents = await main.mcp.read_resource("podigee://episode/42/analytics/last-7-days")
+
+    window = last_days(7)
+    mock_analytics.assert_called_once_with(42, window.from_date, window.to_date)
+    assert json.loads(list(contents)[0].content) == {"objects": [{"downloads": {"complete": 3}}]}
+
+
+@pytest.mark.asyncio
+async def test_read_resource_rejects_unknown_uris():
+    """Test errors for unknown URIs and windows"""
+    with pytest.raises(ValueError):
+        await read_resource(MagicMock(), "podigee://episodes")
+    with pytest.raises(ValueError):
+        await read_resource(MagicMock(), "podigee://episode/1/analytics/forever")
+
+
+@pytest.mark.asyncio
+async def test_subscribers_are_notified_of_changes():
+    """Test that only a changed resource triggers a notification"""
+    client = MagicMock()
+    client.list_podcasts = AsyncMock(side_effect=[[{"id": 1}], [{"id": 1}], [{"id": 1}, {"id": 2}]])
+    session = MagicMock(send_resource_updated=AsyncMock())
+    subscriptions = ResourceSubscriptions(interval=3600)
+    subscriptions._subscribers["podigee://podcasts"] = {session: client}
+
+    assert [await subscriptions.refresh() for _ in range(3)] == [0, 0, 1]
+    session.send_resource_updated.assert_called_once_with("podigee://podcasts")
+
+
+@pytest.mark.asyncio
+async def test_closed_sessions_are_unsubscribed():
+    """Test that a session that can't be notified is dropped and polling stops"""
+    client = MagicMock()
+    client.list_podcasts = AsyncMock(side_effect=[[], [{"id": 1}]])
+    session = MagicMock(send_resource_updated=AsyncMock(side_effect=RuntimeError("closed")))
+    subscriptions = ResourceSubscriptions(interval=3600)
+    subscriptions.subscribe("podigee://podcasts", session, client)
+    with pytest.raises(ValueError):
+        subscriptions.subscribe("podigee://nothing", session, client)
+
+    # Let the polling task record the first content
+    await asyncio.sleep(0)
+    await subscriptions.refresh()
+
+    assert client.list_podcasts.call_count == 2
+    assert len(subscriptions) == 0
+    assert subscriptions._task is None
+
+
+@pytest.mark.asyncio
+async def test_closing_session_drops_its_subscriptions():
+    """Test that a session's subscriptions end with the session"""
+    client = MagicMock()
+    client.list_podcasts = AsyncMock(return_value=[])
+    closing, staying = MagicMock(), MagicMock()
+    subscriptions = ResourceSubscriptions(interval=3600)
+    async with subscriptions.lifespan(None) as closing_sessions:
+        subscriptions.subscribe("podigee://podcasts", closing, client)
+        subscriptions.subscribe("podigee://podcast/1", closing, client)
+        closing_sessions.add(closing)
+        async with subscriptions.lifespan(None) as staying_sessions:
+            subscriptions.subscribe("podigee://podcasts", staying, client)
+            staying_sessions.add(staying)
+        assert len(subscriptions) == 2
+
+    assert len(subscriptions) == 0
+    assert subscriptions._task is None
+
+
+@pytest.mark.asyncio
+async def test_session_subscriptions_end_with_the_session():
+    """Test subscribing through a real MCP session, which advertises the capability"""
+    with patch("main.podigee_client.list_podcasts", new_callable=AsyncMock) as mock_podcasts:
+        mock_podcasts.return_value = []
+        async with create_connected_server_and_client_session(main.mcp._mcp_server) as session:
+            assert session.get_server_capabilities().resources.subscribe
+            await session.subscribe_resource(AnyUrl("podigee://podcasts"))
+            assert len(main.resource_subscriptions) == 1
+
+    assert len(main.resource_subscriptions) == 0
+    assert main.resource_subscriptions._task is None
+
+
+@pytest.mark.asyncio
+async def test_polling_survives_unexpected_errors():
+    """Test that errors other than ValueError neither fail a refresh nor end polling"""
+    client = MagicMock()
+    client.list_podcasts = AsyncMock(side_effect=KeyError("id"))
+    session = MagicMock(send_resource_updated=AsyncMock())
+    subscriptions = ResourceSubscriptions(interval=0)
+    subscriptions._subscribers["podigee://podcasts"] = {session: client}
+    assert await subscriptions.refresh() == 0
+
+    refreshes = []
+
+    async def refresh():
+        refreshes.append(None)
+        if len(refreshes) == 1:
+            raise RuntimeError("unexpected")
+        subscriptions.unsubscribe("podigee://podcasts", session)
+
+    with patch.object(subscriptions, "refresh", side_effect=refresh):
+        await subscriptions._poll()
+
+    assert len(refreshes) == 2
+
+
+def test_subscriptions_can_be_disabled():
+    """Test that disabled subscriptions are neither advertised nor accepted"""
+    with patch.object(main.resource_subscriptions, "enabled", False):
+        capabilities = main.mcp._mcp_server.create_initialization_options().capabilities
+        with pytest.raises(ValueError):
+            main.resource_subscriptions.subscribe("podigee://podcasts", MagicMock(), MagicMock())
+
+    assert capabilities.resources.subscribe is False
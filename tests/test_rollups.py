@@ -0,0 +1,125 @@
+import os
+import sys
+import pytest
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from podigee.formatting import aggregate_analytics
+from podigee.rollups import DailyRollup, RollupStore
+
+START = date(2024, 1, 1)
+TODAY = date(2024, 3, 1)
+
+
+def _object(day):
+    n = (day - START).days
+    return {
+        "downloaded_on": f"{day.isoformat()}T00:00:00Z",
+        "downloads": {"complete": 10 + n},
+        "formats": {"mp3": 10 + n},
+        "platforms": {"Android": n % 3, "iOS": 2},
+        "countries": {"DE": 5, **({"US": n} if n % 2 else {})},
+        "clients": {},
+        "clients_on_platforms": {"Spotify on Android": 1},
+    }
+
+
+def _api_client():
+    client = MagicMock(cache_namespace="tenant@api")
+
+    async def get_podcast_analytics(podcast_id, from_date, to_date, granularity=None):
+        first, last = date.fromisoformat(from_date), date.fromisoformat(to_date)
+        days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+        # Like the API, answer short windows hourly unless a granularity is requested
+        if granularity is None and len(days) <= 2:
+            return {"meta": {"aggregation_granularity": "hour"}, "objects": []}
+        return {"meta": {"aggregation_granularity": "day"}, "objects": [_object(day) for day in days]}
+
+    client.get_podcast_analytics = AsyncMock(side_effect=get_podcast_analytics)
+    return client
+
+
+def test_rollup_query_matches_raw_aggregation():
+    """Test that prefix sum windows equal aggregating the raw objects"""
+    rollup = DailyRollup(1)
+    days = [START + timedelta(days=i) for i in range(40)]
+    # Leave a day without an object, it counts as no downloads
+    rollup.extend([_object(day) for day in days if day != days[5]], days[0], days[-1])
+
+    window = [day for day in days[3:30] if day != days[5]]
+    assert rollup.query(days[3], days[29]) == dict(
+        aggregate_analytics([_object(day) for day in window]),
+        downloads_by_date={day.isoformat(): (_object(day)["downloads"]["complete"] if day in window else 0)
+                           for day in days[3:30]},
+    )
+    with pytest.raises(ValueError):
+        rollup.extend([], days[-1] + timedelta(days=2), days[-1] + timedelta(days=3))
+
+
+@pytest.mark.asyncio
+async def test_store_fetches_only_missing_and_recent_days():
+    """Test that settled days are materialized once and recent days fetched each time"""
+    client = _api_client()
+    store = RollupStore(settle_days=2)
+
+    _, first = await store.aggregate(client, 7, "2024-02-01", "2024-02-29", today=TODAY)
+    _, second = await store.aggregate(client, 7, "2024-02-10", "2024-03-01", today=TODAY)
+
+    fetched = [call.args[1:] for call in client.get_podcast_analytics.call_args_list]
+    assert fetched == [
+        ("2024-02-01", "2024-02-28"),
+        ("2024-02-29", "2024-02-29"),
+        ("2024-02-29", "2024-03-01"),
+    ]
+    days = [date(2024, 2, 1) + timedelta(days=i) for i in range(29)]
+    assert first == aggregate_analytics([_object(day) for day in days]) | {"downloads_by_date": first["downloads_by_date"]}
+    assert second["total_downloads"] == sum(_object(day)["downloads"]["complete"] for day in
+                                            [date(2024, 2, 10) + timedelta(days=i) for i in range(21)])
+
+
+@pytest.mark.asyncio
+async def test_store_requests_daily_data_for_short_windows():
+    """Test that a one-day extension is fetched daily and extends the rollup"""
+    client = _api_client()
+    store = RollupStore(settle_days=2)
+
+    await store.aggregate(client, 7, "2024-02-01", "2024-02-27", today=TODAY)
+    _, aggregate = await store.aggregate(client, 7, "2024-02-01", "2024-02-28", today=TODAY)
+
+    calls = client.get_podcast_analytics.call_args_list
+    assert [call.args[1:] for call in calls] == [("2024-02-01", "2024-02-27"), ("2024-02-28", "2024-02-28")]
+    assert all(call.kwargs == {"granularity": "day"} for call in calls)
+    days = [date(2024, 2, 1) + timedelta(days=i) for i in range(28)]
+    assert aggregate["total_downloads"] == sum(_object(day)["downloads"]["complete"] for day in days)
+
+
+@pytest.mark.asyncio
+async def test_store_bypasses_non_daily_data():
+    """Test that responses in another granularity are aggregated directly"""
+    client = MagicMock(cache_namespace="tenant@api")
+    client.get_podcast_analytics = AsyncMock(return_value={
+        "meta": {"aggregation_granularity": "month"},
+        "objects": [_object(START)],
+    })
+    store = RollupStore(settle_days=2)
+
+    data, aggregate = await store.aggregate(client, 7, "2024-01-01", "2024-01-31", today=TODAY)
+
+    assert aggregate["total_downloads"] == 10
+    assert data["meta"]["aggregation_granularity"] == "month"
+
+
+@pytest.mark.asyncio
+async def test_summary_tool_uses_rollups():
+    """Test the summary tool's rollup path"""
+    store = RollupStore(settle_days=0)
+    client = _api_client()
+    client.get_podcast_overview = AsyncMock(return_value={"unique_listeners_number": 3})
+    with patch.object(main, "podcast_rollups", store), patch.object(main, "get_client", return_value=client):
+        result = await main.get_podcast_analytics_summary(podcast_id=7, from_date="2024-01-01", to_date="2024-01-02")
+
+    assert "Total Downloads: 21" in result
+    assert "**Time Period:** 2024-01-01 to 2024-01-02" in result
+    assert "1. DE: 10 downloads" in result
@@ -0,0 +1,130 @@
+import os
+import sys
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from podigee.api import PodigeeAPIClient
+from podigee.scheduler import Priority, TaskScheduler, current_tool, tool_scope
+
+
+@pytest.mark.asyncio
+async def test_scheduler_respects_concurrency_cap():
+    """Test that no more than max_concurrency tasks run at the same time"""
+    scheduler = TaskScheduler(max_concurrency=2)
+    running = 0
+    peak = 0
+
+    async def work():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*(scheduler.run(work) for _ in range(10)))
+
+    assert peak == 2
+    assert scheduler.active == 0
+    assert scheduler.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_prefers_interactive_over_background():
+    """Test that queued interactive work is started before queued background work"""
+    scheduler = TaskScheduler(max_concurrency=1)
+    gate = asyncio.Event()
+    order = []
+
+    async def blocker():
+        await gate.wait()
+
+    async def work(name):
+        order.append(name)
+
+    first = asyncio.create_task(scheduler.run(blocker))
+    await asyncio.sleep(0)
+    background = asyncio.create_task(scheduler.run(work, "background", priority=Priority.BACKGROUND))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(scheduler.run(work, "interactive", priority=Priority.INTERACTIVE))
+    await asyncio.sleep(0)
+
+    gate.set()
+    await asyncio.gather(first, background, interactive)
+
+    assert order == ["interactive", "background"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_round_robins_between_tools():
+    """Test that a tool with many queued calls cannot starve another tool"""
+    scheduler = TaskScheduler(max_concurrency=1)
+    gate = asyncio.Event()
+    order = []
+
+    async def blocker():
+        await gate.wait()
+
+    async def work(name):
+        order.append(name)
+
+    tasks = [asyncio.create_task(scheduler.run(blocker))]
+    await asyncio.sleep(0)
+    for i in range(3):
+        tasks.append(asyncio.create_task(scheduler.run(work, f"fanout-{i}", tool="fanout")))
+    tasks.append(asyncio.create_task(scheduler.run(work, "single", tool="single")))
+    await asyncio.sleep(0)
+
+    gate.set()
+    await asyncio.gather(*tasks)
+
+    assert order == ["fanout-0", "single", "fanout-1", "fanout-2"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_cancellation_frees_queue_and_slot():
+    """Test that cancelling waiting and running tasks does not leak slots"""
+    scheduler = TaskScheduler(max_concurrency=1)
+
+    running = asyncio.create_task(scheduler.run(asyncio.sleep, 10))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(scheduler.run(asyncio.sleep, 10))
+    await asyncio.sleep(0)
+    assert scheduler.waiting == 1
+
+    waiting.cancel()
+    running.cancel()
+    await asyncio.gather(running, waiting, return_exceptions=True)
+
+    assert scheduler.active == 0
+    assert scheduler.waiting == 0
+    assert await asyncio.wait_for(scheduler.run(AsyncMock(return_value="ok")), 1) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_tool_scope_sets_current_tool():
+    """Test that tool_scope exposes the tool name and restores it afterwards"""
+    assert current_tool() is None
+    with tool_scope("list_podcasts"):
+        assert current_tool() == "list_podcasts"
+    assert current_tool() is None
+
+
+@pytest.mark.asyncio
+async def test_podigee_api_client_get_uses_scheduler():
+    """Test that PodigeeAPIClient.get routes the HTTP call through its scheduler"""
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"ok": True}
+    mock_client = AsyncMock()
+    mock_client.__aenter__.return_value.get.return_value = mock_response
+
+    scheduler = TaskScheduler(max_concurrency=1)
+    scheduler.run = AsyncMock(wraps=scheduler.run)
+    client = PodigeeAPIClient("test_key", scheduler=scheduler)
+
+    with patch("httpx.AsyncClient", return_value=mock_client):
+        result = await client.get("podcasts")
+
+    assert result == {"ok": True}
+    scheduler.run.assert_called_once()
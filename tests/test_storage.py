@@ -0,0 +1,65 @@
+import os
+import sys
+import stat
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from podigee.cache import SQLiteResponseCache
+from podigee.storage import private_directory, private_file
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_cache_database_is_private(tmp_path):
+    """Test that the SQLite cache and a missing parent directory are created for the user only"""
+    path = str(tmp_path / "podigee-mcp" / "cache.sqlite3")
+    cache = SQLiteResponseCache(path, ttl=60)
+    cache.store("a", 1)
+
+    assert _mode(path) == 0o600
+    assert _mode(os.path.dirname(path)) == 0o700
+    assert cache.lookup("a").data == 1
+    cache.close()
+
+
+def test_existing_locations_are_restricted(tmp_path):
+    """Test that a file and directory of the user that others can read are restricted"""
+    directory = tmp_path / "catalog"
+    directory.mkdir(mode=0o755)
+    os.chmod(directory, 0o755)
+    path = tmp_path / "cache.sqlite3"
+    path.write_bytes(b"")
+    os.chmod(path, 0o644)
+
+    private_directory(str(directory))
+    private_file(str(path))
+
+    assert (_mode(directory), _mode(path)) == (0o700, 0o600)
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX ownership")
+def test_locations_of_other_users_are_refused(tmp_path, monkeypatch):
+    """Test that a cache file or directory someone else created first is not used"""
+    path = tmp_path / "cache.sqlite3"
+    path.write_bytes(b"")
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(path).st_uid + 1)
+
+    with pytest.raises(ValueError, match="another user"):
+        SQLiteResponseCache(str(path))
+    with pytest.raises(ValueError, match="another user"):
+        private_directory(str(tmp_path))
+
+
+def test_symlinks_are_refused(tmp_path):
+    """Test that a symlink planted at the cache path is not followed"""
+    target = tmp_path / "elsewhere"
+    target.write_bytes(b"")
+    link = tmp_path / "cache.sqlite3"
+    link.symlink_to(target)
+
+    with pytest.raises(ValueError):
+        private_file(str(link))
+    with pytest.raises(ValueError):
+        private_directory(str(link))
@@ -0,0 +1,83 @@
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from benchmarks.scale_benchmarks import run_scale_benchmarks
+from benchmarks.synthetic import (
+    dimension_keys,
+    generate_analytics,
+    generate_episodes,
+    generate_episodes_batch,
+    generate_overview,
+)
+
+
+def test_generate_analytics_is_deterministic():
+    """Test that the same arguments and seed produce the same payload"""
+    assert generate_analytics(objects=5, seed=7) == generate_analytics(objects=5, seed=7)
+    assert generate_analytics(objects=5, seed=7) != generate_analytics(objects=5, seed=8)
+
+
+def test_generate_analytics_hourly_year_shape():
+    """Test a year of hourly objects with realistic dimension sizes"""
+    analytics = generate_analytics(objects=8760, granularity="hour", countries=200, clients=500, density=0.1)
+
+    objects = analytics["objects"]
+    assert len(objects) == 8760
+    assert analytics["meta"]["aggregation_granularity"] == "hour"
+    assert analytics["meta"]["timerange"]["end_datetime"] == "2024-01-01T00:00:00Z"
+    assert objects[0]["downloaded_on"] == "2023-01-01T00:00:00Z"
+    assert objects[1]["downloaded_on"] == "2023-01-01T01:00:00Z"
+    assert set().union(*(obj["countries"] for obj in objects)) == set(dimension_keys("countries", 200))
+    assert len(set().union(*(obj["clients"] for obj in objects))) == 500
+
+
+def test_generate_analytics_full_density():
+    """Test that density 1.0 puts every key into every object"""
+    objects = generate_analytics(objects=3, countries=200, clients=500)["objects"]
+
+    assert all(len(obj["countries"]) == 200 and len(obj["clients"]) == 500 for obj in objects)
+
+
+def test_generate_analytics_rejects_unknown_granularity():
+    """Test that unsupported granularities are rejected"""
+    with pytest.raises(ValueError):
+        generate_analytics(granularity="minute")
+
+
+def test_generated_payloads_render_through_formatters():
+    """Test that generated analytics and overview match what format_analytics_summary consumes"""
+    analytics = generate_analytics(objects=720, granularity="hour", countries=200, clients=500, density=0.1)
+    overview = generate_overview(episodes=120)
+
+    result = main.format_analytics_summary(analytics, overview)
+
+    total = sum(obj["downloads"]["complete"] for obj in analytics["objects"])
+    assert f"Total Downloads: {total}" in result
+    assert "**Time Period:** 2023-01-01 to 2023-01-31" in result
+    assert "Published Episodes: 120" in result
+    assert "No data available" not in result
+
+
+def test_generate_episodes_and_batch():
+    """Test the episode list and batch analytics shapes"""
+    episodes = generate_episodes(podcast_id=3, episodes=10)
+    batch = generate_episodes_batch(podcast_id=3, episodes=10)
+
+    assert len(episodes) == 10
+    assert episodes[0]["published_at"] > episodes[-1]["published_at"]  # newest first
+    assert all(e["podcast_id"] == 3 for e in episodes)
+    assert [o["id"] for o in batch["objects"]] == [e["id"] for e in episodes]
+
+
+def test_scale_benchmark_smoke():
+    """Test that the scale benchmark runs both workloads"""
+    original_client = main.podigee_client
+
+    results = run_scale_benchmarks(["month-daily"], repeat=1)
+
+    assert {r.workload for r in results} == {"format_analytics_summary", "episode_aggregation"}
+    assert all(r.objects == 30 and r.best > 0 for r in results)
+    assert main.podigee_client is original_client
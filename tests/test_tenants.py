@@ -0,0 +1,125 @@
+import os
+import sys
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from podigee.cache import ResponseCache
+from podigee.tenants import TenantRegistry, api_key_from_request, tenant_id
+
+
+def test_api_key_from_request_headers_and_meta():
+    """Test the places a request can carry its API key"""
+    header = SimpleNamespace(request=SimpleNamespace(headers={"x-podigee-api-key": "key-a"}), meta=None)
+    bearer = SimpleNamespace(request=SimpleNamespace(headers={"authorization": "Bearer key-b"}), meta=None)
+    meta = SimpleNamespace(request=None, meta=SimpleNamespace(podigee_api_key="key-c"))
+    missing = SimpleNamespace(request=SimpleNamespace(headers={"authorization": "Basic abc"}), meta=None)
+
+    assert api_key_from_request(header) == "key-a"
+    assert api_key_from_request(bearer) == "key-b"
+    assert api_key_from_request(meta) == "key-c"
+    assert api_key_from_request(missing) is None
+    assert api_key_from_request(None) is None
+
+
+def test_registry_isolates_tenants():
+    """Test that each key gets its own client, scheduler and cache namespace"""
+    registry = TenantRegistry(max_concurrency=2, max_rps=5)
+
+    a = registry.client_for("key-a")
+    b = registry.client_for("key-b")
+
+    assert registry.client_for("key-a") is a
+    assert a.api_key == "key-a" and b.api_key == "key-b"
+    assert a.scheduler is not b.scheduler
+    assert a.scheduler.max_concurrency == 2 and a.scheduler.rate_limiter.rate == 5
+    assert a.cache is b.cache
+    assert a.cache_namespace != b.cache_namespace
+    assert tenant_id("key-a") in a.cache_namespace
+    assert "key-a" not in a.cache_namespace
+
+
+def test_registry_evicts_least_recently_used_tenant():
+    """Test LRU eviction and that evicted tenants' cache entries are dropped"""
+    cache = ResponseCache(ttl=60)
+    registry = TenantRegistry(max_tenants=2, pool_size=None, cache=cache)
+
+    a = registry.client_for("key-a")
+    cache.store(a.cache_namespace + "/podcasts?", [])
+    registry.client_for("key-b")
+    registry.client_for("key-a")
+    registry.client_for("key-c")
+
+    assert len(registry) == 2
+    assert "key-b" not in registry and "key-a" in registry
+
+    registry.client_for("key-d")
+    registry.client_for("key-e")
+    assert "key-a" not in registry
+    assert len(cache) == 0
+
+
+def test_registry_evicts_idle_tenants():
+    """Test that tenants unused for longer than the idle TTL are dropped"""
+    registry = TenantRegistry(idle_ttl=0, pool_size=None)
+
+    registry.client_for("key-a")
+    registry.client_for("key-b")
+
+    assert "key-a" not in registry
+
+
+@pytest.mark.asyncio
+async def test_retired_clients_do_not_reopen_their_pool():
+    """Test that a tool still holding an evicted tenant's client leaves no pool behind"""
+    registry = TenantRegistry(max_tenants=1, pool_size=4)
+    a = registry.client_for("key-a")
+    async with a._http_client():
+        pass
+    registry.client_for("key-b")
+    # Let the eviction close the retired client's pool
+    await asyncio.sleep(0)
+    assert a._pool is None
+
+    async with a._http_client() as http_client:
+        assert not http_client.is_closed
+
+    assert http_client.is_closed
+    assert a._pool is None
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_client_routes_by_request_key(monkeypatch):
+    """Test that tools use the tenant client of the request's API key"""
+    registry = TenantRegistry(pool_size=None)
+    monkeypatch.setattr(main, "tenants", registry)
+    request_context = SimpleNamespace(request=SimpleNamespace(headers={"x-podigee-api-key": "key-a"}), meta=None)
+    monkeypatch.setattr(main.mcp, "get_context", lambda: SimpleNamespace(request_context=request_context))
+
+    assert main.get_client() is registry.client_for("key-a")
+
+    monkeypatch.setattr(main, "SINGLE_TENANT", True)
+    request_context.request.headers = {}
+    assert main.get_client() is main.podigee_client
+
+
+@pytest.mark.asyncio
+async def test_requests_without_key_are_rejected_in_http_mode(monkeypatch):
+    """Test that a keyless HTTP request never falls back to the server's own API key"""
+    server_client = MagicMock()
+    monkeypatch.setattr(main, "podigee_client", server_client)
+    monkeypatch.setattr(main, "tenants", TenantRegistry(pool_size=None))
+    request_context = SimpleNamespace(request=SimpleNamespace(headers={}), meta=None)
+    monkeypatch.setattr(main.mcp, "get_context", lambda: SimpleNamespace(request_context=request_context))
+
+    with pytest.raises(ValueError, match="No Podigee API key"):
+        main.get_client()
+    result = await main.list_podcasts()
+
+    assert result.startswith("Error")
+    assert "No Podigee API key" in result
+    server_client.list_podcasts.assert_not_called()
@@ -0,0 +1,85 @@
+import os
+import sys
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from podigee.tracing import NOOP_SPAN, FileSpanExporter, Tracer, tracer
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    """Enable the process-wide tracer with a file exporter for one test"""
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(tracer, "exporter", FileSpanExporter(str(path)))
+    return path
+
+
+def read_spans(path):
+    spans = []
+    for line in path.read_text().splitlines():
+        request = json.loads(line)
+        for resource_spans in request["resourceSpans"]:
+            for scope_spans in resource_spans["scopeSpans"]:
+                spans.extend(scope_spans["spans"])
+    return {span["name"]: span for span in spans}
+
+
+def attributes(span):
+    return {a["key"]: list(a["value"].values())[0] for a in span["attributes"]}
+
+
+def test_disabled_tracer_returns_noop_span():
+    """Test that a tracer without exporter hands out the shared no-op span"""
+    disabled = Tracer()
+    assert not disabled.enabled
+    with disabled.span("anything") as span:
+        assert span is NOOP_SPAN
+        assert not span.is_recording()
+
+
+@pytest.mark.asyncio
+async def test_tool_client_and_http_spans_are_nested(trace_file):
+    """Test that a tool call produces tool -> client method -> get -> HTTP spans in one trace"""
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = [{"id": 42, "title": "Test Podcast"}]
+    mock_client = AsyncMock()
+    mock_client.__aenter__.return_value.get.return_value = mock_response
+
+    with patch("httpx.AsyncClient", return_value=mock_client):
+        result = await main.list_podcasts()
+    assert "Test Podcast" in result
+
+    spans = read_spans(trace_file)
+    tool = spans["tool list_podcasts"]
+    method = spans["PodigeeAPIClient.list_podcasts"]
+    get = spans["PodigeeAPIClient.get"]
+    http = spans["HTTP GET"]
+
+    assert len({tool["traceId"], method["traceId"], get["traceId"], http["traceId"]}) == 1
+    assert "parentSpanId" not in tool
+    assert method["parentSpanId"] == tool["spanId"]
+    assert get["parentSpanId"] == method["spanId"]
+    assert http["parentSpanId"] == get["spanId"]
+
+    assert attributes(tool)["mcp.tool.name"] == "list_podcasts"
+    assert attributes(get)["podigee.endpoint"] == "podcasts"
+    assert attributes(get)["podigee.params_size"] == "0"
+    assert attributes(http)["http.response.status_code"] == "200"
+    assert int(http["endTimeUnixNano"]) >= int(http["startTimeUnixNano"])
+
+
+@pytest.mark.asyncio
+@patch("main.podigee_client.list_podcasts", new_callable=AsyncMock)
+async def test_tool_error_marks_span_status(mock_list_podcasts, trace_file):
+    """Test that tools returning an error string get an error span status"""
+    mock_list_podcasts.side_effect = ValueError("API down")
+
+    await main.list_podcasts()
+
+    span = read_spans(trace_file)["tool list_podcasts"]
+    assert span["status"]["code"] == 2
+    assert "API down" in span["status"]["message"]
@@ -0,0 +1,125 @@
+import os
+import sys
+import stat
+import pytest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from benchmarks.mock_api import MockAPIConfig, MockAPIServer
+from podigee.api import PodigeeAPIClient
+from podigee.cache import ResponseCache
+from podigee.uploads import MultipartUploader, resolve_upload_path
+
+PART_SIZE = MockAPIConfig().upload_part_size
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / "master.wav"
+    # Two full parts and a short last one
+    path.write_bytes(os.urandom(2 * PART_SIZE + 1000))
+    return path
+
+
+def _client(server):
+    return PodigeeAPIClient(api_key="test_key", base_url=server.base_url, cache=ResponseCache(ttl=0))
+
+
+@pytest.mark.asyncio
+async def test_upload_retries_failed_parts(audio_file, tmp_path):
+    """Test a multipart upload in the server's part size, with a part failing once"""
+    with MockAPIServer(MockAPIConfig(part_failures=1)) as server, patch("podigee.uploads.RETRY_BACKOFF", 0):
+        uploader = MultipartUploader(_client(server), state_dir=str(tmp_path / "state"))
+        result = await uploader.upload(str(audio_file))
+        upload = server.api.uploads["upload-1"]
+        part_url_requests = server.api.part_url_requests
+
+    assert result == {"file_url": "https://cdn.example.com/master.wav", "size": audio_file.stat().st_size,
+                      "parts": 3, "resumed_parts": 0}
+    assert upload["file"] == audio_file.read_bytes()
+    # Listed part URLs are used first; only the retry asks for a fresh one
+    assert part_url_requests == 1
+    assert os.listdir(tmp_path / "state") == []
+
+
+@pytest.mark.asyncio
+async def test_upload_uses_the_servers_part_size(audio_file, tmp_path):
+    """Test that parts are cut in the part size Podigee returns"""
+    with MockAPIServer(MockAPIConfig(upload_part_size=PART_SIZE + 512 * 1024)) as server:
+        result = await MultipartUploader(_client(server), state_dir=None).upload(str(audio_file))
+        upload = server.api.uploads["upload-1"]
+
+    assert result["parts"] == 2
+    assert upload["file"] == audio_file.read_bytes()
+
+
+@pytest.mark.asyncio
+async def test_small_files_are_uploaded_whole(tmp_path):
+    """Test the single upload Podigee chooses for files below its part size"""
+    path = tmp_path / "jingle.mp3"
+    path.write_bytes(os.urandom(1000))
+    with MockAPIServer(MockAPIConfig()) as server:
+        result = await MultipartUploader(_client(server), state_dir=None).upload(str(path))
+        upload = server.api.uploads["upload-1"]
+
+    assert result == {"file_url": "https://cdn.example.com/jingle.mp3", "size": 1000, "parts": 1, "resumed_parts": 0}
+    assert upload["multipart_upload_id"] is None
+    assert upload["file"] == path.read_bytes()
+
+
+@pytest.mark.asyncio
+async def test_interrupted_upload_resumes_from_manifest(audio_file, tmp_path):
+    """Test that a second attempt only uploads the parts that are missing"""
+    state_dir = str(tmp_path / "state")
+    with MockAPIServer(MockAPIConfig(part_failures=1)) as server:
+        client = _client(server)
+        with pytest.raises(ValueError, match="2 of 3 parts uploaded"):
+            await MultipartUploader(client, retries=0, state_dir=state_dir).upload(str(audio_file))
+        stored_before = dict(server.api.uploads["upload-1"]["parts"])
+        # The manifest holds presigned URLs, only the server's user may read it
+        manifests = os.listdir(state_dir)
+        assert len(manifests) == 1
+        assert stat.S_IMODE(os.stat(state_dir).st_mode) == 0o700
+        assert stat.S_IMODE(os.stat(os.path.join(state_dir, manifests[0])).st_mode) == 0o600
+
+        result = await MultipartUploader(client, state_dir=state_dir).upload(str(audio_file))
+        upload = server.api.uploads["upload-1"]
+        part_url_requests = server.api.part_url_requests
+
+    assert len(stored_before) == 2
+    assert result["resumed_parts"] == 2
+    assert list(server.api.uploads) == ["upload-1"]
+    # The resumed part gets a fresh URL, the listed one may have expired
+    assert part_url_requests == 1
+    assert upload["file"] == audio_file.read_bytes()
+
+
+@pytest.mark.asyncio
+async def test_leftover_manifest_does_not_fail_upload(audio_file, tmp_path):
+    """Test that a manifest that can't be removed only logs a warning"""
+    with MockAPIServer(MockAPIConfig()) as server, \
+            patch("podigee.uploads.os.remove", side_effect=PermissionError("denied")):
+        result = await MultipartUploader(_client(server), state_dir=str(tmp_path / "state")).upload(str(audio_file))
+
+    assert result["file_url"] == "https://cdn.example.com/master.wav"
+
+
+@pytest.mark.asyncio
+async def test_upload_tool(audio_file):
+    """Test the upload tool's summary"""
+    with MockAPIServer(MockAPIConfig()) as server, patch.object(main, "get_client", return_value=_client(server)):
+        result = await main.upload_episode_audio(file_path=str(audio_file), filename="episode-1.wav")
+
+    assert "- URL: https://cdn.example.com/episode-1.wav" in result
+    assert "- File: master.wav (10.0 MB)" in result
+    assert "- Parts: 3" in result
+
+
+def test_upload_root_confines_paths(tmp_path):
+    """Test that paths can't escape the upload directory"""
+    assert resolve_upload_path("a/b.mp3", str(tmp_path)) == os.path.join(os.path.realpath(tmp_path), "a", "b.mp3")
+    with pytest.raises(ValueError):
+        resolve_upload_path("../secret.mp3", str(tmp_path))
+    with pytest.raises(ValueError):
+        resolve_upload_path("/etc/passwd", str(tmp_path))